@@ -23,6 +23,32 @@ class Config:
     ALLOWED_EXTENSIONS = {'ucs', 'tar', 'txt', 'conf', 'log'}
     MAX_CONTENT_LENGTH = 100 * 1024 * 1024  # 100 MB max upload size
     MAX_FILES_COUNT = 12  # 最大文件数量限制
+    # 配置翻译的并行进程数（0 或 1 表示在当前进程中逐个处理）
+    TRANSLATE_WORKERS = int(os.environ.get('F5_TRANSLATE_WORKERS', os.cpu_count() or 1))
+    # 只翻译 VS 引用的对象（未引用的对象列在 attention 文件中），设置为 0 时翻译全部对象
+    PRUNE_UNREFERENCED = os.environ.get('F5_PRUNE_UNREFERENCED', '1') != '0'
+    # 单个配置的 xlsx、txt、attention 三个输出并行生成的进程数（0 或 1 表示逐个生成），多个文件并行翻译时不再生效
+    OUTPUT_WORKERS = int(os.environ.get('F5_OUTPUT_WORKERS', '3'))
+    # conf 翻译使用流式模式：逐块读取、分批写出 txt，内存占用与配置文件大小无关；只输出 txt，不输出 xlsx 和 attention，
+    # 也不裁剪未引用的对象。有分区配置时需要合并后翻译，不使用流式模式
+    CONF_STREAMING = os.environ.get('F5_CONF_STREAMING', '0') != '0'
+    # conf 翻译的 txt 按分区拆分为多个分片（写到 output/<名称>_shards 目录，附按加载顺序排列的索引），代替单个 txt 文件；
+    # 输入没有变化的分片直接复用。SHARD_MAX_OBJECTS 大于 0 时每个分片最多包含这么多个对象（不按分区拆分时也输出分片）
+    SHARD_BY_PARTITION = os.environ.get('F5_SHARD_BY_PARTITION', '0') != '0'
+    SHARD_MAX_OBJECTS = int(os.environ.get('F5_SHARD_MAX_OBJECTS', '0')) or None
+    # UCS 处理时直接从归档中读取 bigip.conf/bigip_base.conf 并在内存中解析，不解压到磁盘；设置为 0 时先解压再翻译
+    UCS_IN_MEMORY = os.environ.get('F5_UCS_IN_MEMORY', '1') != '0'
+    # 内存解析时是否在处理过程中就把原始配置文件写到 conf/base 目录，默认不写出：下载原始配置时才从上传的归档中补写
+    # （见 ucs_pipeline.write_raw_confs）。设置为 1 时处理时就写出（页面上按原始配置列出文件时需要）
+    UCS_KEEP_RAW_CONFS = os.environ.get('F5_UCS_KEEP_RAW_CONFS', '0') != '0'
+    # 弘积配置对比方式：line 按行对齐对比，stanza 按顶层段落对比（段落顺序不同不算差异）
+    HORIZON_COMPARE_MODE = os.environ.get('F5_HORIZON_COMPARE_MODE', 'line')
+    # 弘积配置文件内容缓存（解码后的行、行哈希、头部信息）的内存预算
+    HORIZON_CACHE_BYTES = int(os.environ.get('F5_HORIZON_CACHE_MB', '256')) * 1024 * 1024
+    # 弘积主备配对方式：heuristic 按文件名/hostname/VRRP unit-id 配对，fingerprint 按配置内容的 MinHash 指纹配对，
+    # auto 在配置文件数达到 HORIZON_FINGERPRINT_MIN_FILES 时使用 fingerprint
+    HORIZON_PAIRING = os.environ.get('F5_HORIZON_PAIRING', 'auto')
+    HORIZON_FINGERPRINT_MIN_FILES = int(os.environ.get('F5_HORIZON_FINGERPRINT_MIN_FILES', '20'))
     
     # Web应用配置
     SECRET_KEY = 'your-secret-key-here'  # 在生产环境中应该使用环境变量
@@ -31,23 +31,11 @@ def extract_conf_and_base(base_directory, output_directory=None):
     for item in os.listdir(base_directory):
         item_path = os.path.join(base_directory, item)
         if os.path.isdir(item_path):
-            # 在每个文件夹中查找config目录
-            config_dir = os.path.join(item_path, 'config')
-            if os.path.exists(config_dir) and os.path.isdir(config_dir):
-                
-                # 查找 bigip.conf 文件并复制到 'conf' 目录
-                bigip_conf_file = os.path.join(config_dir, 'bigip.conf')
-                if os.path.isfile(bigip_conf_file):
-                    new_conf_file = os.path.join(conf_dir, f"{item}_bigip.conf")
-                    shutil.copy2(bigip_conf_file, new_conf_file)
-                    extracted_files['conf'].append(new_conf_file)
-                
-                # 查找 bigip_base.conf 文件并复制到 'base' 目录
-                bigip_base_conf_file = os.path.join(config_dir, 'bigip_base.conf')
-                if os.path.isfile(bigip_base_conf_file):
-                    new_base_file = os.path.join(base_dir, f"{item}_bigip_base.conf")
-                    shutil.copy2(bigip_base_conf_file, new_base_file)
-                    extracted_files['base'].append(new_base_file)
+            conf_file, base_file = extract_device_conf_and_base(item_path, conf_dir, base_dir)
+            if conf_file:
+                extracted_files['conf'].append(conf_file)
+            if base_file:
+                extracted_files['base'].append(base_file)
     
     return {
         'status': 'success',
@@ -57,6 +45,37 @@ def extract_conf_and_base(base_directory, output_directory=None):
     }
 
 
+def extract_device_conf_and_base(device_directory, conf_dir, base_dir):
+    """
+    从单台设备的解压目录中复制 bigip.conf 和 bigip_base.conf
+    :param device_directory: 设备的解压目录（其中包含 config 目录），目录名作为文件名前缀
+    :param conf_dir: bigip.conf 的目标目录
+    :param base_dir: bigip_base.conf 的目标目录
+    :return: (复制后的 bigip.conf 路径, 复制后的 bigip_base.conf 路径)，不存在的文件为 None
+    """
+    item = os.path.basename(os.path.normpath(device_directory))
+    config_dir = os.path.join(device_directory, 'config')
+    new_conf_file = None
+    new_base_file = None
+    if os.path.exists(config_dir) and os.path.isdir(config_dir):
+        
+        # 查找 bigip.conf 文件并复制到 'conf' 目录
+        bigip_conf_file = os.path.join(config_dir, 'bigip.conf')
+        if os.path.isfile(bigip_conf_file):
+            os.makedirs(conf_dir, exist_ok=True)
+            new_conf_file = os.path.join(conf_dir, f"{item}_bigip.conf")
+            shutil.copy2(bigip_conf_file, new_conf_file)
+        
+        # 查找 bigip_base.conf 文件并复制到 'base' 目录
+        bigip_base_conf_file = os.path.join(config_dir, 'bigip_base.conf')
+        if os.path.isfile(bigip_base_conf_file):
+            os.makedirs(base_dir, exist_ok=True)
+            new_base_file = os.path.join(base_dir, f"{item}_bigip_base.conf")
+            shutil.copy2(bigip_base_conf_file, new_base_file)
+    
+    return new_conf_file, new_base_file
+
+
 def run_script():
     """原始的GUI脚本，保持向后兼容"""
     # 创建一个Tkinter根窗口
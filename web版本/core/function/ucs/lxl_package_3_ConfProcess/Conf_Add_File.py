@@ -1,73 +1,229 @@
+import io
+import mmap
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 
-from .Conf_Extract import extract_pools_vs_nodes
+from .Conf_Cache import load_or_extract
+from .Conf_Graph import build_graph
+from .Conf_Extract import PARSER_VERSION, extract_pools_vs_nodes
+from .Conf_Parallel import list_conf_files, run_files, summarize
+from .Conf_Prune import prune_model
+from .Conf_Shard import write_txt_shards
 from .Conf_Split import split_blocks
+from .Conf_Stream import stream_to_txt
 from .Conf_WriteToExcel import write_to_excel
 from .Conf_WriteToTxt import write_to_txt
 from .Conf_WriteToTxt_attention import write_to_txt_attention
 
+# 输出类型与对应的输出函数
+OUTPUT_WRITERS = {
+    'xlsx': write_to_excel,
+    'txt': write_to_txt,
+    'attention': write_to_txt_attention,
+}
 
-def process_folder(folder_path):
+# 子进程中共用的提取结果和输出参数，由进程池的 initializer 设置，每个进程只传一次（见 write_outputs）
+_worker_model = None
+_worker_options = None
+
+
+def process_folder(folder_path, workers=None, excel=True, output_workers=None, cache_dir=None,
+                   shard_by_partition=False, shard_max_objects=None, prune=True, snat_cidr=False, streaming=False):
     """
     遍历文件夹中的所有文件并调用write_to_txt来处理它们。
     :param folder_path: 文件夹路径
+    :param workers: 并行处理的进程数，None 或 1 表示在当前进程中逐个处理
+    :param excel: 是否输出 Excel 文件（见 process_file）
+    :param output_workers: 单个文件的输出并行生成的进程数（见 process_file），多个文件并行处理时不再生效
+    :param cache_dir: 解析缓存目录（见 process_file）
+    :param shard_by_partition: 是否按分区拆分 txt 输出（见 write_model）
+    :param shard_max_objects: txt 分片的最大对象数（见 write_model）
+    :param prune: 是否只翻译 VS 引用的对象（见 write_model）
+    :param snat_cidr: SNAT pool 成员是否按 CIDR 网段输出（见 write_model）
+    :param streaming: 是否使用流式模式（见 process_file）
+    :return: 汇总信息 {'processed_count', 'error_count', 'total_files', 'errors'}
     """
     if folder_path:  # 用户取消选择时返回空字符串，需要检查是否为空
         # 遍历文件夹下的所有文件并处理它们
-        for root_dir, _, files in os.walk(folder_path):
-            for file in files:
-                if file.endswith('.conf'):
-                    file_path = os.path.join(root_dir, file)
-                    process_file(file_path)
+        file_paths = list_conf_files(folder_path)
+        if workers and workers > 1 and len(file_paths) > 1:
+            # 文件已经并行处理，单个文件的输出不再开进程池，避免进程数成倍增加
+            output_workers = None
+        return summarize(run_files(process_file, file_paths, workers, excel=excel,
+                                   output_workers=output_workers, cache_dir=cache_dir,
+                                   shard_by_partition=shard_by_partition, shard_max_objects=shard_max_objects,
+                                   prune=prune, snat_cidr=snat_cidr, streaming=streaming))
 
 
-def process_file(file_path):
+def process_file(file_path, excel=True, output_workers=None, cache_dir=None,
+                 shard_by_partition=False, shard_max_objects=None, prune=True, snat_cidr=False, streaming=False):
     """
-    处理单个文件，提取信息并输出到Excel和文本文件。
+    处理单个文件，提取信息并输出到Excel和文本文件。文件无法读取时抛出 OSError，由调用方记录为失败（见 run_files）。
     :param file_path: 文件路径
+    :param excel: 是否输出 Excel 文件；为 False 时只输出 txt
+    :param output_workers: 大于 1 时用进程池同时生成 xlsx、txt 和 attention 输出，总耗时接近最慢的一个输出
+    :param cache_dir: 解析缓存目录；文件内容和解析器版本都没变时直接使用缓存的提取结果，跳过分块和提取
+    :param shard_by_partition: 是否按分区拆分 txt 输出（见 write_model）
+    :param shard_max_objects: txt 分片的最大对象数（见 write_model）
+    :param prune: 是否只翻译 VS 引用的对象（见 write_model）
+    :param snat_cidr: SNAT pool 成员是否按 CIDR 网段输出（见 write_model）
+    :param streaming: 流式模式：从文件句柄逐块读取，分批提取并写出 txt（见 Conf_Stream.stream_to_txt），
+                      内存占用与文件大小无关，适合数百 MB 的配置文件；只输出 txt，不经过解析缓存，也不裁剪和分片
+    :return: 各输出的耗时 {'xlsx': 秒, 'txt': 秒, 'attention': 秒}
     """
-    encodings_to_try = ['utf-8', 'utf-8-sig', 'ISO-8859-1', 'latin-1']
-
-    for encoding in encodings_to_try:
-        try:
-            with open(file_path, 'r', encoding=encoding) as file:
-                content = file.read()
-            # 如果成功读取文件，跳出循环
-            break
-        except UnicodeDecodeError:
-            pass
-    else:
-        print(f"Error: Unable to read file {file_path} with any of the tried encodings.")
-        return
-
-    # 继续处理文件内容
-    blocks = split_blocks(content)
-    (vs_data, pool_data, pool_member_data, node_data, monitor_data, persistence_data, profile_data, snatpool_data,
-     route_data,
-     rule_data, auth_date) = extract_pools_vs_nodes(blocks)
-
-    # 生成文件名等
     base_name = os.path.splitext(os.path.basename(file_path))[0]
-    excel_file_name = f"{base_name}.xlsx"
-    txt_file_name = f"{base_name}.txt"
-    txt_file_attention_name = f"{base_name}_attention.txt"
-
-    # 获取源文件的目录
-    source_directory = os.path.dirname(file_path)
-    
-    # 创建output目录
-    output_dir = os.path.join(source_directory, 'output')
+    # 输出到源文件所在目录下的 output 目录
+    output_dir = os.path.join(os.path.dirname(file_path), 'output')
+    if streaming:
+        with open(file_path, 'rb') as file:
+            return stream_txt(file, output_dir, base_name, snat_cidr)
+
+    extracted = load_or_extract(file_path, PARSER_VERSION, lambda: extract_file(file_path), cache_dir)
+    return write_model(extracted, output_dir, base_name, excel, output_workers, shard_by_partition, shard_max_objects,
+                       prune, snat_cidr)
+
+
+def process_content(content, output_dir, base_name, excel=True, output_workers=None, cache_dir=None,
+                    shard_by_partition=False, shard_max_objects=None, prune=True, snat_cidr=False, streaming=False):
+    """
+    处理已在内存中的配置内容（例如直接从 UCS 归档成员读出的 bigip.conf），不需要先写到磁盘再读取。
+    :param content: 配置文件内容（bytes）
+    :param output_dir: 输出目录
+    :param base_name: 输出文件名（不含扩展名）
+    :param excel: 是否输出 Excel 文件
+    :param output_workers: 输出并行生成的进程数（见 process_file）
+    :param cache_dir: 解析缓存目录（见 process_file）
+    :param shard_by_partition: 是否按分区拆分 txt 输出（见 write_model）
+    :param shard_max_objects: txt 分片的最大对象数（见 write_model）
+    :param prune: 是否只翻译 VS 引用的对象（见 write_model）
+    :param snat_cidr: SNAT pool 成员是否按 CIDR 网段输出（见 write_model）
+    :param streaming: 是否使用流式模式，只输出 txt（见 process_file）
+    :return: 各输出的耗时
+    """
+    if streaming:
+        return stream_txt(io.BytesIO(content), output_dir, base_name, snat_cidr)
+
+    extracted = load_or_extract(None, PARSER_VERSION, lambda: extract_pools_vs_nodes(split_blocks(content)),
+                                cache_dir, content=content)
+    return write_model(extracted, output_dir, base_name, excel, output_workers, shard_by_partition, shard_max_objects,
+                       prune, snat_cidr)
+
+
+def write_model(extracted, output_dir, base_name, excel=True, output_workers=None, shard_by_partition=False,
+                shard_max_objects=None, prune=True, snat_cidr=False):
+    """
+    根据提取结果生成 xlsx、txt 和 attention 输出。
+    :param extracted: extract_pools_vs_nodes 的返回值
+    :param output_dir: 输出目录
+    :param base_name: 输出文件名（不含扩展名）
+    :param excel: 是否输出 Excel 文件
+    :param output_workers: 输出并行生成的进程数
+    :param shard_by_partition: 按分区把 txt 输出拆分为多个分片（见 Conf_Shard.write_txt_shards），
+                               分片和按加载顺序排列的索引写到 <output_dir>/<base_name>_shards，代替单个 txt 文件
+    :param shard_max_objects: 每个 txt 分片最多的对象数，设置后同样输出分片
+    :param prune: 只翻译 VS 直接或间接引用的对象（见 Conf_Prune.prune_model），
+                  删除的对象列在 attention 文件末尾；为 False 时翻译全部对象
+    :param snat_cidr: SNAT pool 成员按最少的 CIDR 网段输出（见 write_to_txt），默认按连续的地址范围输出
+    :return: 各输出的耗时 {'xlsx': 秒, 'txt': 秒, 'attention': 秒}
+    """
     os.makedirs(output_dir, exist_ok=True)
 
+    # 对象依赖图只建立一次；裁剪后按裁剪结果重新建立（行号变了）
+    graph = build_graph(extracted)
+    writer_options = {'txt': {'graph': graph, 'snat_cidr': snat_cidr}}
+    if prune:
+        extracted, pruned = prune_model(extracted, graph)
+        if pruned:
+            writer_options['txt']['graph'] = build_graph(extracted)
+            writer_options['attention'] = {'pruned': pruned}
+            print(f"裁剪未引用的对象 {base_name}: " + ", ".join(f"{kind} {len(names)}" for kind, names in pruned.items()))
+
     # 构建完整的文件路径
-    excel_file_path = os.path.join(output_dir, excel_file_name)
-    txt_file_path = os.path.join(output_dir, txt_file_name)
-    txt_file_attention_path = os.path.join(output_dir, txt_file_attention_name)
-
-    # 调用输出到 Excel 和文本文件的函数
-    write_to_excel(excel_file_path, vs_data, pool_data, pool_member_data, node_data, monitor_data, persistence_data,
-                   profile_data, snatpool_data, route_data, rule_data, auth_date)
-    write_to_txt(txt_file_path, vs_data, pool_data, pool_member_data, node_data, monitor_data, persistence_data,
-                 profile_data, snatpool_data, route_data, rule_data, auth_date)
-    write_to_txt_attention(txt_file_attention_path, vs_data, pool_data, pool_member_data, node_data, monitor_data,
-                           persistence_data, profile_data, snatpool_data, route_data, rule_data, auth_date)
+    excel_file_path = os.path.join(output_dir, f"{base_name}.xlsx")
+    txt_file_path = os.path.join(output_dir, f"{base_name}.txt")
+    txt_file_attention_path = os.path.join(output_dir, f"{base_name}_attention.txt")
+
+    # 调用输出到 Excel 和文本文件的函数（三个输出共用同一份只读的提取结果）
+    sharded = shard_by_partition or shard_max_objects
+    outputs = [('attention', txt_file_attention_path)] if sharded else [('txt', txt_file_path),
+                                                                        ('attention', txt_file_attention_path)]
+    if excel:
+        outputs.insert(0, ('xlsx', excel_file_path))
+    timings = write_outputs(outputs, extracted, output_workers, writer_options)
+    if sharded:
+        # 分片数量多，默认用全部 CPU 并行生成
+        start = time.perf_counter()
+        _, rendered, reused = write_txt_shards(extracted, output_dir, base_name, shard_by_partition, shard_max_objects,
+                                               output_workers or os.cpu_count(), snat_cidr,
+                                               writer_options['txt']['graph'])
+        timings['txt'] = time.perf_counter() - start
+        print(f"txt 分片 {base_name}: 生成 {rendered} 个, 复用 {reused} 个")
+    print(f"输出完成 {base_name}: " + ", ".join(f"{kind} {seconds:.2f}s" for kind, seconds in timings.items()))
+    return timings
+
+
+def stream_txt(file, output_dir, base_name, snat_cidr=False):
+    """
+    流式模式：从文件句柄逐块读取配置，分批提取并写出 txt（见 Conf_Stream.stream_to_txt），不输出 xlsx 和 attention
+    :return: 输出的耗时 {'txt': 秒}
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    start = time.perf_counter()
+    count = stream_to_txt(file, os.path.join(output_dir, f"{base_name}.txt"), snat_cidr)
+    timings = {'txt': time.perf_counter() - start}
+    print(f"流式输出完成 {base_name}: {count} 个对象, txt {timings['txt']:.2f}s")
+    return timings
+
+
+def extract_file(file_path, full_paths=False):
+    """分块并提取单个配置文件，返回 extract_pools_vs_nodes 的结果（full_paths 见 extract_pools_vs_nodes）"""
+    # 通过 mmap 只读映射文件，分块时只记录偏移，块文本在提取时才解码（utf-8，失败时按 latin-1）
+    with open(file_path, 'rb') as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return extract_pools_vs_nodes(split_blocks(b''), full_paths)
+        content = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            return extract_pools_vs_nodes(split_blocks(content), full_paths)
+        finally:
+            content.close()
+
+
+def _init_output_worker(model, writer_options):
+    global _worker_model, _worker_options
+    _worker_model = model
+    _worker_options = writer_options
+
+
+def _write_output(kind, path, model=None, options=None):
+    """调用单个输出函数，返回耗时（秒）；model 为 None 时使用子进程中共用的提取结果"""
+    if model is None:
+        model, options = _worker_model, _worker_options.get(kind)
+    start = time.perf_counter()
+    OUTPUT_WRITERS[kind](path, *model, **(options or {}))
+    return time.perf_counter() - start
+
+
+def write_outputs(outputs, model, output_workers=None, writer_options=None):
+    """
+    根据提取结果生成各个输出文件。
+    :param outputs: [(输出类型, 文件路径), ...]，输出类型为 OUTPUT_WRITERS 的键
+    :param model: extract_pools_vs_nodes 的返回值，各输出函数只读不改
+    :param output_workers: 并行生成输出的进程数，None 或 1 表示逐个生成；
+                           提取结果和输出参数通过进程池的 initializer 传给每个子进程一次，不随每个任务重复传递
+    :param writer_options: {输出类型: 额外的关键字参数}，如传给 txt 输出的对象依赖图（只建立一次）
+    :return: {输出类型: 耗时（秒）}
+    """
+    writer_options = writer_options or {}
+    timings = {}
+    if not output_workers or output_workers <= 1 or len(outputs) <= 1:
+        for kind, path in outputs:
+            timings[kind] = _write_output(kind, path, model, writer_options.get(kind))
+        return timings
+
+    with ProcessPoolExecutor(max_workers=min(output_workers, len(outputs)), initializer=_init_output_worker,
+                             initargs=(model, writer_options)) as executor:
+        futures = [(kind, executor.submit(_write_output, kind, path)) for kind, path in outputs]
+        for kind, future in futures:
+            timings[kind] = future.result()
+    return timings
@@ -0,0 +1,149 @@
+'''
+Conf_Cache.py
+'''
+
+import hashlib
+import os
+import pickle
+
+# 缓存目录默认的最大占用空间
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+_CHUNK_SIZE = 1024 * 1024
+_SUFFIX = '.pkl'
+
+
+def file_digest(file_path, parser_version):
+    """
+    计算缓存键：解析器版本 + 文件内容的 SHA-256。
+    解析器版本不同（提取逻辑有改动）时，同一个文件会得到不同的键，旧缓存自然失效。
+    :param file_path: 配置文件路径
+    :param parser_version: 解析器版本标记
+    :return: 十六进制字符串
+    """
+    digest = hashlib.sha256(parser_version.encode() + b'\0')
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def content_digest(content, parser_version):
+    """
+    计算内存中配置内容的缓存键，与 file_digest 对相同内容得到相同的键
+    :param content: 配置文件内容（bytes）
+    :param parser_version: 解析器版本标记
+    :return: 十六进制字符串
+    """
+    digest = hashlib.sha256(parser_version.encode() + b'\0')
+    digest.update(content)
+    return digest.hexdigest()
+
+
+class ParseCache:
+    """
+    提取结果的磁盘缓存：每个键一个 pickle（protocol 5）文件。
+    以文件的修改时间作为最近使用时间，超过 max_bytes 时删除最久未使用的文件（LRU）。
+    """
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + _SUFFIX)
+
+    def get(self, key):
+        """
+        读取缓存的提取结果，不存在或文件损坏时返回 None。
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as file:
+                model = pickle.load(file)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"解析缓存损坏，已忽略 {path}: {e}")
+            self._remove(path)
+            return None
+
+        # 更新修改时间，作为最近使用时间
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return model
+
+    def put(self, key, model):
+        """
+        写入提取结果（先写临时文件再替换，避免并行处理时读到写了一半的文件），然后按容量淘汰旧缓存。
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as file:
+                pickle.dump(model, file, protocol=5)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"无法写入解析缓存 {path}: {e}")
+            self._remove(tmp_path)
+            return
+        self.evict()
+
+    def evict(self):
+        """删除最久未使用的缓存文件，直到总大小不超过 max_bytes"""
+        entries = []
+        total = 0
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return
+        for name in names:
+            if not name.endswith(_SUFFIX):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def load_or_extract(file_path, parser_version, extract, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES, content=None):
+    """
+    有缓存时直接返回缓存的提取结果（跳过分块和提取），否则调用 extract() 并写入缓存。
+    :param file_path: 配置文件路径（传入 content 时不读取文件，可以为 None）
+    :param parser_version: 解析器版本标记
+    :param extract: 无参数的函数，返回提取结果（返回 None 表示提取失败，不写入缓存）
+    :param cache_dir: 缓存目录，为 None 时不使用缓存
+    :param max_bytes: 缓存目录的最大占用空间
+    :param content: 已在内存中的配置内容（bytes），用它计算缓存键
+    :return: 提取结果
+    """
+    if not cache_dir:
+        return extract()
+
+    cache = ParseCache(cache_dir, max_bytes)
+    key = content_digest(content, parser_version) if content is not None else file_digest(file_path, parser_version)
+    model = cache.get(key)
+    if model is None:
+        model = extract()
+        if model is not None:
+            cache.put(key, model)
+    return model
@@ -1,10 +1,56 @@
 import re
 
+from .Conf_Parse import parse_block
+
+# 解析器版本：提取逻辑或返回结构有变化时需要修改，使旧的解析缓存失效
+PARSER_VERSION = 'conf-extract-3'
+
+# 以下正则只作用于单个属性值，不再扫描整个配置块
+_DIGITS = re.compile(r'\d+')
+_DIGITS_OPT = re.compile(r'\d*')
+_WORD = re.compile(r'\w+')
+_NON_SPACE = re.compile(r'\S+')
+_IPV4_CHARS = re.compile(r'[\d.]+')
+_SOURCE_CHARS = re.compile(r'[\d./]+')
+_ADDRESS_CHARS = re.compile(r'[\w.:]+')
+_NETWORK_CHARS = re.compile(r'[\w.:/-]+')
+_RECV_CHARS = re.compile(r'[\w" ]+')
+_PATH_NAME = re.compile(r'/([^\s]+)/+([^\s}]+)')
+_PATH_WORD = re.compile(r'/([^\s]+)/(\w+)')
+_VS_DESTINATION = re.compile(r'/([^\s]+)/([\w:.]+)[:.](\d+)')
+_MEMBER_PORT = re.compile(r'[:.](\d+)$')
+_SNATPOOL_MEMBER = re.compile(r'/([^\s]+)/([\w.:]+)')
+_MEMBER_SETTING_KEYS = ('monitor', 'ratio', 'session')
+
+
+def _match_group(pattern, value, group):
+    """
+    在属性值开头匹配正则并返回指定分组，属性不存在或不匹配时返回空字符串。
+    """
+    if value is None:
+        return ''
+    match = pattern.match(value)
+    return match.group(group) if match else ''
+
+
+def _reference(pattern, value, full_paths):
+    """
+    提取属性值中引用的对象：默认只返回名称；full_paths 为 True 时返回 /分区/[目录/]名称 的完整路径，
+    合并多个分区时按路径中的分区解析引用（见 Conf_Partition.merge_models）
+    """
+    if value is None:
+        return ''
+    match = pattern.match(value)
+    if not match:
+        return ''
+    return match.group(0) if full_paths else match.group(2)
 
-def extract_pools_vs_nodes(blocks):
+
+def extract_pools_vs_nodes(blocks, full_paths=False):
     """
     从配置块中提取Virtual Server、Pool和Node信息。
-    :param blocks: 配置块列表
+    :param blocks: split_blocks 返回的块描述符列表
+    :param full_paths: 引用其他对象的列（vs_pool_name、pool_monitor、defaults-from 等）是否保留完整路径
     :return: 包含信息的字典
     """
     # 创建一个空的字典
@@ -26,8 +72,8 @@ def extract_pools_vs_nodes(blocks):
                     }
     persistence_data = {'persistence_name': [], 'persistence_protocol': [], 'persistence_defaults-from': [],
                         'persistence_timeout': []}
-    profile_data = {'profile_name': [], 'profile_protocol': [], 'profile_xff': [], 'profile_defaults-from': [],
-                    'profile_idle_timeout': []}
+    profile_data = {'profile_partition': [], 'profile_name': [], 'profile_protocol': [], 'profile_xff': [],
+                    'profile_defaults-from': [], 'profile_idle_timeout': []}
     snatpool_data = {'snatpool_name': [], 'snatpool_partition': [], 'snatpool_member': []}
     route_data = {'route_name': [], 'route_network': [], 'route_gateway': [], 'route_gateway_pool': []}
     rule_data = {'rule_name': [], 'rule_info': []}
@@ -41,78 +87,49 @@ def extract_pools_vs_nodes(blocks):
 
                 if block.startswith('auth source ') or block.startswith('auth tacacs ') or block.startswith(
                         'auth radius-server '):
-                    combined_auth_block += block + "\n"
+                    combined_auth_block += block.text + "\n"
 
             elif block.startswith('ltm virtual '):
-                # 使用正则表达式提取vs_name
-                vs_name_match = re.search(r'ltm virtual /([^\s]+)/+([^\s{]+)', block)
-                if vs_name_match:
-                    vs_partition = vs_name_match.group(1).strip()
-                    vs_name = vs_name_match.group(2).strip()
-
-                    # 使用正则表达式提取vs_ip_add和vs_ip_port
-                    vs_connection_limit_match = re.search(r'connection-limit (\d*)', block)
-                    vs_connection_limit = vs_connection_limit_match.group(1) if vs_connection_limit_match else ''
-
-                    # 使用正则表达式提取vs_ip_add和vs_ip_port
-                    vs_ip_match = re.search(r'destination /([^\s]+)/([\w:.]+)[:.](\d+)', block)
+                vs = parse_block(block.text)
+                if vs.path:
+                    vs_partition = vs.partition.strip()
+                    vs_name = vs.name.strip()
+
+                    # 提取vs_connection_limit
+                    vs_connection_limit = _match_group(_DIGITS_OPT, vs.get('connection-limit'), 0)
+
+                    # 提取vs_ip_add和vs_ip_port
+                    vs_ip_match = _VS_DESTINATION.match(vs.get('destination'))
                     vs_ip_add = vs_ip_match.group(2) if vs_ip_match else ''
                     vs_ip_port = vs_ip_match.group(3) if vs_ip_match else ''
 
-                    # 使用正则表达式提取vs_disabled
-                    # vs_disabled_match = re.search(r'disabled\n', block)
-                    vs_disabled_match = re.search(r'^\s*disabled$', block, re.MULTILINE)
-                    vs_disabled = "disabled" if vs_disabled_match else ''
-
-                    # 使用正则表达式提取vs_protocol
-                    vs_protocol_match = re.search(r'ip-protocol (\S+)', block)
-                    vs_protocol = vs_protocol_match.group(1) if vs_protocol_match else ''
-
-                    # 使用正则表达式提取vs_protocol
-                    vs_ip_forward_match = re.search(r'\n    (ip-forward)\n', block)
-                    vs_ip_forward = vs_ip_forward_match.group(1) if vs_ip_forward_match else ''
-
-                    # 使用正则表达式提取vs_mask
-                    vs_mask_match = re.search(r'mask\s+([\d.]+)', block)
-                    vs_mask = vs_mask_match.group(1) if vs_mask_match else ''
-
-                    # 使用正则表达式提取vs_pool_name
-                    vs_pool_name_match = re.search(r'pool /([^\s]+)/+([^\s}]+)', block)
-                    vs_pool_name = vs_pool_name_match.group(2).strip() if vs_pool_name_match else ''
-
-                    # 使用正则表达式提取vs_source
-                    vs_source_match = re.search(r'source\s+([\d./]+)', block)
-                    vs_source = vs_source_match.group(1) if vs_source_match else ''
-
-                    # 使用正则表达式提取translate-address
-                    translate_address_match = re.search(r'translate-address\s+(\w+)', block)
-                    translate_address = translate_address_match.group(1) if translate_address_match else ''
-
-                    # 使用正则表达式提取translate-port
-                    translate_port_match = re.search(r'translate-port\s+(\w+)', block)
-                    translate_port = translate_port_match.group(1) if translate_port_match else ''
-
-                    # 使用正则表达式提取vs_source-address-translation
-                    vs_source_translation_match = re.findall(r'source-address-translation\s+\{([\s\S]*?)\n    \}\n',
-                                                             block, re.DOTALL)
-                    vs_source_translation_matches = [re.sub(r'\n\s+', '\n', line) for line in
-                                                     vs_source_translation_match]
-                    vs_source_translation = '\n'.join(vs_source_translation_matches)
-
-                    # 使用正则表达式提取profiles块
-                    vs_profiles_match = re.findall(r'profiles\s+\{([\s\S]*?)\n    \}\n', block, re.DOTALL)
-                    vs_profiles_matches = [re.sub(r'\n\s+', '\n', line) for line in vs_profiles_match]
-                    vs_profiles = '\n'.join(vs_profiles_matches)
-
-                    # 使用正则表达式提取rules块
-                    vs_rule_match = re.findall(r'rules\s+\{([\s\S]*?)\n    \}\n', block, re.DOTALL)
-                    vs_rule_matches = [re.sub(r'\n\s+', '\n', line) for line in vs_rule_match]
-                    vs_rule = '\n'.join(vs_rule_matches)
-
-                    # 使用正则表达式提取vs_persist
-                    vs_persist_match = re.findall(r'persist\s+\{([\s\S]*?)\n    \}\n', block, re.DOTALL)
-                    vs_persist_matches = [re.sub(r'\n\s+', '\n', line) for line in vs_persist_match]
-                    vs_persist = '\n'.join(vs_persist_matches)
+                    # 提取vs_disabled
+                    vs_disabled = "disabled" if 'disabled' in vs.items else ''
+
+                    # 提取vs_protocol
+                    vs_protocol = _match_group(_NON_SPACE, vs.get('ip-protocol'), 0)
+
+                    # 提取vs_ip_forward
+                    vs_ip_forward = 'ip-forward' if 'ip-forward' in vs.items else ''
+
+                    # 提取vs_mask
+                    vs_mask = _match_group(_IPV4_CHARS, vs.get('mask'), 0)
+
+                    # 提取vs_pool_name
+                    vs_pool_name = _reference(_PATH_NAME, vs.get('pool'), full_paths).strip()
+
+                    # 提取vs_source
+                    vs_source = _match_group(_SOURCE_CHARS, vs.get('source'), 0)
+
+                    # 提取translate-address和translate-port
+                    translate_address = _match_group(_WORD, vs.get('translate-address'), 0)
+                    translate_port = _match_group(_WORD, vs.get('translate-port'), 0)
+
+                    # 提取source-address-translation、profiles、rules、persist块（每行去掉缩进）
+                    vs_source_translation = vs.section_text('source-address-translation')
+                    vs_profiles = vs.section_text('profiles')
+                    vs_rule = vs.section_text('rules')
+                    vs_persist = vs.section_text('persist')
 
                     vs_data['vs_partition'].append(vs_partition)
                     vs_data['vs_name'].append(vs_name)
@@ -134,22 +151,24 @@ def extract_pools_vs_nodes(blocks):
 
             elif block.startswith('ltm pool '):
                 # 1. 提取 pool 基本信息
-                pool_name_match = re.search(r'ltm pool /([^\s]+)/+([^\s{]+)', block)
-                if pool_name_match:
-                    pool_partition = pool_name_match.group(1).strip()
-                    pool_name = pool_name_match.group(2).strip()
+                pool = parse_block(block.text)
+                if pool.path:
+                    pool_partition = pool.partition.strip()
+                    pool_name = pool.name.strip()
 
-                    # 使用正则表达式提取load-balancing-mode信息
-                    lbm_match = re.search(r'load-balancing-mode\s+(\S+)', block)
-                    pool_lbm = lbm_match.group(1).strip() if lbm_match else ''
+                    # 提取load-balancing-mode信息
+                    pool_lbm = _match_group(_NON_SPACE, pool.get('load-balancing-mode'), 0).strip()
 
                     # 提取 pool 默认 monitor（默认空）
-                    monitor_match = re.search(r'\n\s{4}monitor /([^\s]+)/+([^\s}]+)', block)
-                    pool_monitor = monitor_match.group(2) if monitor_match else ''
+                    pool_monitor = _reference(_PATH_NAME, pool.get('monitor'), full_paths)
 
                     # 2. 提取所有 members
-                    member_pattern = r'/([^\s]+)/([\w:.]+)[:.](\d+)\s*{\s*address ([\w:.]+)([^}]*)\}'
-                    member_matches = re.finditer(member_pattern, block, re.DOTALL)
+                    members_node = pool.section('members')
+                    member_nodes = members_node.children if members_node is not None else []
+
+                    # member 中有独立配置（monitor/ratio/session）时才需要逐个记录 member
+                    has_member_settings = any(
+                        key in member.attrs for member in member_nodes for key in _MEMBER_SETTING_KEYS)
 
                     pool_members = []
 
@@ -160,33 +179,34 @@ def extract_pools_vs_nodes(blocks):
                     pool_data['pool_members'].append(pool_members)
                     pool_data['pool_monitor'].append(pool_monitor)
 
-                    for member in member_matches:
-                        member_ip = member.group(4)
-                        member_port = member.group(3)
-                        member_details = member.group(5)  # member 的详细配置（ratio/monitor/session）
+                    for member in member_nodes:
+                        member_port_match = _MEMBER_PORT.search(member.kind)
+                        member_ip_match = _ADDRESS_CHARS.match(member.get('address'))
+                        if not (member_port_match and member_ip_match):
+                            continue
+                        member_ip = member_ip_match.group(0)
+                        member_port = member_port_match.group(1)
 
                         # 3. 提取 member 独立属性（如果没有则用 pool 默认值）
                         # (a) 提取 ratio（默认 1）
-                        ratio_match = re.search(r'ratio\s+(\d+)', member_details)
-                        member_ratio = ratio_match.group(1) if ratio_match else ''
+                        member_ratio = _match_group(_DIGITS, member.get('ratio'), 0)
 
                         # (b) 提取 monitor（默认用 pool 的 monitor）
-                        member_monitor_match = re.search(r'            monitor /([^\s]+)/+([^\s}]+)', member_details)
-                        member_monitor = member_monitor_match.group(2) if member_monitor_match else ""
+                        member_monitor = _reference(_PATH_NAME, member.get('monitor'), full_paths)
 
                         # (c) 提取 session 状态（默认 user-enabled）
-                        session_match = re.search(r'session\s+(\S+)', member_details)
-                        member_session = session_match.group(1) if session_match else ''
+                        member_session = _match_group(_NON_SPACE, member.get('session'), 0)
 
                         # 4. 添加到 pool_members 列表
                         pool_members.append(f'member {member_ip}:{member_port}')
 
-                        if "            monitor" in block or "            ratio" in block or "            session" in block:
+                        if has_member_settings:
                             # 5. 填充 pool_member_data（每个 member 单独一行）
                             pool_member_data['pool_name'].append(pool_name)
                             pool_member_data['pool_lbm'].append(pool_lbm)
                             pool_member_data['pool_monitor'].append(pool_monitor)
-                            pool_member_data['pool_members'].append(pool_members.copy())  # 当前所有 members
+                            # 只记录当前 member，所属 pool 通过 pool_name 关联（完整列表见 pool_data），避免逐行复制列表
+                            pool_member_data['pool_members'].append(pool_members[-1])
                             pool_member_data['pool_member_ip'].append(member_ip)
                             pool_member_data['pool_member_port'].append(member_port)
                             pool_member_data['pool_member_ratio'].append(member_ratio)
@@ -195,65 +215,44 @@ def extract_pools_vs_nodes(blocks):
 
 
             elif block.startswith('ltm node '):
-                # 使用正则表达式提取node_ip
-                node_ip_match = re.search(r'address\s+([\S.:]+)', block)
-                node_ip = node_ip_match.group(1) if node_ip_match else ''
+                # 提取node_ip
+                node = parse_block(block.text)
+                node_ip = _match_group(_NON_SPACE, node.get('address'), 0)
                 node_data['node_ip'].append(node_ip)
 
             elif block.startswith('ltm monitor '):
+                monitor = parse_block(block.text)
+
+                # 提取 monitor_protocol 和 monitor_name
+                monitor_protocol = monitor.kind.split()[2] if monitor.path and monitor.kind.count(' ') == 2 else ''
+                monitor_name = monitor.name if monitor_protocol else ''
+
+                # 提取 monitor_defaults-from
+                monitor_defaults_from = _reference(_PATH_WORD, monitor.get('defaults-from'), full_paths)
+
+                # 提取 monitor_destination
+                monitor_destination = monitor.get('destination')
+
+                # 提取 monitor_interval、monitor_ip-dscp
+                monitor_interval = _match_group(_DIGITS, monitor.get('interval'), 0)
+                monitor_ip_dscp = _match_group(_DIGITS, monitor.get('ip-dscp'), 0)
+
+                # 提取 monitor_recv 和 monitor_recv-disable
+                monitor_recv = _match_group(_RECV_CHARS, monitor.get('recv'), 0)
+                monitor_recv_disable = _match_group(_RECV_CHARS, monitor.get('recv-disable'), 0)
+
+                # 提取 monitor_send：提取send到换行之间的内容
+                monitor_send = monitor.get('send')
+
+                # 提取 monitor_time-until-up 和 monitor_timeout
+                monitor_time_until_up = _match_group(_DIGITS, monitor.get('time-until-up'), 0)
+                monitor_timeout = _match_group(_DIGITS, monitor.get('timeout'), 0)
 
-                # 使用正则表达式提取 monitor_protocol 和 monitor_name
-                monitor_info_match = re.search(r'ltm monitor ([\w-]+) /([^\s]+)/([^\s{]+)', block)
-                monitor_protocol = monitor_info_match.group(1) if monitor_info_match else ''
-                monitor_name = monitor_info_match.group(3) if monitor_info_match else ''
-
-                # 使用正则表达式提取 monitor_defaults-from
-                monitor_defaults_from_match = re.search(r'defaults-from /([^\s]+)/(\w+)', block)
-                monitor_defaults_from = monitor_defaults_from_match.group(2) if monitor_defaults_from_match else ''
-
-                # 使用正则表达式提取 monitor_destination
-                monitor_destination_match = re.search(r'destination ([^\n]+)', block)
-                monitor_destination = monitor_destination_match.group(1) if monitor_destination_match else ''
-
-                # 使用正则表达式提取 monitor_interval
-                monitor_interval_match = re.search(r'interval (\d+)', block)
-                monitor_interval = monitor_interval_match.group(1) if monitor_interval_match else ''
-
-                # 使用正则表达式提取 monitor_ip-dscp
-                monitor_ip_dscp_match = re.search(r'ip-dscp (\d+)', block)
-                monitor_ip_dscp = monitor_ip_dscp_match.group(1) if monitor_ip_dscp_match else ''
-
-                # 使用正则表达式提取 monitor_recv
-                monitor_recv_match = re.search(r'recv ([\w" ]+)', block)
-                monitor_recv = monitor_recv_match.group(1) if monitor_recv_match else ''
-
-                # 使用正则表达式提取 monitor_recv-disable
-                monitor_recv_disable_match = re.search(r'recv-disable ([\w" ]+)', block)
-                monitor_recv_disable = monitor_recv_disable_match.group(1) if monitor_recv_disable_match else ''
-
-                # 使用正则表达式提取 monitor_send：提取send到换行之间的内容
-                monitor_send_match = re.search(r'send ([^\n]+)', block)
-                monitor_send = monitor_send_match.group(1) if monitor_send_match else ''
-
-                # 使用正则表达式提取 monitor_time-until-up
-                monitor_time_until_up_match = re.search(r'time-until-up (\d+)', block)
-                monitor_time_until_up = monitor_time_until_up_match.group(1) if monitor_time_until_up_match else ''
-
-                # 使用正则表达式提取 monitor_timeout
-                monitor_timeout_match = re.search(r'timeout (\d+)', block)
-                monitor_timeout = monitor_timeout_match.group(1) if monitor_timeout_match else ''
-
-                # 使用正则表达式提取 monitor_DNS
-                monitor_dns_qname_match = re.search(r'qname (\S+)', block)
-                monitor_dns_qname = monitor_dns_qname_match.group(1) if monitor_dns_qname_match else ''
-                monitor_dns_qtype_match = re.search(r'qtype (\S+)', block)
-                monitor_dns_qtype = monitor_dns_qtype_match.group(1) if monitor_dns_qtype_match else ''
-                monitor_dns_accept_rcode_match = re.search(r'accept-rcode (\S+)', block)
-                monitor_dns_accept_rcode = monitor_dns_accept_rcode_match.group(
-                    1) if monitor_dns_accept_rcode_match else ''
-                monitor_dns_answer_contains_match = re.search(r'accept-rcode (\S+)', block)
-                monitor_dns_answer_contains = monitor_dns_answer_contains_match.group(
-                    1) if monitor_dns_answer_contains_match else ''
+                # 提取 monitor_DNS
+                monitor_dns_qname = _match_group(_NON_SPACE, monitor.get('qname'), 0)
+                monitor_dns_qtype = _match_group(_NON_SPACE, monitor.get('qtype'), 0)
+                monitor_dns_accept_rcode = _match_group(_NON_SPACE, monitor.get('accept-rcode'), 0)
+                monitor_dns_answer_contains = monitor_dns_accept_rcode
 
                 monitor_data['monitor_protocol'].append(monitor_protocol)
                 monitor_data['monitor_name'].append(monitor_name)
@@ -272,17 +271,15 @@ def extract_pools_vs_nodes(blocks):
                 monitor_data['monitor_dns_answer_contains'].append(monitor_dns_answer_contains)
 
             elif block.startswith('ltm persistence '):
-                # 使用正则表达式提取 persistence_protocol 和 persistence_name
-                persistence_info_match = re.search(r'ltm persistence +([^\s{]+) /([^\s]+)/+([^\s{]+)', block)
-                persistence_protocol = persistence_info_match.group(1) if persistence_info_match else ''
-                persistence_name = persistence_info_match.group(3) if persistence_info_match else ''
+                persistence = parse_block(block.text)
 
-                persistence_defaults_from_match = re.search(r'defaults-from /([^\s]+)/(\w+)', block)
-                persistence_defaults_from = persistence_defaults_from_match.group(
-                    2) if persistence_defaults_from_match else ''
+                # 提取 persistence_protocol 和 persistence_name
+                persistence_protocol = persistence.kind.split()[2] if persistence.path and persistence.kind.count(
+                    ' ') == 2 else ''
+                persistence_name = persistence.name if persistence_protocol else ''
 
-                persistence_timeout_match = re.search(r'timeout (\d+)', block)
-                persistence_timeout = persistence_timeout_match.group(1) if persistence_timeout_match else ''
+                persistence_defaults_from = _reference(_PATH_WORD, persistence.get('defaults-from'), full_paths)
+                persistence_timeout = _match_group(_DIGITS, persistence.get('timeout'), 0)
 
                 # 将提取的信息添加到 persistence_data 中
                 persistence_data['persistence_protocol'].append(persistence_protocol)
@@ -290,43 +287,40 @@ def extract_pools_vs_nodes(blocks):
                 persistence_data['persistence_defaults-from'].append(persistence_defaults_from)
                 persistence_data['persistence_timeout'].append(persistence_timeout)
 
-                # 根据你的需要存储或在 Excel 中显示这些信息
-
             elif block.startswith('ltm profile '):
-                # 使用正则表达式提取 profile_protocol 和 profile_name
-                profile_info_match = re.search(r'ltm profile +([^\s{]+) /([^\s]+)/+([^\s{]+)', block)
-
-                profile_protocol = profile_info_match.group(1) if profile_info_match else ''
-                profile_name = profile_info_match.group(3) if profile_info_match else ''
+                profile = parse_block(block.text)
 
-                profile_defaults_from_match = re.search(r'defaults-from /([^\s]+)/(\w+)', block)
-                profile_defaults_from = profile_defaults_from_match.group(
-                    2) if profile_defaults_from_match else ''
+                # 提取 profile_protocol、分区和 profile_name
+                profile_protocol = profile.kind.split()[2] if profile.path and profile.kind.count(' ') == 2 else ''
+                profile_partition = profile.partition.strip() if profile_protocol else ''
+                profile_name = profile.name if profile_protocol else ''
 
-                profile_idle_timeout_match = re.search(r'idle-timeout (\d+)', block)
-                profile_idle_timeout = profile_idle_timeout_match.group(1) if profile_idle_timeout_match else ''
-
-                profile_xff_match = re.search(r'insert-xforwarded-for (\w+)', block)
-                profile_xff = profile_xff_match.group(1) if profile_xff_match else ''
+                profile_defaults_from = _reference(_PATH_WORD, profile.get('defaults-from'), full_paths)
+                profile_idle_timeout = _match_group(_DIGITS, profile.get('idle-timeout'), 0)
+                profile_xff = _match_group(_WORD, profile.get('insert-xforwarded-for'), 0)
 
                 # 将提取的信息添加到 profile_data 中
                 profile_data['profile_protocol'].append(profile_protocol)
+                profile_data['profile_partition'].append(profile_partition)
                 profile_data['profile_name'].append(profile_name)
                 profile_data['profile_defaults-from'].append(profile_defaults_from)
                 profile_data['profile_idle_timeout'].append(profile_idle_timeout)
                 profile_data['profile_xff'].append(profile_xff)
 
-                # 存储或在 Excel 中显示这些信息，根据你的需要
-
             elif block.startswith('ltm snatpool '):
                 # 提取分区和名称
-                snatpool_info_match = re.search(r'ltm snatpool /([^\s]+)/+([^\s{]+)', block)
-                snatpool_partition = snatpool_info_match.group(1) if snatpool_info_match else ''
-                snatpool_name = snatpool_info_match.group(2) if snatpool_info_match else ''
-
-                # 提取成员信息
-                snatpool_member_matches = re.findall(r'    /([^\s]+)/([\w.:]+)', block, re.DOTALL)
-                snatpool_member = [member[1] for member in snatpool_member_matches]  # 只提取成员地址
+                snatpool = parse_block(block.text)
+                snatpool_partition = snatpool.partition
+                snatpool_name = snatpool.name
+
+                # 提取成员信息（只提取成员地址）
+                members_node = snatpool.section('members')
+                snatpool_member = []
+                if members_node is not None:
+                    for item in members_node.items:
+                        member_match = _SNATPOOL_MEMBER.match(item)
+                        if member_match:
+                            snatpool_member.append(member_match.group(2))
 
                 # 添加到数据结构
                 snatpool_data['snatpool_partition'].append(snatpool_partition)
@@ -334,17 +328,12 @@ def extract_pools_vs_nodes(blocks):
                 snatpool_data['snatpool_member'].append(snatpool_member)
 
             elif block.startswith('net route '):
-                route_name_match = re.search(r'net route /(\S+)/+([^\s{]+)', block)
-                route_name = route_name_match.group(2) if route_name_match else ''
-
-                route_gateway_match = re.search(r'gw ([\w.:]+)', block)
-                route_gateway = route_gateway_match.group(1) if route_gateway_match else ''
+                route = parse_block(block.text)
+                route_name = route.name
 
-                route_gateway_pool_match = re.search(r'pool /(\S+)/+(\S+)', block)
-                route_gateway_pool = route_gateway_pool_match.group(2) if route_gateway_pool_match else ''
-
-                route_network_match = re.search(r'network ([\w.:/-]+)', block)
-                route_network = route_network_match.group(1) if route_network_match else ''
+                route_gateway = _match_group(_ADDRESS_CHARS, route.get('gw'), 0)
+                route_gateway_pool = _reference(_PATH_NAME, route.get('pool'), full_paths)
+                route_network = _match_group(_NETWORK_CHARS, route.get('network'), 0)
 
                 route_data['route_name'].append(route_name)
                 route_data['route_network'].append(route_network)
@@ -352,11 +341,12 @@ def extract_pools_vs_nodes(blocks):
                 route_data['route_gateway_pool'].append(route_gateway_pool)
 
             elif block.startswith('ltm rule '):
-                rule_name_match = re.search(r'ltm rule /([^\s]+)/+([^\s{]+)', block)
-                rule_name = rule_name_match.group(2) if rule_name_match else ''
-
-                rule_info_match = re.search(r'ltm rule /([^\s]+)/(.*)', block, re.DOTALL)
-                rule_info = rule_info_match.group(2) if rule_info_match else ''
+                # iRule 内容不按 tmsh 语法解析，直接使用对象头之后的原始文本
+                rule_text = block.text
+                rule = parse_block(rule_text)
+                rule_name = rule.name
+                rule_info = (rule_text[rule_text.index(rule.path) + len(rule.path) - len(rule.name):]
+                             if rule.path else '')
 
                 rule_data['rule_name'].append(rule_name)
                 rule_data['rule_info'].append(rule_info)
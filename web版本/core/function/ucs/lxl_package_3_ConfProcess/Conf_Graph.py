@@ -0,0 +1,200 @@
+'''
+Conf_Graph.py
+'''
+
+import re
+from collections import deque
+
+# VS 配置原文中对 /Common/ 下对象的引用（与 write_to_txt 原来使用的正则一致）
+_COMMON_REF = re.compile(r'/Common/+?([^\s{]+)')
+_SNATPOOL_REF = re.compile(r'pool /Common/+([^\s{]+)')
+# 配置原文中任意分区的对象路径 /分区/[目录/]名称，名称取最后一段（与 Conf_Extract 的 _PATH_NAME 一致）
+OBJECT_PATH = re.compile(r'/([\w.-]+)/(?:[\w.-]+/)*([\w.:%-]+)')
+# iRule 中按名称引用的对象：pool/snatpool/node <名称或路径>（$变量和 [命令] 不是对象名称）。
+# iRule 的 persist 命令后面是会话保持方式（persist source_addr 1800、persist cookie insert、persist uie <键>），
+# 不引用 persistence 对象
+IRULE_REF = re.compile(r'(?<![\w$:.-])(pool|snatpool|node)[ \t]+(/?[\w.:%-]+(?:/[\w.:%-]+)*)')
+
+# 有定义的对象：(类型, 提取结果中的位置, 名称列)
+_DEFINED_OBJECTS = (
+    ('virtual', 0, 'vs_name'),
+    ('pool', 1, 'pool_name'),
+    ('node', 3, 'node_ip'),
+    ('monitor', 4, 'monitor_name'),
+    ('persistence', 5, 'persistence_name'),
+    ('profile', 6, 'profile_name'),
+    ('snatpool', 7, 'snatpool_name'),
+    ('route', 8, 'route_name'),
+    ('rule', 9, 'rule_name'),
+)
+# iRule 命令引用的对象类型
+_IRULE_KINDS = {'pool': 'pool', 'snatpool': 'snatpool', 'node': 'node'}
+# 同类型对象之间的继承：(类型, 提取结果中的位置, defaults-from 列)
+_DEFAULTS_FROM = (
+    ('monitor', 4, 'monitor_defaults-from'),
+    ('persistence', 5, 'persistence_defaults-from'),
+    ('profile', 6, 'profile_defaults-from'),
+)
+
+
+class ConfGraph:
+    """
+    对象依赖图：每个对象一个整数 ID，按 ID 保存类型、名称、在提取结果中的行号、
+    依赖的对象（邻接表）和依赖它的对象（反向边）。
+    VS → pool → member → node/monitor，VS → profile/persistence/snatpool/iRule，route → pool，
+    monitor/persistence/profile → defaults-from，iRule → 其中按名称引用的 pool/snatpool/node。
+    配置中引用了但没有定义的对象（如系统自带的 tcp、http profile）也有 ID，行号为 None。
+    """
+
+    def __init__(self):
+        self.kinds = []
+        self.names = []
+        self.rows = []
+        self.edges = []
+        self.reverse = []
+        self._ids = {}
+        self._row_ids = {}
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def add(self, kind, name, row=None):
+        """添加对象并返回 ID；同名对象以第一个为准（与 list.index 的查找结果一致）"""
+        node = len(self.kinds)
+        self.kinds.append(kind)
+        self.names.append(name)
+        self.rows.append(row)
+        self.edges.append([])
+        self.reverse.append([])
+        self._ids.setdefault((kind, name), node)
+        if row is not None:
+            self._row_ids.setdefault(kind, []).append(node)
+        return node
+
+    def find(self, kind, name):
+        """按类型和名称查找对象 ID，不存在时返回 None"""
+        return self._ids.get((kind, name))
+
+    def ref(self, kind, name):
+        """引用对象：已存在时返回其 ID，否则添加一个没有定义的对象"""
+        node = self._ids.get((kind, name))
+        return self.add(kind, name) if node is None else node
+
+    def row_id(self, kind, row):
+        """提取结果中某一行对应的对象 ID"""
+        return self._row_ids[kind][row]
+
+    def row_of(self, kind, name):
+        """按名称查找对象在提取结果中的行号，没有定义时返回 None"""
+        node = self._ids.get((kind, name))
+        return None if node is None else self.rows[node]
+
+    def link(self, source, target):
+        """添加依赖 source → target，同一条边只记录一次，邻接表保持引用的先后顺序"""
+        if target not in self.edges[source]:
+            self.edges[source].append(target)
+            self.reverse[target].append(source)
+
+    def targets(self, node, kind=None):
+        """node 直接依赖的对象 ID（可按类型过滤）"""
+        return [target for target in self.edges[node] if kind is None or self.kinds[target] == kind]
+
+    def target_names(self, node, kind):
+        """node 直接依赖的某类对象的名称，按配置中引用的顺序"""
+        return [self.names[target] for target in self.edges[node] if self.kinds[target] == kind]
+
+    def dependents(self, node, kind=None):
+        """直接依赖 node 的对象 ID（可按类型过滤）"""
+        return [source for source in self.reverse[node] if kind is None or self.kinds[source] == kind]
+
+    def affected(self, node, kind='virtual'):
+        """
+        沿反向边找出直接或间接依赖 node 的某类对象，例如删除一个 monitor 后受影响的 VS
+        :return: 对象 ID 列表（按发现顺序）
+        """
+        seen = {node}
+        queue = deque([node])
+        found = []
+        while queue:
+            for source in self.reverse[queue.popleft()]:
+                if source not in seen:
+                    seen.add(source)
+                    queue.append(source)
+                    if self.kinds[source] == kind:
+                        found.append(source)
+        return found
+
+
+def _link_name(graph, source, kind, name):
+    if name:
+        graph.link(source, graph.ref(kind, name))
+
+
+def _link_irule(graph, rule, rule_info):
+    """iRule 内容中的 pool/snatpool/node 引用，只连接到有定义的对象（iRule 中同名的变量、字符串不是引用）"""
+    for match in IRULE_REF.finditer(rule_info):
+        kind = _IRULE_KINDS[match.group(1)]
+        name = match.group(2).rsplit('/', 1)[-1]
+        target = graph.find(kind, name)
+        if target is None and kind == 'node':
+            # node <地址>:<端口>
+            target = graph.find(kind, name.rsplit(':', 1)[0])
+        if target is not None and graph.rows[target] is not None:
+            graph.link(rule, target)
+
+
+def build_graph(model):
+    """
+    根据提取结果建立对象依赖图，每份配置只建立一次，供各输出函数共用。
+    :param model: extract_pools_vs_nodes 的返回值
+    :return: ConfGraph
+    """
+    vs_data, pool_data, pool_member_data = model[0], model[1], model[2]
+    graph = ConfGraph()
+
+    for kind, position, column in _DEFINED_OBJECTS:
+        for row, name in enumerate(model[position][column]):
+            graph.add(kind, name, row)
+
+    # pool → member → node；member 以 "pool 名称 + IP:端口" 命名
+    for pool_row, members in enumerate(pool_data['pool_members']):
+        pool = graph.row_id('pool', pool_row)
+        pool_name = pool_data['pool_name'][pool_row]
+        _link_name(graph, pool, 'monitor', pool_data['pool_monitor'][pool_row])
+        for member in members:
+            address = member.split(' ', 1)[-1]
+            member_node = graph.ref('member', f'{pool_name} {address}')
+            graph.link(pool, member_node)
+            graph.link(member_node, graph.ref('node', address.rsplit(':', 1)[0]))
+
+    # 有独立配置的 member：行号和 member 自己的 monitor
+    for row, (pool_name, member_ip, member_port, member_monitor) in enumerate(zip(
+            pool_member_data['pool_name'], pool_member_data['pool_member_ip'],
+            pool_member_data['pool_member_port'], pool_member_data['pool_member_monitor'])):
+        member_node = graph.ref('member', f'{pool_name} {member_ip}:{member_port}')
+        if graph.rows[member_node] is None:
+            graph.rows[member_node] = row
+        _link_name(graph, member_node, 'monitor', member_monitor)
+
+    for kind, position, column in _DEFAULTS_FROM:
+        for row, parent in enumerate(model[position][column]):
+            _link_name(graph, graph.row_id(kind, row), kind, parent)
+
+    for row, pool_name in enumerate(model[8]['route_gateway_pool']):
+        _link_name(graph, graph.row_id('route', row), 'pool', pool_name)
+
+    for row, rule_info in enumerate(model[9]['rule_info']):
+        _link_irule(graph, graph.row_id('rule', row), rule_info)
+
+    for row in range(len(vs_data['vs_name'])):
+        vs = graph.row_id('virtual', row)
+        _link_name(graph, vs, 'pool', vs_data['vs_pool_name'][row])
+        for match in _COMMON_REF.finditer(vs_data['vs_profiles'][row]):
+            graph.link(vs, graph.ref('profile', match.group(1)))
+        for match in _COMMON_REF.finditer(vs_data['vs_persist'][row]):
+            graph.link(vs, graph.ref('persistence', match.group(1)))
+        for match in _SNATPOOL_REF.finditer(vs_data['vs_source_translation'][row]):
+            graph.link(vs, graph.ref('snatpool', match.group(1)))
+        for match in _COMMON_REF.finditer(vs_data['vs_rule'][row]):
+            graph.link(vs, graph.ref('rule', match.group(1)))
+    return graph
@@ -0,0 +1,92 @@
+'''
+Conf_IpRange.py
+'''
+
+from ipaddress import IPv4Address, IPv6Address, ip_address, summarize_address_range
+from socket import AF_INET, inet_pton
+
+try:
+    import numpy as np
+except ImportError:  # numpy 随 pandas 安装，缺少时使用纯 Python 的实现
+    np = None
+
+# IPv6 地址的整数值加上这个偏移，排在所有 IPv4 地址之后，且不会与 IPv4 地址相邻
+_IPV6_OFFSET = 1 << 128
+# 整数值小于这个上限时（即只有 IPv4 地址）可以放进 numpy 的 uint64 数组
+_UINT64_LIMIT = 1 << 64
+
+
+def _ip_key(ip):
+    # IPv4 先用 inet_pton 直接转换（只接受标准的点分十进制），其他格式交给 ip_address
+    try:
+        return int.from_bytes(inet_pton(AF_INET, ip), 'big')
+    except OSError:
+        pass
+    address = ip_address(ip)
+    return int(address) + _IPV6_OFFSET if address.version == 6 else int(address)
+
+
+def ip_keys(ip_list):
+    """每个地址只解析一次，返回可以排序和相减的整数（IPv6 加上偏移，与 IPv4 分开）"""
+    return [_ip_key(ip) for ip in ip_list]
+
+
+def _runs(keys):
+    """
+    对整数排序并找出连续的区间。
+    :return: (排序后的下标列表, [(区间起点在排序结果中的位置, 区间终点的位置), ...])
+    """
+    if not keys:
+        return [], []
+    if np is not None and max(keys) < _UINT64_LIMIT:
+        values = np.array(keys, dtype=np.uint64)
+        order = np.argsort(values, kind='stable')
+        # 相邻地址的差不为 1 的位置就是区间的断点（重复的地址差为 0，同样断开）
+        breaks = np.flatnonzero(np.diff(values[order]) != 1)
+        starts = np.concatenate(([0], breaks + 1)).tolist()
+        ends = np.append(breaks, len(keys) - 1).tolist()
+        return order.tolist(), list(zip(starts, ends))
+
+    order = sorted(range(len(keys)), key=keys.__getitem__)
+    runs = []
+    start = 0
+    for position in range(1, len(order)):
+        if keys[order[position]] != keys[order[position - 1]] + 1:
+            runs.append((start, position - 1))
+            start = position
+    runs.append((start, len(order) - 1))
+    return order, runs
+
+
+def get_ip_ranges(ip_list):
+    """
+    将连续的 IP 地址合并为范围，返回 [(起始地址, 结束地址), ...]，地址保持原来的字符串。
+    IPv4 和 IPv6 可以混合，IPv4 的范围排在前面。
+    """
+    order, runs = _runs(ip_keys(ip_list))
+    return [(ip_list[order[start]], ip_list[order[end]]) for start, end in runs]
+
+
+def is_consecutive(ip_list):
+    """
+    检查 IP 地址是否是连续的。
+    """
+    return len(get_ip_ranges(ip_list)) <= 1
+
+
+def get_ip_networks(ip_list):
+    """
+    将 IP 地址聚合为最少的 CIDR 网段（与 ipaddress.collapse_addresses 的结果相同），重复的地址只计一次。
+    :return: [IPv4Network/IPv6Network, ...]，IPv4 在前
+    """
+    keys = sorted(set(ip_keys(ip_list)))
+    networks = []
+    _, runs = _runs(keys)
+    for start, end in runs:
+        first, last = keys[start], keys[end]
+        if first >= _IPV6_OFFSET:
+            first, last = IPv6Address(first - _IPV6_OFFSET), IPv6Address(last - _IPV6_OFFSET)
+        else:
+            first, last = IPv4Address(first), IPv4Address(last)
+        networks.extend(summarize_address_range(first, last))
+    return networks
@@ -0,0 +1,77 @@
+'''
+Conf_Parallel.py
+'''
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+
+def list_conf_files(folder_path):
+    """
+    列出目录（含子目录）下的所有 .conf 文件，按路径排序，保证处理顺序和输出稳定。
+    :param folder_path: 文件夹路径
+    :return: 文件路径列表
+    """
+    file_paths = []
+    for root_dir, _, files in os.walk(folder_path):
+        for file in files:
+            if file.endswith('.conf'):
+                file_paths.append(os.path.join(root_dir, file))
+    return sorted(file_paths)
+
+
+def run_files(process_file, file_paths, workers=None, **kwargs):
+    """
+    逐个或并行调用 process_file 处理文件，收集每个文件的结果。
+    每个文件的输出都写到各自的 output 目录，互不影响，因此并行处理的输出与顺序处理一致。
+    :param process_file: 处理单个文件的函数（并行模式下必须是模块级函数，以便传给子进程）
+    :param file_paths: 文件路径列表
+    :param workers: 进程数，None 或小于等于 1 时在当前进程中顺序处理
+    :param kwargs: 传给 process_file 的其他参数
+    :return: 与 file_paths 顺序一致的 (file_path, error) 列表，成功时 error 为 None
+    """
+    results = []
+    if not workers or workers <= 1 or len(file_paths) <= 1:
+        for file_path in file_paths:
+            try:
+                process_file(file_path, **kwargs)
+                results.append((file_path, None))
+            except Exception as e:
+                results.append((file_path, e))
+        return results
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(file_paths))) as executor:
+        futures = [executor.submit(process_file, file_path, **kwargs) for file_path in file_paths]
+        # 按提交顺序收集结果，保证汇总信息的顺序稳定
+        for file_path, future in zip(file_paths, futures):
+            try:
+                future.result()
+                results.append((file_path, None))
+            except Exception as e:
+                results.append((file_path, e))
+    return results
+
+
+def summarize(results):
+    """
+    打印每个文件的处理结果并生成汇总信息。
+    :param results: run_files 的返回值
+    :return: {'processed_count', 'error_count', 'total_files', 'errors'}
+    """
+    processed_count = 0
+    errors = []
+    for file_path, error in results:
+        if error is None:
+            print(f"处理文件成功: {file_path}")
+            processed_count += 1
+        else:
+            print(f"处理文件失败 {file_path}: {str(error)}")
+            errors.append({'file_path': file_path, 'error': str(error)})
+
+    print(f"配置翻译完成: 成功处理 {processed_count} 个文件，失败 {len(errors)} 个文件")
+    return {
+        'processed_count': processed_count,
+        'error_count': len(errors),
+        'total_files': processed_count + len(errors),
+        'errors': errors
+    }
@@ -0,0 +1,191 @@
+'''
+Conf_Parse.py
+'''
+
+# 内容不按 tmsh 语法解析的对象（如 iRule 的 TCL 代码），只保留原始文本
+OPAQUE_PREFIXES = ('ltm rule ', 'gtm rule ', 'sys application template ', 'sys icall script ')
+
+
+class ConfNode:
+    """
+    tmsh 配置对象树的节点。
+    顶层节点对应一个配置对象（如 ltm virtual），嵌套节点对应对象内部的 { } 段落（如 profiles、members 及每个 member）。
+
+    - kind: 对象类型（如 'ltm monitor http'）；嵌套节点为段落名（如 'profiles'、'/Common/10.1.1.1:80'）
+    - path / partition / name: 对象路径及拆分出的分区和名称（没有路径时为空字符串）
+    - attrs: "key value" 形式的属性，同名属性只保留第一个
+    - items: 没有取值的单词行（如 disabled、snatpool 成员、rules 列表）
+    - children: 嵌套段落，按出现顺序
+    """
+    __slots__ = ('kind', 'path', 'attrs', 'items', 'children', 'sections', 'text', '_lines', '_start', '_end',
+                 '_inline')
+
+    def __init__(self, kind, path='', lines=None, start=0):
+        self.kind = kind
+        self.path = path
+        self.attrs = {}
+        self.items = []
+        self.children = []
+        self.sections = {}
+        self.text = ''
+        self._lines = lines
+        self._start = start
+        self._end = start
+        self._inline = None
+
+    @property
+    def partition(self):
+        """路径中的分区部分，如 /Common/app.app/vs 的 Common/app.app"""
+        return self.path[1:].rpartition('/')[0].rstrip('/') if self.path else ''
+
+    @property
+    def name(self):
+        """路径中的名称部分，如 /Common/vs 的 vs"""
+        return self.path.rpartition('/')[2] if self.path else ''
+
+    def get(self, key, default=''):
+        """获取属性值，不存在时返回默认值"""
+        return self.attrs.get(key, default)
+
+    def section(self, key):
+        """获取第一个名为 key 的嵌套段落，不存在时返回 None"""
+        return self.sections.get(key)
+
+    def body_lines(self):
+        """返回段落内的所有非空行（去掉缩进），包括更深层的嵌套内容"""
+        if self._inline is not None:
+            return [self._inline] if self._inline else []
+        return [line.lstrip() for line in self._lines[self._start:self._end] if line.strip()]
+
+    def section_text(self, key):
+        """
+        返回段落 key 的内容文本，每行去掉缩进并以换行开头，
+        与原来的 `key\\s+\\{([\\s\\S]*?)\\n    \\}\\n` 匹配再去缩进的结果一致。
+        """
+        node = self.sections.get(key)
+        if node is None:
+            return ''
+        if node._inline is not None:
+            return ' ' + node._inline if node._inline else ''
+        return ''.join('\n' + line for line in node.body_lines())
+
+    def _add_child(self, child):
+        self.children.append(child)
+        if child.kind not in self.sections:
+            self.sections[child.kind] = child
+
+    def _add_line(self, line):
+        key, sep, value = line.partition(' ')
+        if sep:
+            if key not in self.attrs:
+                self.attrs[key] = value
+        else:
+            self.items.append(key)
+
+
+def _parse_inline(node, key, inner):
+    """解析单行段落，如 `servers { 10.1.1.1 10.1.1.2 }` 或 `/Common/http { }`"""
+    child = ConfNode(key, key if key.startswith('/') else '')
+    child._inline = inner
+    child.items = inner.split()
+    node._add_child(child)
+
+
+def parse_header(line):
+    """
+    解析对象的第一行，得到 (kind, path, 是否有多行内容, 单行内容)。
+    例如 `ltm monitor http /Common/mon {` 得到 ('ltm monitor http', '/Common/mon', True, None)。
+    """
+    head = line.strip()
+    has_body = False
+    inline = None
+    if head.endswith('{'):
+        head = head[:-1].rstrip()
+        has_body = True
+    elif head.endswith('}') and '{' in head:
+        head, _, inline = head[:-1].partition('{')
+        head = head.rstrip()
+        inline = inline.strip()
+
+    pos = head.find(' /')
+    if pos < 0:
+        return head, '', has_body, inline
+    kind = head[:pos]
+    path = head[pos + 1:]
+    end = path.find(' ')
+    if end >= 0:
+        path = path[:end]
+    return kind, path, has_body, inline
+
+
+def parse_block(block):
+    """
+    单次遍历一个配置块，跟踪 { } 嵌套层级，构建对象树。
+    :param block: 配置块文本（第一行为对象头，如 `ltm virtual /Common/vs {`）
+    :return: 顶层 ConfNode
+    """
+    lines = block.split('\n')
+    kind, path, has_body, inline = parse_header(lines[0])
+    root = ConfNode(kind, path, lines, 1)
+    root.text = block
+
+    if inline:
+        root._add_line(inline)
+    if not has_body or block.startswith(OPAQUE_PREFIXES):
+        return root
+
+    stack = [root]
+    node = root
+    attrs = root.attrs
+    for i, line in enumerate(lines[1:], 1):
+        line = line.strip()
+        if not line:
+            continue
+
+        last = line[-1]
+        if last == '}':
+            if line == '}':
+                node._end = i
+                stack.pop()
+                if not stack:
+                    break
+                node = stack[-1]
+                attrs = node.attrs
+                continue
+            if ' {' in line and line.count('"') % 2 == 0:
+                key, _, inner = line[:-1].partition(' {')
+                if ' ' not in key:
+                    # 单行段落，如 `servers { 10.1.1.1 10.1.1.2 }` 或 `/Common/http { }`
+                    _parse_inline(node, key, inner.strip())
+                    continue
+                # 如 `monitor min 1 of { /Common/http /Common/tcp }`，整体作为属性值
+
+        elif last == '{' and line.count('"') % 2 == 0:
+            # 多行段落的开始，如 `profiles {` 或 `/Common/10.1.1.1:80 {`
+            key = line[:-1].rstrip()
+            child = ConfNode(key, key if key[0] == '/' else '', lines, i + 1)
+            node._add_child(child)
+            stack.append(child)
+            node = child
+            attrs = child.attrs
+            continue
+
+        key, sep, value = line.partition(' ')
+        if sep:
+            if key not in attrs:
+                attrs[key] = value
+        else:
+            node.items.append(key)
+
+    return root
+
+
+def parse_blocks(blocks):
+    """
+    逐个解析配置块。
+    :param blocks: split_blocks 返回的块描述符列表
+    :return: ConfNode 生成器
+    """
+    for block in blocks:
+        if block:
+            yield parse_block(block.text)
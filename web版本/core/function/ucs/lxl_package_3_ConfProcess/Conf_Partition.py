@@ -0,0 +1,242 @@
+'''
+Conf_Partition.py
+'''
+
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from .Conf_Add_File import extract_file, write_model
+from .Conf_Cache import load_or_extract
+from .Conf_Extract import PARSER_VERSION, extract_pools_vs_nodes
+from .Conf_Graph import IRULE_REF, OBJECT_PATH
+from .Conf_Split import split_blocks
+
+COMMON_PARTITION = 'Common'
+
+# 分区配置的提取结果在引用列中保留完整路径，与单个配置的提取结果分开缓存
+_PARTITION_PARSER_VERSION = f'{PARSER_VERSION}-paths'
+
+# iRule 中按名称引用、合并时需要加分区前缀的对象：iRule 命令 → 对象类型
+_IRULE_KINDS = {'pool': 'pool', 'snatpool': 'snatpool'}
+
+# rule_info 开头的 iRule 名称
+_RULE_INFO_NAME = re.compile(r'[^\s{]*')
+
+# 名称索引中的对象类型：(类型, 提取结果中的位置, 名称列)
+_NAMED_OBJECTS = (
+    ('pool', 1, 'pool_name'),
+    ('monitor', 4, 'monitor_name'),
+    ('persistence', 5, 'persistence_name'),
+    ('profile', 6, 'profile_name'),
+    ('snatpool', 7, 'snatpool_name'),
+    ('rule', 9, 'rule_name'),
+)
+
+# 每个列的改写方式：qualify 为本分区定义的对象名称，(类型) 为按路径或名称索引解析的引用，
+# text 为改写原文中的路径，irule 为改写 iRule 内容中的引用
+_COLUMN_RULES = (
+    {'vs_name': 'qualify', 'vs_pool_name': 'pool', 'vs_source_translation': 'text', 'vs_profiles': 'text',
+     'vs_rule': 'text', 'vs_persist': 'text'},
+    {'pool_name': 'qualify', 'pool_monitor': 'monitor'},
+    {'pool_name': 'qualify', 'pool_monitor': 'monitor', 'pool_member_monitor': 'monitor'},
+    {},
+    {'monitor_name': 'qualify', 'monitor_defaults-from': 'monitor'},
+    {'persistence_name': 'qualify', 'persistence_defaults-from': 'persistence'},
+    {'profile_name': 'qualify', 'profile_defaults-from': 'profile'},
+    {'snatpool_name': 'qualify'},
+    {'route_name': 'qualify', 'route_gateway_pool': 'pool'},
+    {'rule_name': 'qualify', 'rule_info': 'irule'},
+    {},
+)
+
+
+def list_partition_confs(config_dir):
+    """
+    列出 UCS config 目录中的 bigip.conf 和各分区的 config/partitions/<分区>/bigip.conf
+    :param config_dir: 解压后的 config 目录
+    :return: [(分区名, 文件路径), ...]，Common 在前，其余分区按名称排序
+    """
+    sources = []
+    common_conf = os.path.join(config_dir, 'bigip.conf')
+    if os.path.isfile(common_conf):
+        sources.append((COMMON_PARTITION, common_conf))
+
+    partitions_dir = os.path.join(config_dir, 'partitions')
+    if os.path.isdir(partitions_dir):
+        for partition in sorted(os.listdir(partitions_dir)):
+            partition_conf = os.path.join(partitions_dir, partition, 'bigip.conf')
+            if os.path.isfile(partition_conf):
+                sources.append((partition, partition_conf))
+    return sources
+
+
+def qualify_name(partition, name):
+    """
+    合并后的对象名称：Common 中的对象保持原名，其他分区的对象加上分区前缀，避免不同分区的同名对象冲突
+    （加上前缀后与其他对象重名时的处理见 name_qualifier）
+    """
+    if not name or partition == COMMON_PARTITION:
+        return name
+    return f'{partition}_{name}'
+
+
+def name_qualifier(partition_models):
+    """
+    返回合并时使用的命名函数 qualify(分区, 名称)，一般与 qualify_name 相同；
+    分区_名称 与其他对象的名称相同时（Common 中已有 Tenant1_web，或 a_b 分区的 c 与 a 分区的 b_c），
+    依次加上 _2、_3 … 直到不重复。先按分区顺序为各分区定义的对象命名，引用了但没有定义的对象在第一次引用时命名，
+    同一个 (分区, 名称) 总是得到同一个名称
+    :param partition_models: [(分区名, 提取结果), ...]
+    """
+    assigned = {}
+    taken = set()
+
+    def qualify(partition, name):
+        if not name or partition == COMMON_PARTITION:
+            return name
+        merged = assigned.get((partition, name))
+        if merged is None:
+            merged = candidate = qualify_name(partition, name)
+            suffix = 2
+            while merged in taken:
+                merged = f'{candidate}_{suffix}'
+                suffix += 1
+            assigned[(partition, name)] = merged
+            taken.add(merged)
+        return merged
+
+    defined = [(partition, data[column]) for partition, model in partition_models
+               for data, rules in zip(model, _COLUMN_RULES) for column, rule in rules.items() if rule == 'qualify']
+    for partition, names in defined:
+        if partition == COMMON_PARTITION:
+            taken.update(names)
+    for partition, names in defined:
+        for name in names:
+            qualify(partition, name)
+    return qualify
+
+
+def _extract_partition(source, cache_dir=None):
+    """
+    提取单个分区的配置（文件路径或内存中的 bytes），引用列保留完整路径，模块级函数以便在子进程中执行
+    """
+    if isinstance(source, (bytes, bytearray)):
+        return load_or_extract(None, _PARTITION_PARSER_VERSION,
+                               lambda: extract_pools_vs_nodes(split_blocks(source), full_paths=True),
+                               cache_dir, content=source)
+    return load_or_extract(source, _PARTITION_PARSER_VERSION, lambda: extract_file(source, full_paths=True), cache_dir)
+
+
+def extract_partitions(sources, workers=None, cache_dir=None):
+    """
+    逐个或并行提取各分区的配置，每个分区一个任务。
+    :param sources: [(分区名, 文件路径或 bytes), ...]
+    :param workers: 进程数，None 或小于等于 1 时在当前进程中逐个提取
+    :param cache_dir: 解析缓存目录
+    :return: 与 sources 顺序一致的 [(分区名, 提取结果), ...]
+    """
+    if not workers or workers <= 1 or len(sources) <= 1:
+        return [(partition, _extract_partition(source, cache_dir)) for partition, source in sources]
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(sources))) as executor:
+        futures = [executor.submit(_extract_partition, source, cache_dir) for _, source in sources]
+        return [(partition, future.result()) for (partition, _), future in zip(sources, futures)]
+
+
+def build_name_index(partition_models):
+    """
+    建立名称索引：{对象类型: {名称: {定义该名称的分区}}}，用于解析只有名称的引用（如 iRule 中的 pool 名称）
+    """
+    index = {kind: {} for kind, _, _ in _NAMED_OBJECTS}
+    for partition, model in partition_models:
+        for kind, position, column in _NAMED_OBJECTS:
+            names = index[kind]
+            for name in model[position][column]:
+                if name:
+                    names.setdefault(name, set()).add(partition)
+    return index
+
+
+def merge_models(partition_models):
+    """
+    将各分区的提取结果合并为一个提取结果，结构与 extract_pools_vs_nodes 的返回值相同，可以直接交给各输出函数。
+    非 Common 分区的对象名称加上分区前缀（与其他对象重名时再加序号，见 name_qualifier）；引用按 F5 的规则解析：
+    引用列中的完整路径（如 vs_pool_name 为 /Common/web_pool）按路径中的分区解析为合并后的名称；
+    只有名称的引用（如 iRule 中的 pool web_pool）先找当前分区，找不到时使用 Common 中的对象；
+    配置原文中带完整路径的引用（如 /Tenant1/my_rule）改写为 /Common/Tenant1_my_rule，
+    合并后所有对象都在同一个名称空间中。
+    :param partition_models: [(分区名, 提取结果), ...]，由 extract_partitions 提取（引用列保留完整路径）
+    :return: 合并后的提取结果
+    """
+    index = build_name_index(partition_models)
+    qualify = name_qualifier(partition_models)
+    # 只改写合并的分区中的路径（iRule 中的 URI 等 /a/b 形式的字符串不是对象路径）
+    partitions = {partition for partition, _ in partition_models if partition != COMMON_PARTITION}
+
+    def resolve(kind, partition, reference):
+        if reference.startswith('/'):
+            path, _, name = reference.rpartition('/')
+            return qualify(path[1:].split('/', 1)[0], name)
+        if reference and partition in index[kind].get(reference, ()):
+            return qualify(partition, reference)
+        return reference
+
+    def rewrite_paths(text):
+        if not text:
+            return text
+        return OBJECT_PATH.sub(
+            lambda m: f'/Common/{qualify(m.group(1), m.group(2))}' if m.group(1) in partitions else m.group(0),
+            text)
+
+    def rewrite_irule(partition, rule_info):
+        # 带路径的引用已由 rewrite_paths 改写，这里只解析只有名称的引用
+        def replace(m):
+            kind = _IRULE_KINDS.get(m.group(1))
+            if kind is None or m.group(2).startswith('/'):
+                return m.group(0)
+            return m.group(0)[:m.start(2) - m.start(0)] + resolve(kind, partition, m.group(2))
+
+        # rule_info 以 iRule 名称开头，名称与 rule_name 列一样改写
+        name = _RULE_INFO_NAME.match(rule_info).group(0)
+        return qualify(partition, name) + IRULE_REF.sub(replace, rewrite_paths(rule_info[len(name):]))
+
+    merged = tuple({column: [] for column in data} for data in partition_models[0][1])
+    for partition, model in partition_models:
+        for merged_data, data, rules in zip(merged, model, _COLUMN_RULES):
+            for column, values in data.items():
+                rule = rules.get(column)
+                if rule is None or partition == COMMON_PARTITION and rule == 'qualify':
+                    merged_data[column].extend(values)
+                elif rule == 'qualify':
+                    merged_data[column].extend(qualify(partition, value) for value in values)
+                elif rule == 'text':
+                    merged_data[column].extend(rewrite_paths(value) for value in values)
+                elif rule == 'irule':
+                    merged_data[column].extend(rewrite_irule(partition, value) for value in values)
+                else:
+                    merged_data[column].extend(resolve(rule, partition, value) for value in values)
+    return merged
+
+
+def process_partitions(sources, output_dir, base_name, workers=None, excel=True, output_workers=None, cache_dir=None,
+                       shard_by_partition=False, shard_max_objects=None, prune=True, snat_cidr=False):
+    """
+    并行提取 bigip.conf 和各分区的配置，合并后输出一套 xlsx、txt 和 attention 文件，
+    不需要先把各分区的配置拼接成一个大文件再整体解析。
+    :param sources: [(分区名, 文件路径或 bytes), ...]，见 list_partition_confs
+    :param output_dir: 输出目录
+    :param base_name: 输出文件名（不含扩展名）
+    :param workers: 并行提取的进程数
+    :param excel: 是否输出 Excel 文件
+    :param output_workers: 输出并行生成的进程数
+    :param cache_dir: 解析缓存目录（每个分区单独缓存）
+    :param shard_by_partition: 是否按分区拆分 txt 输出（见 write_model）
+    :param shard_max_objects: txt 分片的最大对象数（见 write_model）
+    :param prune: 是否只翻译 VS 引用的对象（见 write_model）
+    :param snat_cidr: SNAT pool 成员是否按 CIDR 网段输出（见 write_model）
+    :return: 各输出的耗时
+    """
+    merged = merge_models(extract_partitions(sources, workers, cache_dir))
+    return write_model(merged, output_dir, base_name, excel, output_workers, shard_by_partition, shard_max_objects,
+                       prune, snat_cidr)
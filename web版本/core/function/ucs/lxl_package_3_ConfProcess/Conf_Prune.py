@@ -0,0 +1,97 @@
+'''
+Conf_Prune.py
+'''
+
+from collections import deque
+
+from .Conf_Graph import OBJECT_PATH, build_graph
+from .Conf_Rows import row_count
+
+# VS 中带路径引用对象的列和被引用对象的类型（依赖图只记录 /Common/ 下的引用，这里补充其他分区的引用）
+_VS_PATH_REFS = (
+    ('vs_profiles', 'profile'),
+    ('vs_persist', 'persistence'),
+    ('vs_source_translation', 'snatpool'),
+    ('vs_rule', 'rule'),
+)
+
+# 按引用关系裁剪的数据：(类型, 提取结果中的位置)，未列出的数据（VS、route、auth）全部保留
+PRUNED_TABLES = (
+    ('pool', 1),
+    ('node', 3),
+    ('monitor', 4),
+    ('persistence', 5),
+    ('profile', 6),
+    ('snatpool', 7),
+    ('rule', 9),
+)
+_POOL_MEMBER_POSITION = 2
+
+
+def _roots(model, graph):
+    """
+    裁剪的起点：所有 VS（未启用的 VS 同样翻译，启用后需要它引用的对象）、所有 route（route 引用的网关 pool
+    需要保留），以及 VS 按路径引用的其他分区对象
+    """
+    vs_data = model[0]
+    roots = []
+    for row in range(len(vs_data['vs_name'])):
+        roots.append(graph.row_id('virtual', row))
+        for column, kind in _VS_PATH_REFS:
+            for match in OBJECT_PATH.finditer(vs_data[column][row]):
+                node = graph.find(kind, match.group(2))
+                if node is not None:
+                    roots.append(node)
+    roots.extend(graph.row_id('route', row) for row in range(len(model[8]['route_name'])))
+    return roots
+
+
+def reachable(graph, roots):
+    """从 roots 出发沿依赖边可以到达的对象 ID 集合（广度优先，每个对象和每条边只访问一次）"""
+    seen = set(roots)
+    queue = deque(seen)
+    while queue:
+        for target in graph.edges[queue.popleft()]:
+            if target not in seen:
+                seen.add(target)
+                queue.append(target)
+    return seen
+
+
+def _keep_rows(data, rows):
+    return {column: [values[row] for row in rows] for column, values in data.items()}
+
+
+def prune_model(model, graph=None):
+    """
+    只保留 VS 和 route 直接或间接引用的对象（包括 iRule 中按名称引用的 pool、SNAT pool、会话保持和 node），
+    删除没有被引用的 pool、member、node、monitor、会话保持、profile、SNAT pool 和 iRule。
+    时间与对象数和引用数成线性关系。
+    :param model: extract_pools_vs_nodes 的返回值
+    :param graph: model 的依赖图，为 None 时重新建立
+    :return: (裁剪后的提取结果, {类型: [被删除的对象名称]})
+    """
+    if graph is None:
+        graph = build_graph(model)
+    kept = reachable(graph, _roots(model, graph))
+
+    pruned = list(model)
+    dropped = {}
+    for kind, position in PRUNED_TABLES:
+        row_ids = [graph.row_id(kind, row) for row in range(row_count(model[position]))]
+        # 同名对象的引用都解析到第一个定义，同名的其他行随它保留
+        keep = [row for row, node in enumerate(row_ids)
+                if node in kept or graph.find(kind, graph.names[node]) in kept]
+        if len(keep) == len(row_ids):
+            continue
+        keep_set = set(keep)
+        dropped[kind] = [graph.names[node] for row, node in enumerate(row_ids) if row not in keep_set]
+        pruned[position] = _keep_rows(model[position], keep)
+
+    # 有独立配置的 member 随所属 pool 保留
+    if 'pool' in dropped:
+        kept_pools = set(pruned[1]['pool_name'])
+        member_data = model[_POOL_MEMBER_POSITION]
+        pruned[_POOL_MEMBER_POSITION] = _keep_rows(
+            member_data, [row for row, pool_name in enumerate(member_data['pool_name']) if pool_name in kept_pools])
+    return tuple(pruned), dropped
@@ -0,0 +1,43 @@
+'''
+Conf_Rows.py
+'''
+
+
+class Row:
+    """
+    提取结果（按列存储的字典）中某一行的只读视图，不复制数据。
+    用 row["列名"] 取值，用法与 DataFrame.iterrows() 返回的行一致。
+    """
+    __slots__ = ('_columns', '_index')
+
+    def __init__(self, columns, index):
+        self._columns = columns
+        self._index = index
+
+    def __getitem__(self, key):
+        return self._columns[key][self._index]
+
+    def __contains__(self, key):
+        return key in self._columns
+
+    def get(self, key, default=None):
+        """获取列值，列不存在时返回默认值"""
+        column = self._columns.get(key)
+        return default if column is None else column[self._index]
+
+
+def row_count(data):
+    """返回按列存储的字典的行数（以第一列为准）"""
+    for column in data.values():
+        return len(column)
+    return 0
+
+
+def iter_rows(data):
+    """
+    逐行遍历按列存储的字典，代替 pd.DataFrame(data).iterrows()，不需要构建 DataFrame。
+    :param data: {列名: 值列表}
+    :return: (行号, Row) 生成器
+    """
+    for index in range(row_count(data)):
+        yield index, Row(data, index)
@@ -0,0 +1,291 @@
+'''
+Conf_Shard.py
+'''
+
+import hashlib
+import os
+import pickle
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import quote
+
+from .Conf_Graph import build_graph
+from .Conf_Rows import row_count
+from .Conf_WriteToTxt import TXT_SECTIONS, virtual_summary, write_to_txt
+
+# 分片输出格式的版本，write_to_txt 的输出格式或分片方式有改动时修改，旧分片全部重新生成
+SHARD_VERSION = 'txt-shard-4'
+
+# 各部分逐行输出的数据在提取结果中的位置
+SECTION_TABLES = {
+    'auth': 10, 'node': 3, 'snatpool': 7, 'monitor': 4, 'pool_member_monitor': 2, 'persistence': 5,
+    'profile': 6, 'profile_custom': 6, 'pool': 1, 'rule': 9, 'virtual': 0, 'virtual_defaults': 0, 'route': 8,
+}
+# 各部分输出时读取的全部数据（用于计算分片摘要），见 write_to_txt
+SECTION_INPUTS = {
+    'auth': (10,), 'node': (3,), 'snatpool': (7,), 'monitor': (4,), 'pool_member_monitor': (2, 4),
+    'persistence': (5,), 'profile': (0, 1, 2, 6), 'profile_custom': (6,), 'pool': (1, 2), 'rule': (9,),
+    'virtual': (0, 5),
+    'virtual_defaults': (0,), 'route': (8,),
+}
+# 不拆分的部分，只能整体输出：profile 部分根据所有 VS 引用的 profile 输出全局的 tcp 配置（各 profile 的配置在
+# profile_custom 部分，可以拆分）；virtual_defaults 根据所有 VS 输出默认会话保持和 oneconnect；route 部分所有路由在同一个块中。
+# virtual 部分拆分时，VS 之间相互影响的信息（前面的 VS 关联了 oneconnect）由全部 VS 的汇总传给每个分片（见 virtual_summary）。
+# 分片只替换 VS 等数据表中的行，完整提取结果的依赖图可以直接用于所有分片
+UNSPLIT_SECTIONS = ('auth', 'profile', 'virtual_defaults', 'route')
+
+_POOL_POSITION = 1
+_POOL_MEMBER_POSITION = 2
+_INDEX_HEADER = '# order\tfile\tsection\tpartition\tobjects\tdigest\n'
+
+# 子进程中的完整提取结果、依赖图和 pool 成员索引，由进程池的 initializer 设置，避免每个任务都传一遍
+_worker_model = None
+_worker_graph = None
+_worker_member_rows = None
+
+
+def _row_partitions(section, model):
+    """返回部分中每一行所属的分区，没有分区信息的部分返回 None"""
+    if section == 'virtual':
+        return model[0]['vs_partition']
+    if section == 'profile_custom':
+        return model[6]['profile_partition']
+    if section == 'pool':
+        return model[_POOL_POSITION]['pool_partition']
+    if section == 'snatpool':
+        return model[7]['snatpool_partition']
+    if section == 'pool_member_monitor':
+        pool_partitions = {}
+        for pool_name, partition in zip(model[_POOL_POSITION]['pool_name'], model[_POOL_POSITION]['pool_partition']):
+            pool_partitions.setdefault(pool_name, partition)
+        return [pool_partitions.get(pool_name, '') for pool_name in model[_POOL_MEMBER_POSITION]['pool_name']]
+    return None
+
+
+def plan_shards(model, by_partition=True, max_objects=None):
+    """
+    按 TXT_SECTIONS 的加载顺序把 txt 输出划分为分片：先按部分，再按分区，最后按对象数拆分。
+    按分区拆分时只在分区变化的位置切分（同一分区不连续时分成多个分片），分片按顺序拼接后与整体输出的行顺序一致。
+    :param model: extract_pools_vs_nodes 的返回值
+    :param by_partition: 是否按分区拆分
+    :param max_objects: 每个分片最多的对象数，None 表示不按对象数拆分
+    :return: [(部分, 分区, 行号列表或 None), ...]，None 表示该部分的全部行
+    """
+    shards = []
+    for section in TXT_SECTIONS:
+        count = row_count(model[SECTION_TABLES[section]])
+        # 没有数据的部分在整体输出中也有表头，同样输出一个分片
+        if section in UNSPLIT_SECTIONS or not count:
+            shards.append((section, '', None))
+            continue
+
+        partitions = _row_partitions(section, model) if by_partition else None
+        groups = []
+        for row in range(count):
+            partition = partitions[row] if partitions else ''
+            if not groups or groups[-1][0] != partition:
+                groups.append((partition, []))
+            groups[-1][1].append(row)
+        for partition, rows in groups:
+            step = max_objects or len(rows)
+            for start in range(0, len(rows), step):
+                shards.append((section, partition, rows[start:start + step]))
+    return shards
+
+
+def _subset(data, rows):
+    return {column: [values[row] for row in rows] for column, values in data.items()}
+
+
+def member_rows_by_pool(model):
+    """{pool 名称: pool_member 的行号列表}，pool 分片按它取出各自的成员"""
+    member_rows = {}
+    for row, pool_name in enumerate(model[_POOL_MEMBER_POSITION]['pool_name']):
+        member_rows.setdefault(pool_name, []).append(row)
+    return member_rows
+
+
+def shard_model(model, section, rows, member_rows=None):
+    """
+    分片的输入：完整的提取结果，只把该部分的数据换成分片中的行；pool 分片同时只保留这些 pool 的成员
+    :param member_rows: member_rows_by_pool 的结果，多个分片共用时预先计算一次
+    """
+    if rows is None:
+        return model
+    sub_model = list(model)
+    position = SECTION_TABLES[section]
+    sub_model[position] = _subset(model[position], rows)
+    if section == 'pool':
+        if member_rows is None:
+            member_rows = member_rows_by_pool(model)
+        pool_rows = []
+        for pool_name in dict.fromkeys(sub_model[_POOL_POSITION]['pool_name']):
+            pool_rows.extend(member_rows.get(pool_name, ()))
+        sub_model[_POOL_MEMBER_POSITION] = _subset(model[_POOL_MEMBER_POSITION], sorted(pool_rows))
+    return tuple(sub_model)
+
+
+def shard_digest(sub_model, section, options=None):
+    """分片的摘要：输出格式版本 + 部分名称 + 输出选项 + 该部分读取的全部数据，输入不变时摘要不变"""
+    inputs = [sub_model[position] for position in SECTION_INPUTS[section]]
+    return hashlib.sha256(pickle.dumps((SHARD_VERSION, section, options or {}, inputs), protocol=5)).hexdigest()
+
+
+def shard_file_name(base_name, section, partition, chunk):
+    """
+    分片文件名不含序号，前面插入新分片时后面的分片仍能按文件名复用。
+    分区名按 URL 编码转义（Common/app.app 为 Common%2Fapp.app，_ 为 %5F），转义后不含 _；
+    分区和块号总是以 _ 分隔（没有分区时为空），不同的 (部分, 分区, 块号) 对应的文件名不会相同
+    """
+    escaped = quote(partition, safe='').replace('_', '%5F')
+    return f'{base_name}_{section}_{escaped}_{chunk}.txt'
+
+
+def read_index(index_path):
+    """读取上一次的分片索引，返回 {文件名: 摘要}"""
+    digests = {}
+    try:
+        with open(index_path, 'r', encoding='utf-8') as index_file:
+            for line in index_file:
+                if line.startswith('#'):
+                    continue
+                fields = line.rstrip('\n').split('\t')
+                if len(fields) == 6:
+                    digests[fields[1]] = fields[5]
+    except OSError:
+        pass
+    return digests
+
+
+def section_frame(model, section, graph, options):
+    """
+    部分的表头和结尾：用没有任何行的数据输出该部分，第一行是表头，其余是结尾
+    :return: (表头, 结尾)
+    """
+    fd, path = tempfile.mkstemp(suffix='.txt')
+    os.close(fd)
+    try:
+        write_to_txt(path, *shard_model(model, section, []), sections={section}, graph=graph, **options)
+        with open(path, 'r') as frame_file:
+            frame = frame_file.read()
+    finally:
+        os.remove(path)
+    header_end = frame.find('\n') + 1
+    return frame[:header_end], frame[header_end:]
+
+
+def _shard_oneconnect_row(oneconnect_row, rows):
+    """
+    virtual 分片中从哪一行开始关联 oneconnect：全部 VS 中第一个关联 oneconnect 的行号换算为分片中的行号（分片中的行连续），
+    在分片之前时为 0，在分片之后或没有时为 None（同一结果的不同写法统一，分片摘要不受影响）
+    """
+    if oneconnect_row is None or oneconnect_row - rows[0] >= len(rows):
+        return None
+    return max(0, oneconnect_row - rows[0])
+
+
+def _init_worker(model, graph):
+    global _worker_model, _worker_graph, _worker_member_rows
+    _worker_model = model
+    _worker_graph = graph
+    _worker_member_rows = member_rows_by_pool(model)
+
+
+def _render_shard(path, section, rows, options, cut, model=None, graph=None, member_rows=None):
+    """
+    输出单个分片，模块级函数以便在子进程中执行。options 为传给 write_to_txt 的参数（virtual 分片包含 vs_rows 和 vs_summary）。
+    cut 为 (表头, 结尾)：同一部分的多个分片中，只有第一个分片保留表头、最后一个分片保留结尾，
+    需要去掉的部分为非空字符串
+    """
+    if model is None:
+        model, graph, member_rows = _worker_model, _worker_graph, _worker_member_rows
+    write_to_txt(path, *shard_model(model, section, rows, member_rows), sections={section}, graph=graph, **options)
+    header, trailer = cut
+    if header or trailer:
+        with open(path, 'r') as shard_file:
+            text = shard_file.read()
+        if header and text.startswith(header):
+            text = text[len(header):]
+        if trailer and text.endswith(trailer):
+            text = text[:len(text) - len(trailer)]
+        with open(path, 'w') as shard_file:
+            shard_file.write(text)
+    return path
+
+
+def write_txt_shards(model, output_dir, base_name, by_partition=True, max_objects=None, workers=None,
+                     snat_cidr=False, graph=None):
+    """
+    把 txt 输出拆分为多个分片文件并行生成，同时写出按加载顺序排列的索引文件。
+    按索引顺序拼接全部分片与 write_to_txt 输出的整个 txt 文件相同。
+    分片的输入（摘要）与上一次索引中的记录相同且文件存在时直接复用，不重新生成；
+    上一次生成但本次不再需要的分片文件会被删除。
+    :param model: extract_pools_vs_nodes 的返回值
+    :param output_dir: 输出目录，分片写到 <output_dir>/<base_name>_shards
+    :param base_name: 输出文件名（不含扩展名）
+    :param by_partition: 是否按分区拆分
+    :param max_objects: 每个分片最多的对象数
+    :param workers: 并行生成分片的进程数，None 或 1 表示逐个生成
+    :param snat_cidr: SNAT pool 成员是否按 CIDR 网段输出（见 write_to_txt）
+    :param graph: model 的依赖图，所有分片共用，为 None 时建立一次
+    :return: (索引文件路径, 重新生成的分片数, 复用的分片数)
+    """
+    if graph is None:
+        graph = build_graph(model)
+    shard_dir = os.path.join(output_dir, f'{base_name}_shards')
+    os.makedirs(shard_dir, exist_ok=True)
+    index_path = os.path.join(shard_dir, f'{base_name}_index.txt')
+    previous = read_index(index_path)
+
+    options = {'snat_cidr': snat_cidr}
+    member_rows = member_rows_by_pool(model)
+    summary = virtual_summary(model[0], graph)
+    shards = plan_shards(model, by_partition, max_objects)
+    # 拆分为多个分片的部分：中间的分片去掉表头和结尾
+    split_sections = {section for section, _, rows in shards if rows is not None}
+    frames = {section: section_frame(model, section, graph, options) for section in split_sections}
+    entries = []
+    pending = []
+    chunks = {}
+    for order, (section, partition, rows) in enumerate(shards, 1):
+        chunk = chunks.get((section, partition), 0)
+        chunks[(section, partition)] = chunk + 1
+        file_name = shard_file_name(base_name, section, partition, chunk)
+        header, trailer = frames.get(section, ('', ''))
+        cut = (header if order > 1 and shards[order - 2][0] == section else '',
+               trailer if order < len(shards) and shards[order][0] == section else '')
+        shard_options, digest_options = options, dict(options, cut=cut)
+        if section == 'virtual' and rows is not None:
+            oneconnect_row = _shard_oneconnect_row(summary['oneconnect_row'], rows)
+            shard_options = dict(options, vs_rows=rows, vs_summary=dict(summary, oneconnect_row=oneconnect_row))
+            digest_options['oneconnect_row'] = oneconnect_row
+        digest = shard_digest(shard_model(model, section, rows, member_rows), section, digest_options)
+        count = len(rows) if rows is not None else row_count(model[SECTION_TABLES[section]])
+        entries.append((order, file_name, section, partition, count, digest))
+        if previous.get(file_name) != digest or not os.path.isfile(os.path.join(shard_dir, file_name)):
+            pending.append((os.path.join(shard_dir, file_name), section, rows, shard_options, cut))
+
+    if not workers or workers <= 1 or len(pending) <= 1:
+        for path, section, rows, shard_options, cut in pending:
+            _render_shard(path, section, rows, shard_options, cut, model, graph, member_rows)
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(pending)), initializer=_init_worker,
+                                 initargs=(model, graph)) as executor:
+            for future in [executor.submit(_render_shard, path, section, rows, shard_options, cut)
+                           for path, section, rows, shard_options, cut in pending]:
+                future.result()
+
+    # 删除本次不再需要的旧分片
+    current = {entry[1] for entry in entries}
+    for file_name in previous:
+        if file_name not in current:
+            try:
+                os.remove(os.path.join(shard_dir, file_name))
+            except OSError:
+                pass
+
+    with open(index_path, 'w', encoding='utf-8') as index_file:
+        index_file.write(_INDEX_HEADER)
+        for entry in entries:
+            index_file.write('\t'.join(str(field) for field in entry) + '\n')
+    return index_path, len(pending), len(entries) - len(pending)
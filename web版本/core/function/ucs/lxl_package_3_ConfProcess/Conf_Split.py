@@ -4,25 +4,166 @@ Conf_Split.py
 
 import re
 
+# bigip.conf 中对象块的起始行前缀
+CONF_BLOCK_PREFIXES = ('apm', 'auth', 'ltm', 'net', 'sys', 'wom', '#TMSH-VERSION')
+# bigip_base.conf 中对象块的起始行前缀
+BASE_BLOCK_PREFIXES = ('cm', 'net', 'security', 'sys', '#')
 
-def split_blocks(content):
+# 只尝试 utf-8，失败时按 latin-1 解码（latin-1 可以解码任意字节）
+_FALLBACK_ENCODING = 'latin-1'
+
+_pattern_cache = {}
+
+
+def _header_pattern(prefixes, binary):
+    """按前缀列表构建匹配块起始行（整行）的正则（多行模式），并缓存"""
+    key = (prefixes, binary)
+    pattern = _pattern_cache.get(key)
+    if pattern is None:
+        source = '^(?:' + '|'.join(re.escape(prefix) for prefix in prefixes) + ')[^\n]*'
+        pattern = re.compile(source.encode() if binary else source, re.MULTILINE)
+        _pattern_cache[key] = pattern
+    return pattern
+
+
+class Block:
+    """
+    配置块描述符：只记录块在原始内容中的起止偏移和块类型，不复制内容。
+    块文本只在调用 text 时才从原始内容中切出（bytes 内容会同时解码）。
+
+    - start / end: 块在原始内容中的起止偏移
+    - header: 块的第一行（如 'ltm virtual /Common/vs {'）
+    - kind: 对象类型（如 'ltm virtual'），即第一行中路径或 { 之前的部分
+    """
+    __slots__ = ('content', 'start', 'end', 'header', 'kind')
+
+    def __init__(self, content, start, end, header):
+        self.content = content
+        self.start = start
+        self.end = end
+        self.header = header
+        kind = header.rstrip('{ ')
+        pos = kind.find(' /')
+        self.kind = kind[:pos] if pos >= 0 else kind
+
+    def __bool__(self):
+        return self.end > self.start
+
+    def __len__(self):
+        return self.end - self.start
+
+    def __repr__(self):
+        return f"Block({self.kind!r}, {self.start}, {self.end})"
+
+    def startswith(self, prefix):
+        """判断块是否以 prefix 开头（只比较第一行，不切出块文本）"""
+        return self.header.startswith(prefix)
+
+    @property
+    def text(self):
+        """
+        切出块文本：与原来按行拆分再拼接的结果一致（去掉空行，统一换行符为 \\n）。
+        """
+        text = self.content[self.start:self.end]
+        if not isinstance(text, str):
+            text = _decode(text)
+        if '\r' in text:
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+        text = text.strip('\n')
+        if '\n\n' in text:
+            text = '\n'.join(line for line in text.split('\n') if line)
+        return text
+
+
+def _decode(data):
+    """解码块内容，utf-8 失败时按 latin-1 解码"""
+    try:
+        return str(data, 'utf-8')
+    except UnicodeDecodeError:
+        return str(data, _FALLBACK_ENCODING)
+
+
+def _read_header(content, start, binary):
+    """读取 start 处的第一行"""
+    end = content.find(b'\n' if binary else '\n', start)
+    if end < 0:
+        end = len(content)
+    header = content[start:end]
+    if binary:
+        header = _decode(header)
+    return header.rstrip('\r')
+
+
+def split_blocks(content, prefixes=CONF_BLOCK_PREFIXES):
     """
-    将输入的配置文件内容分割成块，并保留原始缩进。
-    :param content: 配置文件内容
-    :return: 块列表
+    将输入的配置文件内容分割成块描述符，不复制内容。
+    :param content: 配置文件内容，可以是 str、bytes 或 mmap / memoryview（按 utf-8 解析）
+    :param prefixes: 块起始行的前缀
+    :return: Block 列表，块文本通过 Block.text 获取
     """
+    binary = not isinstance(content, str)
+    if binary and not isinstance(content, (bytes, bytearray)) and not hasattr(content, 'find'):
+        # memoryview 不支持 find，转成 bytes 处理
+        content = bytes(content)
+
     blocks = []
-    current_block = []
+    # 跳过 utf-8 BOM
+    bom = b'\xef\xbb\xbf' if binary else '\ufeff'
+    position = len(bom) if content[:len(bom)] == bom else 0
 
-    for line in content.split('\n'):
-        if re.match(r'^(apm|auth|ltm|net|sys|wom)', line) or line.startswith("#TMSH-VERSION"):
-            if current_block:
-                blocks.append('\n'.join(current_block))
-            current_block = [line]
-        elif line:
-            current_block.append(line)
+    matches = list(_header_pattern(prefixes, binary).finditer(content, position))
 
-    if current_block:
-        blocks.append('\n'.join(current_block))
+    # 第一个块之前的非空内容单独作为一个块
+    first_start = matches[0].start() if matches else len(content)
+    if content[position:first_start].strip():
+        while content[position:position + 1] in (b'\n', b'\r', '\n', '\r'):
+            position += 1
+        blocks.append(Block(content, position, first_start, _read_header(content, position, binary)))
+
+    for index, match in enumerate(matches):
+        end = matches[index + 1].start() if index + 1 < len(matches) else len(content)
+        header = match.group()
+        if binary:
+            header = _decode(header)
+        blocks.append(Block(content, match.start(), end, header.rstrip('\r')))
 
     return blocks
+
+
+def _lines_to_block(lines, binary):
+    """把属于同一个块的若干行拼成一个独立的块描述符"""
+    content = (b'' if binary else '').join(lines)
+    header = _decode(lines[0]) if binary else lines[0]
+    return Block(content, 0, len(content), header.rstrip('\r\n'))
+
+
+def iter_blocks(file, prefixes=CONF_BLOCK_PREFIXES):
+    """
+    从文件句柄逐行读取配置，逐个生成块描述符（流式处理）。
+    与 split_blocks 不同，这里不需要整个文件的内容，同一时间只保留正在读取的块。
+    :param file: 以二进制或文本方式打开的文件句柄（也可以是任意按行迭代的对象）
+    :param prefixes: 块起始行的前缀
+    :return: Block 生成器，块的划分和块文本与 split_blocks 相同
+    """
+    lines = []
+    pattern = None
+    binary = False
+    for line in file:
+        if pattern is None:
+            binary = not isinstance(line, str)
+            pattern = _header_pattern(prefixes, binary)
+            # 跳过 utf-8 BOM
+            bom = b'\xef\xbb\xbf' if binary else '\ufeff'
+            if line.startswith(bom):
+                line = line[len(bom):]
+
+        if pattern.match(line):
+            if lines:
+                yield _lines_to_block(lines, binary)
+            lines = [line]
+        elif lines or line.strip():
+            # 第一个块之前的非空内容单独作为一个块
+            lines.append(line)
+
+    if lines:
+        yield _lines_to_block(lines, binary)
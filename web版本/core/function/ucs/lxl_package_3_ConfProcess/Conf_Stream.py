@@ -0,0 +1,231 @@
+'''
+Conf_Stream.py
+'''
+
+import os
+import shutil
+import tempfile
+
+from .Conf_Extract import extract_pools_vs_nodes
+from .Conf_Graph import build_graph
+from .Conf_Rows import row_count
+from .Conf_Shard import section_frame
+from .Conf_Split import iter_blocks
+from .Conf_WriteToTxt import TXT_SECTIONS, virtual_summary, write_to_txt
+
+# 每读入多少个对象提取并写出一批，内存中只保留一批对象的配置原文和提取结果
+STREAM_BATCH_OBJECTS = 2000
+
+# 逐批写出的部分及其数据在提取结果中的位置
+BATCH_SECTIONS = {
+    'node': 3, 'snatpool': 7, 'monitor': 4, 'pool_member_monitor': 2, 'persistence': 5, 'pool': 1, 'rule': 9,
+    'virtual': 0,
+}
+# 读完整个文件后才输出的部分：auth 由多个块合并提取；profile、virtual_defaults 依赖所有 VS（只保留汇总）；
+# route 部分所有路由在同一个块中。profile（profile、profile_custom 部分）、route 和 persistence（VS 按名称查找）的行
+# 一直保留，数量都很少
+_HELD_POSITIONS = (5, 6, 8)
+
+_POOL_POSITION = 1
+_POOL_MEMBER_POSITION = 2
+_PERSISTENCE_POSITION = 5
+_VS_POSITION = 0
+
+
+def _empty_model():
+    return extract_pools_vs_nodes([])
+
+
+def _append(model, part):
+    for data, new in zip(model, part):
+        for column, values in new.items():
+            data[column].extend(values)
+
+
+def _slice(data, start, end=None):
+    return {column: values[start:end] for column, values in data.items()}
+
+
+class _TxtStream:
+    """
+    流式输出的状态：各部分已读入、还没有写出的行，以及写出后仍需要的汇总信息。
+    每个逐批写出的部分有一个临时文件，只写入各批的对象行（不含部分的表头和结尾），最后按顺序拼接。
+    """
+
+    def __init__(self, spool_dir, snat_cidr=False):
+        self.spool_dir = spool_dir
+        self.options = {'snat_cidr': snat_cidr}
+        self.model = list(_empty_model())
+        self.auth_blocks = []
+        # 本批读入、还没有提取的块
+        self.blocks = []
+        self.persistence_done = 0
+        # 已写出的 VS 汇总（见 virtual_summary），VS 按读入的顺序逐批累计
+        self.summary = None
+        # 已写出的 pool 成员的设置：{pool 名称: {IP:端口: (session, ratio)}}，同名 pool 的成员设置以第一条记录为准
+        self.member_settings = {}
+        empty = _empty_model()
+        graph = build_graph(empty)
+        self.frames = {section: section_frame(empty, section, graph, self.options) for section in BATCH_SECTIONS}
+        self.spools = {section: open(os.path.join(spool_dir, f'{section}.txt'), 'w+') for section in BATCH_SECTIONS}
+        self.scratch = os.path.join(spool_dir, 'scratch.txt')
+
+    def close(self):
+        for spool in self.spools.values():
+            spool.close()
+
+    def add(self, block, batch_objects):
+        """读入一个块：auth 块保留到文件读完（多个块合并提取），其余块每满一批提取一次并写出"""
+        if not block:
+            return
+        if block.startswith('auth '):
+            self.auth_blocks.append(block)
+            return
+        self.blocks.append(block)
+        if len(self.blocks) >= batch_objects:
+            self.flush()
+
+    def _render(self, tables, section, graph=None, cut=True, **options):
+        """
+        输出单个部分，返回对象行的文本。
+        :param tables: {提取结果中的位置: 数据}，其余位置为空表
+        :param cut: 是否去掉该部分的表头和结尾
+        """
+        model = _empty_model()
+        for position, data in tables.items():
+            model[position].update(data)
+        write_to_txt(self.scratch, *model, sections={section}, graph=graph, **self.options, **options)
+        with open(self.scratch, 'r') as scratch_file:
+            text = scratch_file.read()
+        if cut:
+            header, trailer = self.frames[section]
+            if header and text.startswith(header):
+                text = text[len(header):]
+            if trailer and text.endswith(trailer):
+                text = text[:len(text) - len(trailer)]
+        return text
+
+    def _pool_members(self, pool_data, member_data):
+        """
+        pool 部分使用的成员数据：同名 pool 在前面的批次中已经写出时，把前面记录的成员设置放在前面，
+        与整体输出时按第一条记录查找成员设置的结果一致
+        """
+        prefix = {column: [] for column in member_data}
+        for pool_name in dict.fromkeys(pool_data['pool_name']):
+            for member, (session, ratio) in self.member_settings.get(pool_name, {}).items():
+                member_ip, _, member_port = member.rpartition(':')
+                for column in prefix:
+                    prefix[column].append('')
+                prefix['pool_name'][-1] = pool_name
+                prefix['pool_member_ip'][-1] = member_ip
+                prefix['pool_member_port'][-1] = member_port
+                prefix['pool_member_session_user_disabled'][-1] = session
+                prefix['pool_member_ratio'][-1] = ratio
+        if not prefix['pool_name']:
+            return member_data
+        return {column: prefix[column] + member_data[column] for column in member_data}
+
+    def _ready_vs(self, graph):
+        """
+        可以写出的 VS 数：VS 引用的会话保持要按名称查找 persistence 的行，引用的会话保持还没有读入时，
+        从这个 VS 开始保留到文件读完，保证输出顺序不变
+        """
+        vs_data = self.model[_VS_POSITION]
+        for row in range(row_count(vs_data)):
+            if "/Common/" in vs_data['vs_persist'][row]:
+                names = graph.target_names(graph.row_id('virtual', row), 'persistence')
+                if names and graph.row_of('persistence', names[0].strip()) is None:
+                    return row
+        return row_count(vs_data)
+
+    def flush(self, final=False):
+        """提取本批的块，把各部分的行写到各自的临时文件；final 为 True 时表示文件已读完，剩下的 VS 全部写出"""
+        model = self.model
+        _append(model, extract_pools_vs_nodes(self.blocks))
+        self.blocks = []
+        spools = self.spools
+        for section in ('node', 'snatpool', 'monitor', 'rule'):
+            position = BATCH_SECTIONS[section]
+            if row_count(model[position]):
+                spools[section].write(self._render({position: model[position]}, section))
+                model[position] = _slice(model[position], 0, 0)
+
+        pool_data, member_data = model[_POOL_POSITION], model[_POOL_MEMBER_POSITION]
+        if row_count(member_data):
+            spools['pool_member_monitor'].write(
+                self._render({_POOL_MEMBER_POSITION: member_data}, 'pool_member_monitor'))
+        if row_count(pool_data):
+            spools['pool'].write(self._render(
+                {_POOL_POSITION: pool_data, _POOL_MEMBER_POSITION: self._pool_members(pool_data, member_data)},
+                'pool'))
+        for pool_name, member_ip, member_port, session, ratio in zip(
+                member_data['pool_name'], member_data['pool_member_ip'], member_data['pool_member_port'],
+                member_data['pool_member_session_user_disabled'], member_data['pool_member_ratio']):
+            self.member_settings.setdefault(pool_name, {}).setdefault(f'{member_ip}:{member_port}', (session, ratio))
+        model[_POOL_POSITION] = _slice(pool_data, 0, 0)
+        model[_POOL_MEMBER_POSITION] = _slice(member_data, 0, 0)
+
+        persistence_data = model[_PERSISTENCE_POSITION]
+        if row_count(persistence_data) > self.persistence_done:
+            spools['persistence'].write(
+                self._render({_PERSISTENCE_POSITION: _slice(persistence_data, self.persistence_done)}, 'persistence'))
+            self.persistence_done = row_count(persistence_data)
+
+        vs_data = model[_VS_POSITION]
+        if row_count(vs_data):
+            # 其他逐批写出的部分已经清空，依赖图中只有 VS 和一直保留的行
+            graph = build_graph(model)
+            ready = row_count(vs_data) if final else self._ready_vs(graph)
+            if ready:
+                vs_ready = _slice(vs_data, 0, ready)
+                vs_done = self.summary['rows'] if self.summary else 0
+                self.summary = virtual_summary(vs_ready, graph, summary=self.summary)
+                oneconnect_row = self.summary['oneconnect_row']
+                spools['virtual'].write(self._render(
+                    {_VS_POSITION: vs_ready, _PERSISTENCE_POSITION: persistence_data}, 'virtual', graph,
+                    vs_summary=dict(self.summary,
+                                    oneconnect_row=None if oneconnect_row is None else oneconnect_row - vs_done)))
+                model[_VS_POSITION] = _slice(vs_data, ready)
+
+    def finish(self, txt_file_path):
+        """写出剩下的行，按 TXT_SECTIONS 的顺序拼接各部分，写到 txt 文件"""
+        self.flush(final=True)
+        held = {position: self.model[position] for position in _HELD_POSITIONS}
+        held[10] = extract_pools_vs_nodes(self.auth_blocks)[10]
+        with open(txt_file_path, 'w') as txt_file:
+            for section in TXT_SECTIONS:
+                if section in BATCH_SECTIONS:
+                    header, trailer = self.frames[section]
+                    spool = self.spools[section]
+                    spool.seek(0)
+                    txt_file.write(header)
+                    shutil.copyfileobj(spool, txt_file)
+                    txt_file.write(trailer)
+                else:
+                    txt_file.write(self._render(held, section, cut=False, vs_summary=self.summary))
+
+
+def stream_to_txt(file, txt_file_path, snat_cidr=False, batch_objects=STREAM_BATCH_OBJECTS):
+    """
+    流式输出 txt：从文件句柄逐块读取配置（Conf_Split.iter_blocks），每个对象读入后立即提取，
+    每读入 batch_objects 个对象就把各部分已读入的行写到各自的临时文件并丢弃，文件读完后按 TXT_SECTIONS 的顺序拼接。
+    输出与对整个文件提取后调用 write_to_txt 的结果相同（不裁剪未引用的对象）。
+    内存中只保留一批对象，以及 persistence、profile、route 的行和 VS 的汇总；
+    VS 引用的会话保持在文件中位于 VS 之后时，该 VS 及之后的 VS 保留到文件读完再写出。
+    :param file: 以二进制方式打开的配置文件句柄
+    :param txt_file_path: txt 文件路径
+    :param snat_cidr: SNAT pool 成员是否按 CIDR 网段输出（见 write_to_txt）
+    :param batch_objects: 每批的对象数
+    :return: 读入的对象数
+    """
+    count = 0
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(txt_file_path) or None) as spool_dir:
+        stream = _TxtStream(spool_dir, snat_cidr)
+        try:
+            for block in iter_blocks(file):
+                stream.add(block, batch_objects)
+                count += 1
+            stream.finish(txt_file_path)
+        finally:
+            stream.close()
+    return count
@@ -1,4 +1,37 @@
-import pandas as pd
+import xlsxwriter
+
+from .Conf_Rows import row_count
+
+# 表头样式，与 pandas.DataFrame.to_excel 的默认表头一致
+_HEADER_FORMAT = {'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'}
+
+
+def _cell_value(value):
+    """列表等非标量的值按字符串写入，与 to_excel 的处理一致"""
+    if isinstance(value, (list, tuple, set, dict)):
+        return str(value)
+    return value
+
+
+def write_sheets(excel_file_path, sheets):
+    """
+    直接用 xlsxwriter 的 constant_memory 模式逐行写入 Excel，不构建 DataFrame。
+    constant_memory 模式下每写完一行就刷到临时文件，内存占用与行数无关。
+    :param excel_file_path: Excel 文件路径
+    :param sheets: [(sheet 名称, {列名: 值列表}), ...]，空字典的 sheet 不写入
+    """
+    with xlsxwriter.Workbook(excel_file_path, {'constant_memory': True}) as workbook:
+        header_format = workbook.add_format(_HEADER_FORMAT)
+        for sheet_name, data in sheets:
+            if not data:
+                continue
+            worksheet = workbook.add_worksheet(sheet_name)
+            columns = list(data.values())
+            for col, header in enumerate(data):
+                worksheet.write(0, col, header, header_format)
+            for row in range(row_count(data)):
+                for col, column in enumerate(columns):
+                    worksheet.write(row + 1, col, _cell_value(column[row]))
 
 
 def write_to_excel(excel_file_path, vs_data, pool_data, pool_member_data, node_data, monitor_data, persistence_data,
@@ -6,38 +39,16 @@ def write_to_excel(excel_file_path, vs_data, pool_data, pool_member_data, node_d
     """
     将数据写入 Excel 文件
     """
-    # 创建数据框并将数据存储到Excel文件中
-    with pd.ExcelWriter(excel_file_path, engine='xlsxwriter') as writer:
-        if pool_data:
-            pool_df = pd.DataFrame(pool_data)
-            pool_df.to_excel(writer, sheet_name='Pools', index=False)
-        if pool_member_data:
-            pool_member_df = pd.DataFrame(pool_member_data)
-            pool_member_df.to_excel(writer, sheet_name='Pool_members', index=False)
-        if vs_data:
-            vs_df = pd.DataFrame(vs_data)
-            vs_df.to_excel(writer, sheet_name='VirtualServers', index=False)
-        if node_data:
-            node_df = pd.DataFrame(node_data)
-            node_df.to_excel(writer, sheet_name='Nodes', index=False)
-        if monitor_data:
-            monitor_df = pd.DataFrame(monitor_data)
-            monitor_df.to_excel(writer, sheet_name='Monitor', index=False)
-        if persistence_data:
-            persistence_df = pd.DataFrame(persistence_data)
-            persistence_df.to_excel(writer, sheet_name='Persistence', index=False)
-        if profile_data:
-            profile_df = pd.DataFrame(profile_data)
-            profile_df.to_excel(writer, sheet_name='Profile', index=False)
-        if snatpool_data:
-            snatpool_df = pd.DataFrame(snatpool_data)
-            snatpool_df.to_excel(writer, sheet_name='SNATPool', index=False)
-        if route_data:
-            route_df = pd.DataFrame(route_data)
-            route_df.to_excel(writer, sheet_name='Route', index=False)
-        if rule_data:
-            rule_df = pd.DataFrame(rule_data)
-            rule_df.to_excel(writer, sheet_name='Rule', index=False)
-        if auth_date:
-            auth_df = pd.DataFrame(auth_date)
-            auth_df.to_excel(writer, sheet_name='Auth', index=False)
+    write_sheets(excel_file_path, [
+        ('Pools', pool_data),
+        ('Pool_members', pool_member_data),
+        ('VirtualServers', vs_data),
+        ('Nodes', node_data),
+        ('Monitor', monitor_data),
+        ('Persistence', persistence_data),
+        ('Profile', profile_data),
+        ('SNATPool', snatpool_data),
+        ('Route', route_data),
+        ('Rule', rule_data),
+        ('Auth', auth_date),
+    ])
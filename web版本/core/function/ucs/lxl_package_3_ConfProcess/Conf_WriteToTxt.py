@@ -1,41 +1,9 @@
 import re
-from ipaddress import ip_address, IPv6Address
 
-import pandas as pd
-
-
-# 检查ip地址是否连续
-
-def is_consecutive(ip_list):
-    """
-    检查 IP 地址是否是连续的。
-    """
-    sorted_ips = sorted(ip_list, key=lambda ip: ip_address(ip))
-    for i in range(1, len(sorted_ips)):
-        if ip_address(sorted_ips[i]) != ip_address(sorted_ips[i - 1]) + 1:
-            return False
-    return True
-
-
-# 检查ip地址是否连续
-def get_ip_ranges(ip_list):
-    """
-    将连续的 IP 地址合并为范围。
-    """
-    sorted_ips = sorted(ip_list, key=lambda ip: ip_address(ip))
-    ranges = []
-    start = sorted_ips[0]
-    prev = sorted_ips[0]
-
-    for ip in sorted_ips[1:]:
-        if ip_address(ip) == ip_address(prev) + 1:
-            prev = ip
-        else:
-            ranges.append((start, prev))
-            start = ip
-            prev = ip
-    ranges.append((start, prev))
-    return ranges
+from .Conf_Graph import build_graph
+# 检查ip地址是否连续、合并连续的ip地址（地址只解析一次，按整数排序后查找连续区间）
+from .Conf_IpRange import get_ip_networks, get_ip_ranges, is_consecutive
+from .Conf_Rows import iter_rows, row_count
 
 
 def format_irule_as_tcl(content, indent_level=4):
@@ -93,49 +61,86 @@ def format_irule_as_tcl(content, indent_level=4):
     return formatted_content
 
 
+# txt 中各部分的名称，按输出（加载）顺序排列
+TXT_SECTIONS = ('auth', 'node', 'snatpool', 'monitor', 'pool_member_monitor', 'persistence', 'profile',
+                'profile_custom', 'pool', 'rule', 'virtual', 'virtual_defaults', 'route')
+
+
+def _emit(sections, name):
+    """sections 为 None 时输出全部部分，否则只输出其中列出的部分"""
+    return sections is None or name in sections
+
+
+def virtual_summary(vs_data, graph, vs_rows=None, summary=None):
+    """
+    汇总 VS 之间相互影响的信息：profile 部分列出所有 VS 引用的 profile，VS 之后输出的默认会话保持和 oneconnect
+    取决于所有 VS，前面的 VS 关联了 oneconnect 时后面使用 SNAT pool 的 VS 也关联 oneconnect。
+    :param vs_data: VS 数据
+    :param graph: 对象依赖图
+    :param vs_rows: vs_data 各行在依赖图中的行号，vs_data 只是依赖图中的部分 VS 时传入
+    :param summary: 在已有的汇总上继续累计（分批汇总时 vs_data 接在前面汇总过的 VS 之后）
+    :return: {'profiles': VS 引用的 profile 集合, 'cookie': 是否使用默认 cookie 会话保持,
+              'source_addr': 是否使用默认 source_addr 会话保持,
+              'oneconnect_row': 第一个关联 oneconnect 的 VS 的行号（没有时为 None）, 'rows': 已汇总的 VS 数}
+    """
+    if summary is None:
+        summary = {'profiles': set(), 'cookie': False, 'source_addr': False, 'oneconnect_row': None, 'rows': 0}
+    for idx, row in iter_rows(vs_data):
+        vs_node = graph.row_id('virtual', vs_rows[idx] if vs_rows is not None else idx)
+        matches = []
+        if "/Common/" in row["vs_profiles"]:
+            matches = graph.target_names(vs_node, 'profile')
+            # 与 virtual 部分的判断一致：关联 2 到 4 个 profile 且其中有 oneconnect
+            if summary['oneconnect_row'] is None and 2 <= len(matches) <= 4 and "oneconnect" in matches:
+                summary['oneconnect_row'] = summary['rows'] + idx
+        if "udp" in row["vs_protocol"]:
+            matches.append("udp")
+        summary['profiles'].update(matches)
+
+        if row["vs_ip_forward"] != "ip-forward":
+            if "/Common/cookie {" in row["vs_persist"]:
+                summary['cookie'] = True
+            elif "/Common/source_addr {" in row["vs_persist"]:
+                summary['source_addr'] = True
+    summary['rows'] += row_count(vs_data)
+    return summary
+
+
 def write_to_txt(txt_file_path, vs_data, pool_data, pool_member_data, node_data, monitor_data, persistence_data,
-                 profile_data, snatpool_data, route_data, rule_data, auth_date):
+                 profile_data, snatpool_data, route_data, rule_data, auth_date, sections=None, graph=None,
+                 snat_cidr=False, vs_rows=None, vs_summary=None):
     """
     将数据写入文本文件
+    :param sections: 只输出 TXT_SECTIONS 中的这些部分（其余数据仍可用于查找），None 表示全部输出
+    :param graph: 对象依赖图（Conf_Graph.build_graph），VS 引用的 profile、会话保持、SNAT pool、iRule 都从图中查找；
+                  为 None 时根据传入的数据建立
+    :param snat_cidr: SNAT pool 的成员按最少的 CIDR 网段输出（member 网络地址 广播地址 netmask /前缀长度），
+                      默认按连续的地址范围输出
+    :param vs_rows: vs_data 各行在 graph 中的行号，vs_data 只是 graph 中的部分 VS（分片）时传入
+    :param vs_summary: 全部 VS 的汇总（见 virtual_summary），vs_data 只是部分 VS（分片、流式输出）时由调用方传入，
+                       其中的 oneconnect_row 按 vs_data 中的行号计算（在 vs_data 之前时为负数）；
+                       为 None 时根据 vs_data 汇总
     """
+    if graph is None:
+        graph = build_graph((vs_data, pool_data, pool_member_data, node_data, monitor_data, persistence_data,
+                             profile_data, snatpool_data, route_data, rule_data, auth_date))
+    if vs_summary is None:
+        vs_summary = virtual_summary(vs_data, graph, vs_rows)
     # 省略其他写入文本文件的部分...
     # 将汇总信息写入 txt 文件
 
-    if pool_data:
-        pool_df = pd.DataFrame(pool_data)
-    if pool_member_data:
-        pool_member_df = pd.DataFrame(pool_member_data)
-    if vs_data:
-        vs_df = pd.DataFrame(vs_data)
-    if node_data:
-        node_df = pd.DataFrame(node_data)
-    if monitor_data:
-        monitor_df = pd.DataFrame(monitor_data)
-    if persistence_data:
-        persistence_df = pd.DataFrame(persistence_data)
-    if profile_data:
-        profile_df = pd.DataFrame(profile_data)
-    if snatpool_data:
-        snatpool_df = pd.DataFrame(snatpool_data)
-    if route_data:
-        route_df = pd.DataFrame(route_data)
-    if rule_data:
-        rule_df = pd.DataFrame(rule_data)
-    if auth_date:
-        auth_df = pd.DataFrame(auth_date)
-
     with open(txt_file_path, 'w') as txt_file:
-        if auth_date:
+        if auth_date and _emit(sections, 'auth'):
             txt_file.write('################  Auth Information:  ################\n')
-            for idx, row in auth_df.iterrows():
+            for idx, row in iter_rows(auth_date):
                 if "radius" in row["tacacs_source_type"]:
                     txt_file.write('radius-server read-write\n')
                     txt_file.write(f'# 注意：更改 secret XXXXXXXX\n')
                     txt_file.write(f'radius-server host {row["radius_servers"]} secret XXXXXXXX\n')
                     txt_file.write('authentication type radius buffer-local\n')
                     txt_file.write('authentication console type radius buffer-local\n')
-                elif "tacacs" in row.tacacs_source_type:
-                    tacacs_servers = re.findall(r'[\d.]+', row.tacacs_servers)
+                elif "tacacs" in row["tacacs_source_type"]:
+                    tacacs_servers = re.findall(r'[\d.]+', row["tacacs_servers"])
                     txt_file.write(f'# 注意：更改 secret XXXXXXXX\n')
                     for tacacs_server in tacacs_servers:
                         txt_file.write(f'tacacs-server host {tacacs_server} secret XXXXXXXX port 49 timeout 12\n')
@@ -146,15 +151,15 @@ def write_to_txt(txt_file_path, vs_data, pool_data, pool_member_data, node_data,
 
             txt_file.write('\n\n')
 
-        if node_data:
+        if node_data and _emit(sections, 'node'):
             txt_file.write('################  Node Information:  ################\n')
-            for idx, row in node_df.iterrows():
+            for idx, row in iter_rows(node_data):
                 txt_file.write(f'slb node {row["node_ip"]} {row["node_ip"]}\n')
             txt_file.write('\n\n')
 
         # if snatpool_data:
         #     txt_file.write('################  SNAT_Pool Information:  ################\n')
-        #     for idx, row in snatpool_df.iterrows():
+        #     for idx, row in iter_rows(snatpool_data):
         #         txt_file.write(f'ip nat pool {row["snatpool_name"]}\n')
         #         txt_file.write('{\n')
         #         for member in row["snatpool_member"]:
@@ -162,16 +167,24 @@ def write_to_txt(txt_file_path, vs_data, pool_data, pool_member_data, node_data,
         #         txt_file.write('}\n\n')
         #     txt_file.write('\n')
 
-        if snatpool_data:
+        if snatpool_data and _emit(sections, 'snatpool'):
             txt_file.write('################  SNAT_Pool Information:  ################\n')
-            for idx, row in snatpool_df.iterrows():
+            for idx, row in iter_rows(snatpool_data):
                 txt_file.write(f'ip nat pool {row["snatpool_name"]}\n')
                 txt_file.write('{\n')
+                if snat_cidr:
+                    for network in get_ip_networks(row["snatpool_member"]):
+                        member = 'ipv6 member' if network.version == 6 else 'member'
+                        txt_file.write(f'   {member} {network.network_address} {network.broadcast_address} '
+                                       f'netmask /{network.prefixlen}\n')
+                    txt_file.write('}\n\n')
+                    continue
+
                 # 获取 SNAT_Pool 的 IP 范围
                 ranges = get_ip_ranges(row["snatpool_member"])
                 for start, end in ranges:
                     # 根据 IP 地址类型输出 IPv4 或 IPv6 的格式
-                    if isinstance(ip_address(start), IPv6Address):
+                    if ':' in start:
                         if start == end:
                             txt_file.write(f'   ipv6 member {start} {end} netmask /64\n')
                         else:
@@ -184,9 +197,9 @@ def write_to_txt(txt_file_path, vs_data, pool_data, pool_member_data, node_data,
                 txt_file.write('}\n\n')
             txt_file.write('\n')
 
-        if monitor_data:
+        if monitor_data and _emit(sections, 'monitor'):
             txt_file.write('################  Monitor Information:  ################\n')
-            for idx, row in monitor_df.iterrows():
+            for idx, row in iter_rows(monitor_data):
 
                 # 提取间隔和超时时间
                 monitor_interval = int(row["monitor_interval"])
@@ -349,7 +362,7 @@ def write_to_txt(txt_file_path, vs_data, pool_data, pool_member_data, node_data,
 
         # if pool_member_data:
         #     txt_file.write('################  Pool_Member_Ratio Information:  ################\n')
-        #     for idx, row in pool_member_df.iterrows():
+        #     for idx, row in iter_rows(pool_member_data):
         #         pool_name = row['pool_name']
         #         pool_monitor = row['pool_monitor']
         #
@@ -363,8 +376,9 @@ def write_to_txt(txt_file_path, vs_data, pool_data, pool_member_data, node_data,
         #             txt_file.write(f'    member {pool_member_ip}:{pool_member_port} priority {pool_member_ratio}\n')
         #             txt_file.write('\n\n')
 
+        if monitor_data and _emit(sections, 'pool_member_monitor'):
             txt_file.write('################  Pool_Member_Monitor Information:  ################\n')
-            for idx, row in pool_member_df.iterrows():
+            for idx, row in iter_rows(pool_member_data):
                 pool_name = row['pool_name']
                 pool_monitor = row['pool_monitor']
 
@@ -379,9 +393,9 @@ def write_to_txt(txt_file_path, vs_data, pool_data, pool_member_data, node_data,
                     txt_file.write(f'        health-check {pool_member_monitor}\n')
                     txt_file.write('\n\n')
 
-        if persistence_data:
+        if persistence_data and _emit(sections, 'persistence'):
             txt_file.write('################  Persistence Information:  ################\n')
-            for idx, row in persistence_df.iterrows():
+            for idx, row in iter_rows(persistence_data):
                 protocol = row["persistence_protocol"]
                 name = row["persistence_name"]
                 timeout = row["persistence_timeout"]
@@ -409,25 +423,15 @@ def write_to_txt(txt_file_path, vs_data, pool_data, pool_member_data, node_data,
                 txt_file.write('}\n\n')
             txt_file.write('\n')
 
-        if profile_data:
+        if profile_data and _emit(sections, 'profile'):
 
-            # 创建一个空集合来存储不重复的值
-            unique_profiles = set()
+            # VS 引用的 profile（见 virtual_summary），conf 中创建的 profile 用集合去重
+            unique_profiles = vs_summary['profiles']
             conf_creat_profiles = set()
 
             txt_file.write('################  profile Information:  ################\n')
-            for idx, row in vs_df.iterrows():
-                matches = []  # 在每次循环开始时初始化matches列表
-                if "/Common/" in row["vs_profiles"]:
-                    vs_profiles_match = list(re.finditer(r'/Common/+?([^\s{]+)', row["vs_profiles"]))
-                    matches = [match.group(1) for match in vs_profiles_match]
-                if "udp" in row["vs_protocol"]:
-                    matches.append("udp")
-
-                # 将匹配项添加到集合中
-                unique_profiles.update(matches)
 
-            for idx, row in profile_df.iterrows():
+            for idx, row in iter_rows(profile_data):
                 profile_name = row["profile_name"]  # 直接获取profile_name
                 conf_creat_profiles.add(profile_name)  # 使用.add()方法添加到集合中
 
@@ -446,7 +450,7 @@ def write_to_txt(txt_file_path, vs_data, pool_data, pool_member_data, node_data,
             txt_file.write(f'# 对于fastL4的profile，将直接翻译为tcp\n')
             txt_file.write(f'# 对于tcp类型的profile，将直接翻译为tcp和ks_tcp\n')
             for profile in unique_profiles:
-                if profile not in profile_df['profile_name'].values and profile not in ["tcp", "fastL4", "udp"]:
+                if profile not in conf_creat_profiles and profile not in ["tcp", "fastL4", "udp"]:
                     txt_file.write(f'# {profile}\n')
             txt_file.write('\n')
 
@@ -485,7 +489,9 @@ def write_to_txt(txt_file_path, vs_data, pool_data, pool_member_data, node_data,
                         txt_file.write(f'slb profile ftp ftp\n\n')
                         ftp_executed = True  # 设置为已执行
 
-            for idx, row in profile_df.iterrows():
+        if profile_data and _emit(sections, 'profile_custom'):
+            txt_file.write('################  profile_custom Information:  ################\n')
+            for idx, row in iter_rows(profile_data):
                 # 下面是在conf文件中，非默认的profile，进行了单独的处理。
                 if row["profile_defaults-from"] == "http":
                     txt_file.write(f'slb profile http {row["profile_name"]}\n')
@@ -526,7 +532,7 @@ def write_to_txt(txt_file_path, vs_data, pool_data, pool_member_data, node_data,
 
         # if pool_data:
         #     txt_file.write('################  Pool Information:  ################\n')
-        #     for idx, row in pool_df.iterrows():
+        #     for idx, row in iter_rows(pool_data):
         #         txt_file.write(f'slb pool {row["pool_name"]} tcp\n')
         #         txt_file.write('{\n')
         #         if row["pool_monitor"] == "gateway_icmp" or row["pool_monitor"] == "gateway-icmp":
@@ -539,16 +545,25 @@ def write_to_txt(txt_file_path, vs_data, pool_data, pool_member_data, node_data,
         #             txt_file.write(f'    method service-least-connection\n')
         #
         #         for member in row["pool_members"]:
-        #             for idx, pool_members_row in pool_member_df.iterrows():
+        #             for idx, pool_members_row in iter_rows(pool_member_data):
         #                 if pool_members_row["pool_member_session_user_disabled"] == "user-disabled":
         #                     txt_file.write(f'    {member}  disable\n')
         #                 else:
         #                     txt_file.write(f'    {member}\n')
         #         txt_file.write('}\n\n')
         #     txt_file.write('\n')
-        if pool_data:
+        if pool_data and _emit(sections, 'pool'):
             txt_file.write('################  Pool Information:  ################\n')
-            for _, pool_row in pool_df.iterrows():
+
+            # 先建立 (pool_name, "IP:Port") -> (session 状态, ratio) 的索引，同一 member 以第一条记录为准
+            member_settings = {}
+            for pool_name, member_ip, member_port, session_status, ratio in zip(
+                    pool_member_data['pool_name'], pool_member_data['pool_member_ip'],
+                    pool_member_data['pool_member_port'], pool_member_data['pool_member_session_user_disabled'],
+                    pool_member_data['pool_member_ratio']):
+                member_settings.setdefault((pool_name, f'{member_ip}:{member_port}'), (session_status, ratio))
+
+            for _, pool_row in iter_rows(pool_data):
                 pool_name = pool_row["pool_name"]
                 txt_file.write(f'slb pool {pool_name} tcp\n')
                 txt_file.write('{\n')
@@ -563,26 +578,17 @@ def write_to_txt(txt_file_path, vs_data, pool_data, pool_member_data, node_data,
                 if pool_row["pool_lbm"] == "least-connections-member":
                     txt_file.write('    method service-least-connection\n')
 
-                # 3. 处理 members（优化：避免双重循环）
-                # (1) 先筛选当前 pool 的所有 members
-                current_pool_members = pool_member_df[pool_member_df["pool_name"] == pool_name]
-                # print(current_pool_members)
-
-                # (2) 遍历当前 pool 的 members
+                # 3. 处理 members
                 for member in pool_row["pool_members"]:
                     # 提取 IP:Port（例如 "member 10.204.10.153:8087" → "10.204.10.153:8087"）
                     member_ip_port = member.replace("member ", "")
 
-                    # (3) 检查是否有独立配置（用 IP:Port 匹配）
-                    member_info = current_pool_members[
-                        (current_pool_members["pool_member_ip"] + ":" +
-                         current_pool_members["pool_member_port"].astype(str)) == member_ip_port
-                        ]
+                    # 检查是否有独立配置（用 pool 名称和 IP:Port 查索引）
+                    member_info = member_settings.get((pool_name, member_ip_port))
 
-                    if not member_info.empty:
+                    if member_info is not None:
                         # 如果有独立配置（如 disable/ratio）
-                        session_status = member_info.iloc[0]["pool_member_session_user_disabled"]
-                        ratio = member_info.iloc[0]["pool_member_ratio"]
+                        session_status, ratio = member_info
 
                         # 写入 member 行（带 disable 或 weight）
                         if session_status == "user-disabled" and ratio != "":
@@ -600,10 +606,10 @@ def write_to_txt(txt_file_path, vs_data, pool_data, pool_member_data, node_data,
                 txt_file.write('}\n\n')
             txt_file.write('\n')
             
-        if rule_data:
+        if rule_data and _emit(sections, 'rule'):
             txt_file.write('################  rule Information:  ################\n')
             # 遍历规则并分别写入文件
-            for idx, row in rule_df.iterrows():
+            for idx, row in iter_rows(rule_data):
                 # 获取第一行内容作为文件名并附加 `.arl` 后缀
                 rule_content = row["rule_info"].strip()
                 rule_lines = rule_content.splitlines()
@@ -624,22 +630,21 @@ def write_to_txt(txt_file_path, vs_data, pool_data, pool_member_data, node_data,
             txt_file.write('\n')
 
 
-        if vs_data:
+        if vs_data and _emit(sections, 'virtual'):
             txt_file.write('################  Virtual Server Information:  ################\n')
-            persist_default_conf_cookie = 0
-            persist_default_conf_source_addr = 0
-            vs_protocol_stats_in = 0
+            # 从这一行开始，使用 SNAT pool 的 VS 关联 oneconnect（前面有 VS 关联了 oneconnect，见 virtual_summary）
+            oneconnect_row = vs_summary['oneconnect_row']
 
-            for idx, row in vs_df.iterrows():
+            for idx, row in iter_rows(vs_data):
+                vs_node = graph.row_id('virtual', vs_rows[idx] if vs_rows is not None else idx)
                 vs_protocol_stats = ""
                 vs_protocol_other = 0
                 vs_protocol = "tcp"
                 vs_protocol_name = ""
                 # 下面的代码，会判定关联了什么profile，并且根据profile进行相应的协议选择
                 if "/Common/" in row["vs_profiles"]:
-                    vs_profiles_match = list(re.finditer(r'/Common/+?([^\s{]+)', row["vs_profiles"]))
-                    matches = [match.group(1) for match in vs_profiles_match]
-                    if len(vs_profiles_match) == 1:
+                    matches = graph.target_names(vs_node, 'profile')
+                    if len(matches) == 1:
                         if "udp" in row["vs_protocol"]:
                             vs_protocol = "udp"
                             vs_protocol_stats = "1_udp"
@@ -655,13 +660,11 @@ def write_to_txt(txt_file_path, vs_data, pool_data, pool_member_data, node_data,
                                 vs_protocol_stats = "1"
                                 vs_protocol_name = matches[0]
 
-                    elif len(vs_profiles_match) == 2 or len(vs_profiles_match) == 3 or len(vs_profiles_match) == 4:
+                    elif len(matches) == 2 or len(matches) == 3 or len(matches) == 4:
                         if any(keyword in matches for keyword in
                                ["http", "oneconnect", "cookie"]):
                             vs_protocol = "http"
                             vs_protocol_stats = "234_http"
-                            if any(keyword in matches for keyword in ["oneconnect"]):
-                                vs_protocol_stats_in = "oneconnect"
                         elif "ftp" in matches:
                             vs_protocol = "ftp"
                             vs_protocol_stats = "234_ftp"
@@ -672,9 +675,9 @@ def write_to_txt(txt_file_path, vs_data, pool_data, pool_member_data, node_data,
                         vs_protocol_other = 1
                         vs_protocol_stats = "5+"
 
+                vs_persist_names = graph.target_names(vs_node, 'persistence')
                 if "/Common/" in row["vs_persist"]:
-                    vs_persist_match = list(re.finditer(r'/Common/+?([^\s{]+)', row["vs_persist"]))
-                    matches = [match.group(1) for match in vs_persist_match]
+                    matches = vs_persist_names
                     if "cookie" in matches:
                         vs_protocol = "http"
                         vs_protocol_other = 0
@@ -710,19 +713,16 @@ def write_to_txt(txt_file_path, vs_data, pool_data, pool_member_data, node_data,
 
                     # 下面几行代码，是翻译F5关联了默认的会话保持配置，但只考虑了默认的cookie和源地址；如果有其他的默认会话保持，需要改写代码。
                     if "/Common/cookie {" in row["vs_persist"]:
-                        persist_default_conf_cookie = 1
                         txt_file.write(f'        profile persist cookie cookie\n')
                     elif "/Common/source_addr {" in row["vs_persist"]:
-                        persist_default_conf_source_addr = 1
                         txt_file.write(f'        profile persist source-ip source_addr_180s\n')
                     elif "/Common/" in row["vs_persist"]:
-                        # 使用正则表达式匹配vs_persist中的名称
-                        vs_persist_name_match = re.search(r'/Common/+([^\s{]+)', row["vs_persist"])
-                        if vs_persist_name_match:
-                            vs_persist_name = vs_persist_name_match.group(1).strip()
+                        # vs_persist中引用的第一个会话保持
+                        if vs_persist_names:
+                            vs_persist_name = vs_persist_names[0].strip()
                             # 在persistence_data中查找匹配的名称并提取persistence_protocol
-                            if vs_persist_name in persistence_data['persistence_name']:
-                                index = persistence_data['persistence_name'].index(vs_persist_name)
+                            index = graph.row_of('persistence', vs_persist_name)
+                            if index is not None:
                                 vs_persist_protocol = persistence_data['persistence_protocol'][index]
                                 # 将信息写入文本文件
                                 if vs_persist_protocol == "source-addr":
@@ -744,11 +744,11 @@ def write_to_txt(txt_file_path, vs_data, pool_data, pool_member_data, node_data,
                     if "type automap" in row["vs_source_translation"]:
                         txt_file.write(f'        source-nat interface\n')
                     elif "pool /Common/" in row["vs_source_translation"]:
-                        snatpool_name_match = re.search(r'pool /Common/+([^\s{]+)', row["vs_source_translation"])
-                        snatpool_name = snatpool_name_match.group(1).strip()
+                        snatpool_name = graph.target_names(vs_node, 'snatpool')[0].strip()
                         txt_file.write(f'        source-nat pool {snatpool_name}\n')
 
-                    if (vs_protocol_stats_in == "oneconnect") and ("pool /Common/" in row["vs_source_translation"]):
+                    if (oneconnect_row is not None and idx >= oneconnect_row) and (
+                            "pool /Common/" in row["vs_source_translation"]):
                         txt_file.write(f'        profile connection-multiplex oneconnect\n')
 
                     txt_file.write('        path-persist\n')
@@ -756,8 +756,7 @@ def write_to_txt(txt_file_path, vs_data, pool_data, pool_member_data, node_data,
 
                     # rule配置
                     if "/Common/" in row["vs_rule"]:
-                        vs_rule_match = re.search(r'/Common/+?([^\s{]+)', row["vs_rule"])
-                        vs_rule = vs_rule_match.group(1).strip()
+                        vs_rule = graph.target_names(vs_node, 'rule')[0].strip()
                         txt_file.write(f'        erule {vs_rule}\n')
 
                     # connection_limit配置
@@ -769,30 +768,31 @@ def write_to_txt(txt_file_path, vs_data, pool_data, pool_member_data, node_data,
                     txt_file.write('}\n\n')
             txt_file.write('\n')
 
+        if vs_data and _emit(sections, 'virtual_defaults'):
             # 判断vs是否关联了默认的profile
-            if persist_default_conf_cookie:
+            if vs_summary['cookie']:
                 txt_file.write('################  Persistence_default_cookie Information:  ################\n')
                 txt_file.write('slb profile persist cookie cookie\n')
                 txt_file.write('\n\n')
-            elif persist_default_conf_source_addr:
+            elif vs_summary['source_addr']:
                 txt_file.write('################  Persistence_default_source-ip Information:  ################\n')
                 txt_file.write('slb profile persist source-ip source_addr_180s\n')
                 txt_file.write('   timeout 3\n')
                 txt_file.write('\n\n')
 
-            if vs_protocol_stats_in == "oneconnect":
+            if vs_summary['oneconnect_row'] is not None:
                 txt_file.write('################  profile_default_oneconnect Information:  ################\n')
                 txt_file.write('slb profile connection-multiplex oneconnect\n')
                 txt_file.write('\n\n')
 
-        if route_data:
+        if route_data and _emit(sections, 'route'):
             txt_file.write('################  route_data Information:  ################\n')
             if route_data['route_name']:
                 txt_file.write(f'static-route service\n')
                 txt_file.write('{\n')
 
             # 遍历 DataFrame 的每一行
-            for _, row in route_df.iterrows():
+            for _, row in iter_rows(route_data):
                 network = row["route_network"]
                 is_default = network in ('default', 'default-inet6')
 
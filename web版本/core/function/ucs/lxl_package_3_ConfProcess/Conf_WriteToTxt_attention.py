@@ -1,6 +1,7 @@
 import os
 import re
-import pandas as pd
+
+from .Conf_Rows import iter_rows
 
 
 def format_irule_as_tcl(content, indent_level=4):
@@ -58,10 +59,46 @@ def format_irule_as_tcl(content, indent_level=4):
     return formatted_content
 
 
+# 健康检查的别名地址：IPv4、IPv6（不带方括号）或 *，后跟 : 或 . 和端口（* 或数字）
+_MONITOR_ALIAS = re.compile(
+    r'^'
+    r'('
+    r'(\*)|'  # Wildcard *
+    r'(\d{1,3}\.){3}\d{1,3}|'  # IPv4
+    r'([0-9a-fA-F:]+)'  # IPv6 without brackets
+    r')'
+    r'[:.]'  # Separator : or .
+    r'(\*|\d+)$'  # Port (* or number)
+)
+
+
+def build_vs_address_index(vs_data):
+    """
+    建立 VS 地址索引 {VS IP 地址: [VS 名称, ...]}，只遍历一次 VS
+    """
+    index = {}
+    for vs_ip, vs_name in zip(vs_data['vs_ip_add'], vs_data['vs_name']):
+        index.setdefault(vs_ip, []).append(vs_name)
+    return index
+
+
+# 裁剪报告中各类对象的名称
+PRUNED_KIND_NAMES = {
+    'pool': 'Pool',
+    'node': 'Node',
+    'monitor': '健康检查',
+    'persistence': '会话保持',
+    'profile': 'Profile',
+    'snatpool': 'SNAT Pool',
+    'rule': 'iRule',
+}
+
+
 def write_to_txt_attention(txt_file_attention_path, vs_data, pool_data, pool_member_data, node_data, monitor_data,
-                           persistence_data, profile_data, snatpool_data, route_data, rule_data, auth_date):
+                           persistence_data, profile_data, snatpool_data, route_data, rule_data, auth_date, pruned=None):
     # """
     # 将数据写入文本
+    # pruned: Conf_Prune.prune_model 删除的对象 {类型: [名称]}，有内容时在文件末尾列出
     # """
 
     base_name = os.path.splitext(os.path.basename(txt_file_attention_path))[0].replace("_attention", "")
@@ -73,29 +110,18 @@ def write_to_txt_attention(txt_file_attention_path, vs_data, pool_data, pool_mem
         txt_file_attention.write('## 1、需要手动更改 udp/dns 的 pool 的类型为udp##\n\n\n\n\n')
 
         if monitor_data:
-            monitor_df = pd.DataFrame(monitor_data)
-
             # 记录已经处理过的IP地址
             processed_ips = set()
 
             found_conflict = False  # 标记是否找到冲突
+            vs_addresses = build_vs_address_index(vs_data) if vs_data else {}
 
-            for idx, row in monitor_df.iterrows():
+            for idx, row in iter_rows(monitor_data):
                 # 提取 别名端口和别名地址
                 monitor_name = row["monitor_name"]
                 alias = row["monitor_destination"]
                 # Improved regex to handle all cases
-                alias_match = re.search(
-                    r'^'
-                    r'('
-                    r'(\*)|'  # Wildcard *
-                    r'(\d{1,3}\.){3}\d{1,3}|'  # IPv4
-                    r'([0-9a-fA-F:]+)'  # IPv6 without brackets
-                    r')'
-                    r'[:.]'  # Separator : or .
-                    r'(\*|\d+)$',  # Port (* or number)
-                    alias.strip()
-                )
+                alias_match = _MONITOR_ALIAS.search(alias.strip())
                 if alias_match:
                     # Determine IP and port
                     alias_ip = alias_match.group(1)
@@ -112,25 +138,23 @@ def write_to_txt_attention(txt_file_attention_path, vs_data, pool_data, pool_mem
 
 
                     if row["monitor_destination"] != "*:*" and alias_ip != "*":
-                        if vs_data and monitor_name not in processed_ips:  # 检查是否已处理过
-                            vs_df = pd.DataFrame(vs_data)
-                            for idx_vs, row_vs in vs_df.iterrows():
-                                if row_vs["vs_ip_add"] == alias_ip:
-                                    if not found_conflict:  # 如果是第一次找到冲突
-                                        txt_file_attention.write('################  健康检查信息:  ################\n\n')
-                                        found_conflict = True
-                                    txt_file_attention.write(
-                                        f"健康检查{row['monitor_name']}配置别名{row['monitor_destination']}，"
-                                        f"与VS IP地址: {row_vs['vs_ip_add']}可能冲突"
-                                        f"（在120版本中，对自身设备的vs地址进行健康检查可能与预期不符）\n"
-                                    )
-                                    processed_ips.add(alias_ip)  # 记录已处理的IP
-                                    break  # 找到一个匹配后就可以跳出循环
+                        # 按地址索引直接查找使用该地址的VS
+                        conflict_vs_names = vs_addresses.get(alias_ip)
+                        if conflict_vs_names and monitor_name not in processed_ips:  # 检查是否已处理过
+                            if not found_conflict:  # 如果是第一次找到冲突
+                                txt_file_attention.write('################  健康检查信息:  ################\n\n')
+                                found_conflict = True
+                            txt_file_attention.write(
+                                f"健康检查{row['monitor_name']}配置别名{row['monitor_destination']}，"
+                                f"与VS IP地址: {alias_ip}可能冲突"
+                                f"（在120版本中，对自身设备的vs地址进行健康检查可能与预期不符）\n"
+                            )
+                            # 列出使用该地址的所有VS
+                            txt_file_attention.write(f"    使用该地址的VS: {', '.join(conflict_vs_names)}\n")
+                            processed_ips.add(alias_ip)  # 记录已处理的IP
 
         # 处理iRule规则,创建irule文件夹，以txt文件方式，写入文件夹
         if rule_data:
-            rule_df = pd.DataFrame(rule_data)
-
             # 准备irule文件夹路径（只在有rule_data时才创建）
             irule_folder = os.path.join(os.path.dirname(txt_file_attention_path), f"{base_name}_irule")
 
@@ -138,7 +162,7 @@ def write_to_txt_attention(txt_file_attention_path, vs_data, pool_data, pool_mem
             need_create_folder = False
 
             # 第一次遍历检查是否有有效内容
-            for idx, row in rule_df.iterrows():
+            for idx, row in iter_rows(rule_data):
                 rule_content = row["rule_info"].strip()
                 rule_lines = rule_content.splitlines()
 
@@ -153,7 +177,7 @@ def write_to_txt_attention(txt_file_attention_path, vs_data, pool_data, pool_mem
                 os.makedirs(irule_folder, exist_ok=True)
 
                 # 第二次遍历实际写入文件
-                for idx, row in rule_df.iterrows():
+                for idx, row in iter_rows(rule_data):
                     rule_content = row["rule_info"].strip()
                     rule_lines = rule_content.splitlines()
 
@@ -180,4 +204,13 @@ def write_to_txt_attention(txt_file_attention_path, vs_data, pool_data, pool_mem
                                 print(f"无法写入rule文件 {file_name}: {str(e)}")
                                 continue
 
+        # 裁剪掉的对象（没有被VS引用，未翻译）
+        if pruned:
+            txt_file_attention.write('\n################  未翻译的对象（没有被VS引用）:  ################\n\n')
+            for kind, names in pruned.items():
+                txt_file_attention.write(f'## {PRUNED_KIND_NAMES.get(kind, kind)}: {len(names)} 个\n')
+                for name in names:
+                    txt_file_attention.write(f'#  {name}\n')
+                txt_file_attention.write('\n')
+
 
@@ -3,26 +3,23 @@ import re
 import tkinter as tk
 from tkinter import filedialog
 
-import pandas as pd
+from ..lxl_package_3_ConfProcess.Conf_Cache import load_or_extract
+from ..lxl_package_3_ConfProcess.Conf_Parallel import list_conf_files, run_files, summarize
+from ..lxl_package_3_ConfProcess.Conf_Rows import iter_rows
+from ..lxl_package_3_ConfProcess.Conf_Split import BASE_BLOCK_PREFIXES, split_blocks as split_conf_blocks
+from ..lxl_package_3_ConfProcess.Conf_WriteToExcel import write_sheets
 
+# 解析器版本：提取逻辑或返回结构有变化时需要修改，使旧的解析缓存失效
+PARSER_VERSION = 'base-extract-1'
 
-def split_blocks(content):
-    blocks = []
-    current_block = []
-
-    for line in content.split('\n'):
-        if re.match(r'^(cm|net|security|sys)', line) or line.startswith("#"):
-            # if re.match(r'^[a-zA-Z]', line) or line.startswith("#"):
-            if current_block:
-                blocks.append('\n'.join(current_block))
-            current_block = [line]
-        elif line:
-            current_block.append(line)
 
-    if current_block:
-        blocks.append('\n'.join(current_block))
-
-    return blocks
+def split_blocks(content):
+    """
+    将 bigip_base.conf 内容分割成块描述符（与 bigip.conf 共用同一个分块实现，只是块起始前缀不同）。
+    :param content: 配置文件内容
+    :return: Block 列表
+    """
+    return split_conf_blocks(content, BASE_BLOCK_PREFIXES)
 
 
 def extract_pools_vs_nodes(blocks):
@@ -44,8 +41,10 @@ def extract_pools_vs_nodes(blocks):
                    'syslog_remote_servers': []}
     ntp_data = {'ntp_servers_match': [], 'ntp_timezone': []}
 
-    for block in blocks:
-        if block:
+    for descriptor in blocks:
+        if descriptor:
+            # base 配置文件较小，块文本在这里统一切出
+            block = descriptor.text
             if block.startswith('sys management-route '):
                 mgmt_route_name_match = re.search(r'sys management-route /Common/+([^\s{]+)', block)
                 mgmt_route_name = mgmt_route_name_match.group(1) if mgmt_route_name_match else ''
@@ -221,7 +220,12 @@ def extract_pools_vs_nodes(blocks):
         httpd_data, snmp_data, syslog_data, ntp_data)
 
 
-def process_file(file_path):
+def read_and_extract(file_path):
+    """
+    读取并提取单个 bigip_base.conf 文件
+    :param file_path: 文件路径
+    :return: extract_pools_vs_nodes 的结果，无法读取时返回 None
+    """
     encodings_to_try = ['utf-8', 'utf-8-sig', 'ISO-8859-1', 'latin-1']
 
     for encoding in encodings_to_try:
@@ -234,69 +238,108 @@ def process_file(file_path):
             pass
     else:
         print(f"Error: Unable to read file {file_path} with any of the tried encodings.")
-        return
+        return None
 
     # 继续处理文件内容
-    blocks = split_blocks(content)
-    mgmt_route_data, vlan_data, trunk_data, hostname_data, self_data, mgmt_ip_data, device_group_data, sshd_data, httpd_data, snmp_data, syslog_data, ntp_data = extract_pools_vs_nodes(
-        blocks)
+    return extract_pools_vs_nodes(split_blocks(content))
+
+
+def process_file(file_path, excel=True, cache_dir=None):
+    """
+    处理单个 bigip_base.conf 文件，输出 Excel 和 txt 文件。文件无法读取时抛出 OSError，由调用方记录为失败（见 run_files）。
+    :param file_path: 文件路径
+    :param excel: 是否输出 Excel 文件；为 False 时只输出 txt
+    :param cache_dir: 解析缓存目录；文件内容和解析器版本都没变时直接使用缓存的提取结果
+    """
+    extracted = load_or_extract(file_path, PARSER_VERSION, lambda: read_and_extract(file_path), cache_dir)
+    if extracted is None:
+        raise OSError(f"无法读取文件: {file_path}")
 
     # 获取输出目录（与输入文件同级的output文件夹）
     output_dir = os.path.join(os.path.dirname(file_path), 'output')
-    os.makedirs(output_dir, exist_ok=True)
     base_name = os.path.splitext(os.path.basename(file_path))[0]
+    write_model(extracted, output_dir, base_name, excel)
+
+
+def process_content(content, output_dir, base_name, excel=True, cache_dir=None):
+    """
+    处理已在内存中的 bigip_base.conf 内容（例如直接从 UCS 归档成员读出），不需要先写到磁盘再读取。
+    :param content: 配置文件内容（bytes）
+    :param output_dir: 输出目录
+    :param base_name: 输出文件名（不含扩展名）
+    :param excel: 是否输出 Excel 文件
+    :param cache_dir: 解析缓存目录
+    """
+    extracted = load_or_extract(None, PARSER_VERSION, lambda: extract_pools_vs_nodes(split_blocks(content)),
+                                cache_dir, content=content)
+    write_model(extracted, output_dir, base_name, excel)
+
+
+def _name_index(names, rows=None):
+    """
+    {名称: [行号, ...]}，行号按原来的顺序，用于按名称直接查找（代替逐行比较 ==）
+    :param rows: 只索引这些行，None 表示全部行
+    """
+    index = {}
+    for row in range(len(names)) if rows is None else rows:
+        index.setdefault(names[row], []).append(row)
+    return index
+
+
+def _substring_index(names):
+    """
+    {名称中的任意子串: [行号, ...]}，行号按原来的顺序。
+    查找结果与逐行判断 `子串 in 名称` 的结果和顺序一致（trunk 名称很短，子串数量不大）
+    """
+    index = {}
+    for row, name in enumerate(names):
+        substrings = {name[start:end] for start in range(len(name) + 1) for end in range(start, len(name) + 1)}
+        for substring in substrings:
+            index.setdefault(substring, []).append(row)
+    return index
+
+
+def write_model(extracted, output_dir, base_name, excel=True):
+    """
+    根据提取结果输出 Excel 和 txt 文件。
+    :param extracted: extract_pools_vs_nodes 的返回值
+    :param output_dir: 输出目录
+    :param base_name: 输出文件名（不含扩展名）
+    :param excel: 是否输出 Excel 文件
+    """
+    mgmt_route_data, vlan_data, trunk_data, hostname_data, self_data, mgmt_ip_data, device_group_data, sshd_data, httpd_data, snmp_data, syslog_data, ntp_data = extracted
+
+    os.makedirs(output_dir, exist_ok=True)
     excel_file_path = os.path.join(output_dir, base_name + '.xlsx')
     txt_file_path = os.path.join(output_dir, base_name + '.txt')
 
-    # 创建数据框并将数据存储到Excel文件中
-    with pd.ExcelWriter(excel_file_path, engine='xlsxwriter') as writer:
-        if hostname_data:
-            hostname_df = pd.DataFrame(hostname_data)
-            hostname_df.to_excel(writer, sheet_name='Hostname', index=False)
-        if vlan_data:
-            vlan_df = pd.DataFrame(vlan_data)
-            vlan_df.to_excel(writer, sheet_name='Vlan', index=False)
-        if trunk_data:
-            trunk_df = pd.DataFrame(trunk_data)
-            trunk_df.to_excel(writer, sheet_name='Trunk', index=False)
-        if self_data:
-            self_df = pd.DataFrame(self_data)
-            self_df.to_excel(writer, sheet_name='Self_IP', index=False)
-        if mgmt_route_data:
-            mgmt_route_df = pd.DataFrame(mgmt_route_data)
-            mgmt_route_df.to_excel(writer, sheet_name='Mgmt_Route', index=False)
-        if mgmt_ip_data:
-            mgmt_ip_df = pd.DataFrame(mgmt_ip_data)
-            mgmt_ip_df.to_excel(writer, sheet_name='Mgmt_IP', index=False)
-        if device_group_data:
-            device_group_data_df = pd.DataFrame(device_group_data)
-            device_group_data_df.to_excel(writer, sheet_name='Device_group', index=False)
-        if sshd_data:
-            sshd_data_df = pd.DataFrame(sshd_data)
-            sshd_data_df.to_excel(writer, sheet_name='sshd', index=False)
-        if httpd_data:
-            httpd_data_df = pd.DataFrame(httpd_data)
-            httpd_data_df.to_excel(writer, sheet_name='httpd', index=False)
-        if snmp_data:
-            snmp_data_df = pd.DataFrame(snmp_data)
-            snmp_data_df.to_excel(writer, sheet_name='snmp', index=False)
-        if syslog_data:
-            syslog_data_df = pd.DataFrame(syslog_data)
-            syslog_data_df.to_excel(writer, sheet_name='Syslog', index=False)
-        if ntp_data:
-            ntp_data_df = pd.DataFrame(ntp_data)
-            ntp_data_df.to_excel(writer, sheet_name='NTP', index=False)
+    # 将数据逐行写入Excel文件
+    if excel:
+        write_sheets(excel_file_path, [
+            ('Hostname', hostname_data),
+            ('Vlan', vlan_data),
+            ('Trunk', trunk_data),
+            ('Self_IP', self_data),
+            ('Mgmt_Route', mgmt_route_data),
+            ('Mgmt_IP', mgmt_ip_data),
+            ('Device_group', device_group_data),
+            ('sshd', sshd_data),
+            ('httpd', httpd_data),
+            ('snmp', snmp_data),
+            ('Syslog', syslog_data),
+            ('NTP', ntp_data),
+        ])
 
     # 将汇总信息写入txt文件
     with open(txt_file_path, 'w') as txt_file:
         if hostname_data:
             txt_file.write('################  Hostname Information:  ################\n')
-            for idx, row in hostname_df.iterrows():
+            for idx, row in iter_rows(hostname_data):
                 txt_file.write(f'hostname {row["hostname"]}\n\n')
 
         if trunk_data:
             txt_file.write('################  Trunk Information:  ################\n')
-            for idx, row in trunk_df.iterrows():
+            for idx, row in iter_rows(trunk_data):
                 if row["trunk_interfaces"] and row["trunk_lacp"] == "enabled":
                     # 按空格分割存储
                     trunk_interfaces_id = row["trunk_interfaces"].split()
@@ -324,30 +367,32 @@ def process_file(file_path):
 
             # 用于存储已经写入的 VLAN 配置（通过 VLAN Tag 和名称的组合唯一标识）
             written_vlans = set()
+            # trunk 名称的子串索引：接口名称包含在 trunk 名称中即视为该 trunk，按 trunk 的顺序取第一个未写入的
+            trunk_index = _substring_index(trunk_data['trunk_name']) if trunk_data else {}
+            trunk_ids = trunk_data['trunk_id'] if trunk_data else []
 
-            for idx_vlan, row_vlan in vlan_df.iterrows():
+            for idx_vlan, row_vlan in iter_rows(vlan_data):
                 vlan_interfaces_name_match = re.search(r'([^\s]+) \{\n', row_vlan["vlan_interfaces"])
                 vlan_interfaces_name = vlan_interfaces_name_match.group(1) if vlan_interfaces_name_match else ''
 
                 # Flag to track if this VLAN was already written with a trunk
                 written_with_trunk = False
 
-                for idx_trunk, row_trunk in trunk_df.iterrows():
-                    # if "tagged" in row_vlan["vlan_interfaces"]:
+                for trunk_row in trunk_index.get(vlan_interfaces_name, ()):
                     # 优先处理 trunk 的情况
-                    if vlan_interfaces_name in row_trunk["trunk_name"]:
-                        unique_key = (row_vlan["vlan_tag"], row_vlan["vlan_name"], "trunk" + str(row_trunk["trunk_id"]))
-                        if unique_key not in written_vlans:
-                            # 写入 trunk 配置
-                            txt_file.write(f'vlan {row_vlan["vlan_tag"]}\n')
-                            txt_file.write('{\n')
-                            txt_file.write(f'    tagged trunk{row_trunk["trunk_id"]}\n')
-                            txt_file.write('    route-intf enable-ve\n')
-                            txt_file.write(f'    name \"{row_vlan["vlan_name"]}\"\n')
-                            txt_file.write('}\n\n')
-                            written_vlans.add(unique_key)
-                            written_with_trunk = True
-                            break  # 优先 trunk，跳出 trunk 循环
+                    trunk_id = trunk_ids[trunk_row]
+                    unique_key = (row_vlan["vlan_tag"], row_vlan["vlan_name"], "trunk" + str(trunk_id))
+                    if unique_key not in written_vlans:
+                        # 写入 trunk 配置
+                        txt_file.write(f'vlan {row_vlan["vlan_tag"]}\n')
+                        txt_file.write('{\n')
+                        txt_file.write(f'    tagged trunk{trunk_id}\n')
+                        txt_file.write('    route-intf enable-ve\n')
+                        txt_file.write(f'    name \"{row_vlan["vlan_name"]}\"\n')
+                        txt_file.write('}\n\n')
+                        written_vlans.add(unique_key)
+                        written_with_trunk = True
+                        break  # 优先 trunk，跳出 trunk 循环
 
                 # 如果没有写入 trunk 配置，则处理 interfaces
                 if not written_with_trunk and row_vlan["vlan_interfaces"]:
@@ -363,12 +408,12 @@ def process_file(file_path):
 
         # if vlan_data:
         #     txt_file.write('################  VLAN Information:  ################\n')
-        #     for idx_vlan, row_vlan in vlan_df.iterrows():
+        #     for idx_vlan, row_vlan in iter_rows(vlan_data):
         #         # for (idx_vlan, row_vlan), (idx_trunk, row_trunk) in zip(vlan_df.iterrows(), trunk_df.iterrows()):
         #         vlan_interfaces_name_match = re.search(r'([^\s]+) \{\n', row_vlan["vlan_interfaces"])
         #         vlan_interfaces_name = vlan_interfaces_name_match.group(1) if vlan_interfaces_name_match else ''
         #
-        #         for idx_trunk, row_trunk in trunk_df.iterrows():
+        #         for idx_trunk, row_trunk in iter_rows(trunk_data):
         #             if "tagged" in row_vlan["vlan_interfaces"]:
         #                 if vlan_interfaces_name in row_trunk["trunk_name"]:
         #                     txt_file.write(f'vlan {row_vlan["vlan_tag"]}\n')
@@ -387,29 +432,30 @@ def process_file(file_path):
 
         if self_data:
             txt_file.write('################  Self_IP Information:  ################\n')
-            # 两个for循环，读取self和vlan的信息，因为配置selfIp需要用到vlan的tag号
-            for idx, row_self in self_df.iterrows():
-                for idx_vlan, row_vlan in vlan_df.iterrows():
-                    # 处理接口IP（非浮动）
-                    if row_self["self_traffic_group"] == "traffic-group-local-only":
-                        # 处理打了tag的vlan
-                        if "tagged" in row_vlan["vlan_interfaces"]:
-                            if row_self["self_vlan_name"] == row_vlan["vlan_name"]:
-                                txt_file.write(f'interface ve{row_vlan["vlan_tag"]}\n')
-                                txt_file.write('{\n')
-
-                                if ':' in row_self["self_address"]:
-                                    txt_file.write(f'    ipv6 address {row_self["self_address"]}\n')
-                                else:
-                                    txt_file.write(f'    ip address {row_self["self_address"]}\n')
-
-                                txt_file.write(f'    description \"{row_self["self_name"]}\"\n')
-                                txt_file.write('}\n\n')
+            # 配置selfIp需要用到vlan的tag号：先按名称索引打了tag的vlan，每个self IP直接查找同名的vlan
+            tagged_vlans = _name_index(vlan_data['vlan_name'], [
+                row for row, interfaces in enumerate(vlan_data['vlan_interfaces']) if "tagged" in interfaces
+            ]) if vlan_data else {}
+            for idx, row_self in iter_rows(self_data):
+                # 处理接口IP（非浮动）
+                if row_self["self_traffic_group"] == "traffic-group-local-only":
+                    # 处理打了tag的vlan
+                    for vlan_row in tagged_vlans.get(row_self["self_vlan_name"], ()):
+                        txt_file.write(f'interface ve{vlan_data["vlan_tag"][vlan_row]}\n')
+                        txt_file.write('{\n')
+
+                        if ':' in row_self["self_address"]:
+                            txt_file.write(f'    ipv6 address {row_self["self_address"]}\n')
+                        else:
+                            txt_file.write(f'    ip address {row_self["self_address"]}\n')
+
+                        txt_file.write(f'    description \"{row_self["self_name"]}\"\n')
+                        txt_file.write('}\n\n')
 
             txt_file.write('################  Floating_IP Information:  ################\n')
             txt_file.write(f'vrrp vrid 0\n')
             txt_file.write('{\n')
-            for idx, row_self in self_df.iterrows():
+            for idx, row_self in iter_rows(self_data):
                 # 处理接口IP（浮动）
                 if row_self["self_traffic_group"] == "traffic-group-1":
                     selfip_match = re.search(r'([\w.:]+)/\d+', row_self["self_address"])
@@ -423,7 +469,7 @@ def process_file(file_path):
             txt_file.write('################  mgmt_route_data Information:  ################\n')
             txt_file.write(f'static-route mgmt\n')
             txt_file.write('{\n')
-            for idx, row in mgmt_route_df.iterrows():
+            for idx, row in iter_rows(mgmt_route_data):
                 if '/' in row["mgmt_route_name"]:
                     txt_file.write(f'    ip route {row["mgmt_route_network"]} {row["mgmt_route_gateway"]}\n')
                 elif row["mgmt_route_network"] == 'default':
@@ -435,34 +481,22 @@ def process_file(file_path):
             txt_file.write('}\n\n')
 
 
-def process_folder(folder_path):
-    """处理指定目录下的所有 .conf 文件"""
+def process_folder(folder_path, workers=None, excel=True, cache_dir=None):
+    """
+    处理指定目录下的所有 .conf 文件
+    :param folder_path: 文件夹路径
+    :param workers: 并行处理的进程数，None 或 1 表示在当前进程中逐个处理
+    :param excel: 是否输出 Excel 文件
+    :param cache_dir: 解析缓存目录，为 None 时不使用缓存
+    :return: 汇总信息 {'processed_count', 'error_count', 'total_files', 'errors'}
+    """
     if not os.path.exists(folder_path):
         print(f"目录不存在: {folder_path}")
         return
-    
-    processed_count = 0
-    error_count = 0
-    
+
     # 遍历文件夹下的所有文件并处理它们
-    for root_dir, _, files in os.walk(folder_path):
-        for file in files:
-            if file.endswith('.conf'):
-                file_path = os.path.join(root_dir, file)
-                try:
-                    process_file(file_path)
-                    print(f"处理文件成功: {file_path}")
-                    processed_count += 1
-                except Exception as e:
-                    print(f"处理文件失败 {file_path}: {str(e)}")
-                    error_count += 1
-    
-    print(f"配置翻译完成: 成功处理 {processed_count} 个文件，失败 {error_count} 个文件")
-    return {
-        'processed_count': processed_count,
-        'error_count': error_count,
-        'total_files': processed_count + error_count
-    }
+    file_paths = list_conf_files(folder_path)
+    return summarize(run_files(process_file, file_paths, workers, excel=excel, cache_dir=cache_dir))
 
 
 def run_script():
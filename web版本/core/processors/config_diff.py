@@ -0,0 +1,372 @@
+"""
+配置文件逐行对比
+每一行只哈希一次映射为整数 ID，用 patience diff（两边都只出现一次的行作为锚点，取最长递增子序列）
+对齐两份配置，锚点之间没有唯一行的区间再用 difflib 对整数序列求匹配（区间过大时整体作为一个差异区块）。
+中间插入或删除一行只影响这一行，后面的行仍然对齐；差异按连续的区块（hunk）返回。
+也可以按顶层段落（stanza）对比：段落顺序不同不算差异，只逐行对比内容哈希不同的段落。
+"""
+
+import hashlib
+from bisect import bisect_left
+from difflib import SequenceMatcher
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+# 匹配块：(文件1起始下标, 文件2起始下标, 行数)
+Block = Tuple[int, int, int]
+# 没有唯一行的区间用 difflib 求匹配的规模上限（两边行数的乘积），difflib 的耗时与乘积成正比，
+# 超过时不再逐行匹配，整个区间作为一个差异区块
+FALLBACK_MAX_CELLS = 1_000_000
+
+
+def line_ids(lines1: Sequence[Hashable], lines2: Sequence[Hashable]) -> Tuple[List[int], List[int]]:
+    """
+    把两份配置的每一行映射为整数 ID，内容相同的行 ID 相同，后续比较只比较整数
+
+    Args:
+        lines1: 文件1的行（或每行的哈希）
+        lines2: 文件2的行（或每行的哈希）
+
+    Returns:
+        (文件1的行 ID 列表, 文件2的行 ID 列表)
+    """
+    ids: Dict[str, int] = {}
+    ids1 = [ids.setdefault(line, len(ids)) for line in lines1]
+    ids2 = [ids.setdefault(line, len(ids)) for line in lines2]
+    return ids1, ids2
+
+
+def _unique_anchors(a: Sequence[int], a_lo: int, a_hi: int, b: Sequence[int], b_lo: int, b_hi: int) -> List[Tuple[int, int]]:
+    """区间内两边都只出现一次的行，按文件1顺序取文件2位置的最长递增子序列，返回 [(i, j), ...]"""
+    counts: Dict[int, List[int]] = {}
+    for i in range(a_lo, a_hi):
+        entry = counts.get(a[i])
+        if entry is None:
+            counts[a[i]] = [1, i, 0, 0]
+        else:
+            entry[0] += 1
+    for j in range(b_lo, b_hi):
+        entry = counts.get(b[j])
+        if entry is not None:
+            entry[2] += 1
+            entry[3] = j
+    pairs = sorted((entry[1], entry[3]) for entry in counts.values() if entry[0] == 1 and entry[2] == 1)
+    if not pairs:
+        return []
+
+    # patience sorting：tails[k] 是长度为 k+1 的递增子序列的最小结尾（pairs 中的下标）
+    tails: List[int] = []
+    tail_values: List[int] = []
+    previous = [-1] * len(pairs)
+    for index, (_, j) in enumerate(pairs):
+        k = bisect_left(tail_values, j)
+        if k:
+            previous[index] = tails[k - 1]
+        if k == len(tails):
+            tails.append(index)
+            tail_values.append(j)
+        else:
+            tails[k] = index
+            tail_values[k] = j
+    anchors = []
+    index = tails[-1]
+    while index != -1:
+        anchors.append(pairs[index])
+        index = previous[index]
+    anchors.reverse()
+    return anchors
+
+
+def matching_blocks(a: Sequence[int], b: Sequence[int]) -> List[Block]:
+    """
+    patience diff：返回按位置排序的匹配块 [(i, j, n), ...]
+
+    Args:
+        a: 文件1的行 ID
+        b: 文件2的行 ID
+
+    Returns:
+        匹配块列表，a[i:i+n] == b[j:j+n]
+    """
+    blocks: List[Block] = []
+    # 待对齐的区间，用栈代替递归
+    stack = [(0, len(a), 0, len(b))]
+    while stack:
+        a_lo, a_hi, b_lo, b_hi = stack.pop()
+        # 去掉相同的开头和结尾
+        start = 0
+        while a_lo + start < a_hi and b_lo + start < b_hi and a[a_lo + start] == b[b_lo + start]:
+            start += 1
+        if start:
+            blocks.append((a_lo, b_lo, start))
+            a_lo += start
+            b_lo += start
+        end = 0
+        while a_lo < a_hi - end and b_lo < b_hi - end and a[a_hi - end - 1] == b[b_hi - end - 1]:
+            end += 1
+        if end:
+            blocks.append((a_hi - end, b_hi - end, end))
+            a_hi -= end
+            b_hi -= end
+        if a_lo == a_hi or b_lo == b_hi:
+            continue
+
+        anchors = _unique_anchors(a, a_lo, a_hi, b, b_lo, b_hi)
+        if not anchors:
+            if (a_hi - a_lo) * (b_hi - b_lo) > FALLBACK_MAX_CELLS:
+                continue
+            # 区间内没有唯一行（如重复的 "!" 或空行），按整数序列求最长匹配
+            matcher = SequenceMatcher(None, a[a_lo:a_hi], b[b_lo:b_hi], autojunk=False)
+            blocks.extend((a_lo + i, b_lo + j, n) for i, j, n in matcher.get_matching_blocks() if n)
+            continue
+        for i, j in anchors:
+            blocks.append((i, j, 1))
+            stack.append((a_lo, i, b_lo, j))
+            a_lo, b_lo = i + 1, j + 1
+        stack.append((a_lo, a_hi, b_lo, b_hi))
+    blocks.sort()
+    return blocks
+
+
+def diff_hunks(lines1: Sequence[str], lines2: Sequence[str], keys1: Optional[Sequence[Hashable]] = None,
+               keys2: Optional[Sequence[Hashable]] = None) -> Tuple[List[Dict], int]:
+    """
+    对比两份配置，返回差异区块和相同的行数
+
+    Args:
+        lines1: 文件1的行
+        lines2: 文件2的行
+        keys1: 文件1每行预先计算的哈希（见 config_file_cache），为 None 时直接按行内容比较
+        keys2: 文件2每行预先计算的哈希
+
+    Returns:
+        ([{"file1_start", "file2_start", "file1", "file2"}, ...], 相同的行数)；
+        file1_start/file2_start 是区块在两个文件中的起始行号（从 1 开始），
+        file1/file2 是区块中两边各自的行（去掉首尾空白），一边为空表示纯插入或纯删除
+    """
+    if keys1 is None or keys2 is None:
+        keys1, keys2 = lines1, lines2
+    ids1, ids2 = line_ids(keys1, keys2)
+    hunks = []
+    matched = 0
+    i = j = 0
+    # 末尾加一个空的哨兵块，输出最后一个区块
+    for block_i, block_j, size in matching_blocks(ids1, ids2) + [(len(ids1), len(ids2), 0)]:
+        if block_i > i or block_j > j:
+            hunks.append({
+                "file1_start": i + 1,
+                "file2_start": j + 1,
+                "file1": [line.strip() for line in lines1[i:block_i]],
+                "file2": [line.strip() for line in lines2[j:block_j]],
+            })
+        matched += size
+        i, j = block_i + size, block_j + size
+    return hunks, matched
+
+
+def compare_lines(lines1: Sequence[str], lines2: Sequence[str], keys1: Optional[Sequence[Hashable]] = None,
+                  keys2: Optional[Sequence[Hashable]] = None) -> Tuple[List[Dict], Dict]:
+    """
+    对比两份配置，返回差异区块和统计（keys1/keys2 见 diff_hunks）
+
+    Returns:
+        (差异区块, {"total_lines", "different_lines", "similarity"})；
+        different_lines 是差异区块并排显示的行数（每个区块取两边行数的较大值），
+        similarity 是对齐的行数占较长文件行数的百分比
+    """
+    hunks, matched = diff_hunks(lines1, lines2, keys1, keys2)
+    total_lines = max(len(lines1), len(lines2))
+    stats = {
+        "total_lines": total_lines,
+        "different_lines": sum(max(len(hunk["file1"]), len(hunk["file2"])) for hunk in hunks),
+        "similarity": round(matched / total_lines * 100, 2) if total_lines > 0 else 0,
+    }
+    return hunks, stats
+
+
+def parse_stanzas(lines: Sequence[str]) -> Dict[str, List[List[Tuple[int, str]]]]:
+    """
+    把配置拆分为顶层段落：顶格的行（如 slb pool …、interface …、vrrp …）开始一个新段落，
+    后面缩进的行和 {} 中的行都属于这个段落；顶格的空行、! 和 # 注释行不属于任何段落
+
+    Args:
+        lines: 配置的行
+
+    Returns:
+        {头部行: [段落, ...]}，同一个头部可以出现多次；每个段落是 [(行下标, 去掉首尾空白的行), ...]，
+        第一项是头部行
+    """
+    stanzas: Dict[str, List[List[Tuple[int, str]]]] = {}
+    current = None
+    depth = 0
+    for index, line in enumerate(lines):
+        text = line.strip()
+        if depth == 0 and line[:1] not in ('', ' ', '\t', '{', '}'):
+            if text[0] in '!#':
+                continue
+            current = []
+            stanzas.setdefault(text, []).append(current)
+        if current is None or not text:
+            continue
+        current.append((index, text))
+        depth = max(depth + text.count('{') - text.count('}'), 0)
+    return stanzas
+
+
+def stanza_hash(body: List[Tuple[int, str]]) -> bytes:
+    """段落内容（去掉首尾空白的各行）的 16 字节摘要"""
+    return hashlib.blake2b('\n'.join(text for _, text in body).encode('utf-8'), digest_size=16).digest()
+
+
+def _line_number(body: List[Tuple[int, str]], position: int) -> int:
+    """段落内的位置对应的文件行号（从 1 开始），位置在段落末尾时取最后一行的下一行"""
+    return body[position][0] + 1 if position < len(body) else body[-1][0] + 2
+
+
+# 头部中带取值的段落：(关键字, 对象标识的项数)，头部比标识长时多出的项是取值，
+# 如 hostname A、vrrp unit-id 1、slb virtual-address va1 10.0.0.1、slb server s1 10.0.0.1
+_VALUE_HEADERS = (
+    (('hostname',), 1),
+    (('vrrp', 'unit-id'), 2),
+    (('slb', 'virtual-address'), 3),
+    (('slb', 'server'), 3),
+)
+
+
+def stanza_key(header: str) -> str:
+    """
+    段落的对象标识：_VALUE_HEADERS 中的段落为关键字和对象名称（不含取值），
+    其他段落（如 vlan 10、interface ethernet 3）的整个头部就是标识
+    """
+    tokens = header.split()
+    for keyword, size in _VALUE_HEADERS:
+        if len(tokens) > size and tuple(tokens[:len(keyword)]) == keyword:
+            return ' '.join(tokens[:size])
+    return header
+
+
+def _stanza_name(stanzas: Dict[str, List], body: List[Tuple[int, str]]) -> str:
+    """报告中的段落名称：头部行；同一个头部出现多次时加上第几次出现"""
+    header = body[0][1]
+    occurrences = stanzas[header]
+    if len(occurrences) == 1:
+        return header
+    return f"{header} #{next(n for n, item in enumerate(occurrences, 1) if item is body)}"
+
+
+def _pair_stanzas(bodies1: List, bodies2: List) -> Tuple[List[Tuple], List, List]:
+    """
+    同一个头部的多个段落配对：内容哈希相同的先配对，其余按出现顺序配对
+
+    Returns:
+        ([(段落1, 段落2, 是否相同), ...], 只在文件1的段落, 只在文件2的段落)
+    """
+    if len(bodies1) == 1 and len(bodies2) == 1:
+        return [(bodies1[0], bodies2[0], stanza_hash(bodies1[0]) == stanza_hash(bodies2[0]))], [], []
+    by_hash: Dict[bytes, List] = {}
+    for body in reversed(bodies2):
+        by_hash.setdefault(stanza_hash(body), []).append(body)
+    pairs = []
+    rest1 = []
+    for body in bodies1:
+        same = by_hash.get(stanza_hash(body))
+        if same:
+            pairs.append((body, same.pop(), True))
+        else:
+            rest1.append(body)
+    paired2 = {id(body2) for _, body2, _ in pairs}
+    rest2 = [body for body in bodies2 if id(body) not in paired2]
+    count = min(len(rest1), len(rest2))
+    pairs.extend((rest1[n], rest2[n], False) for n in range(count))
+    return pairs, rest1[count:], rest2[count:]
+
+
+def _whole_hunk(body: List[Tuple[int, str]], side: str) -> Dict:
+    """只在一边的段落整段作为一个区块，另一边的起始行号为 0"""
+    texts = [text for _, text in body]
+    if side == "file1":
+        return {"file1_start": body[0][0] + 1, "file2_start": 0, "file1": texts, "file2": []}
+    return {"file1_start": 0, "file2_start": body[0][0] + 1, "file1": [], "file2": texts}
+
+
+def compare_stanzas(lines1: Sequence[str], lines2: Sequence[str]) -> Tuple[List[Dict], Dict, Dict]:
+    """
+    按段落对比两份配置，与段落的先后顺序无关：两边同一头部的段落内容哈希相同即视为相同，
+    只有哈希不同的段落才逐行对比，时间与配置行数成线性关系（加上变化段落的逐行对比）。
+    头部相同的段落先配对，剩下的段落再按对象标识（见 stanza_key）配对，
+    头部中的取值不同（如 hostname A / hostname B）视为同一对象的修改
+
+    Args:
+        lines1: 文件1的行
+        lines2: 文件2的行
+
+    Returns:
+        (差异区块, 统计, 对象差异)；差异区块的格式与 diff_hunks 相同，行号为文件中的行号；
+        统计在 compare_lines 的基础上增加 total_stanzas、different_stanzas；
+        对象差异为 {"changed": [段落名称], "only_in_file1": [段落名称], "only_in_file2": [段落名称]}，
+        头部不同的修改的名称为 "头部1 → 头部2"
+    """
+    stanzas1 = parse_stanzas(lines1)
+    stanzas2 = parse_stanzas(lines2)
+    pairs = []
+    rest1 = []
+    rest2 = []
+    for header, bodies1 in stanzas1.items():
+        header_pairs, header_rest1, header_rest2 = _pair_stanzas(bodies1, stanzas2.get(header, []))
+        pairs.extend(header_pairs)
+        rest1.extend(header_rest1)
+        rest2.extend(header_rest2)
+    for header, bodies2 in stanzas2.items():
+        if header not in stanzas1:
+            rest2.extend(bodies2)
+
+    keyed2: Dict[str, List] = {}
+    for body2 in sorted(rest2, key=lambda body: body[0][0]):
+        keyed2.setdefault(stanza_key(body2[0][1]), []).append(body2)
+    keyed1: Dict[str, List] = {}
+    for body1 in sorted(rest1, key=lambda body: body[0][0]):
+        keyed1.setdefault(stanza_key(body1[0][1]), []).append(body1)
+    only_in_file1 = []
+    only_in_file2 = []
+    for key, bodies1 in keyed1.items():
+        key_pairs, key_rest1, key_rest2 = _pair_stanzas(bodies1, keyed2.pop(key, []))
+        pairs.extend(key_pairs)
+        only_in_file1.extend(key_rest1)
+        only_in_file2.extend(key_rest2)
+    for bodies2 in keyed2.values():
+        only_in_file2.extend(bodies2)
+
+    hunks = []
+    objects = {"changed": [], "only_in_file1": [], "only_in_file2": []}
+    matched = sum(len(body1) for body1, _, same in pairs if same)
+    # 修改的段落和只在文件1的段落按在文件1中的位置排列，只在文件2的段落按在文件2中的位置排列
+    file1_items = [(body1[0][0], body1, body2) for body1, body2, same in pairs if not same]
+    file1_items.extend((body1[0][0], body1, None) for body1 in only_in_file1)
+    for _, body1, body2 in sorted(file1_items, key=lambda item: item[0]):
+        name1 = _stanza_name(stanzas1, body1)
+        if body2 is None:
+            objects["only_in_file1"].append(name1)
+            hunks.append(_whole_hunk(body1, "file1"))
+            continue
+        name2 = _stanza_name(stanzas2, body2)
+        objects["changed"].append(name1 if body1[0][1] == body2[0][1] else f"{name1} → {name2}")
+        stanza_hunks, stanza_matched = diff_hunks([text for _, text in body1], [text for _, text in body2])
+        matched += stanza_matched
+        for hunk in stanza_hunks:
+            hunk["file1_start"] = _line_number(body1, hunk["file1_start"] - 1)
+            hunk["file2_start"] = _line_number(body2, hunk["file2_start"] - 1)
+            hunks.append(hunk)
+    for body2 in sorted(only_in_file2, key=lambda body: body[0][0]):
+        objects["only_in_file2"].append(_stanza_name(stanzas2, body2))
+        hunks.append(_whole_hunk(body2, "file2"))
+
+    # 相似度只计算段落中的行，段落之间的空行和注释不影响结果
+    stanza_lines = max(sum(len(body) for bodies in stanzas1.values() for body in bodies),
+                       sum(len(body) for bodies in stanzas2.values() for body in bodies))
+    stats = {
+        "total_lines": max(len(lines1), len(lines2)),
+        "different_lines": sum(max(len(hunk["file1"]), len(hunk["file2"])) for hunk in hunks),
+        "similarity": round(matched / stanza_lines * 100, 2) if stanza_lines > 0 else 0,
+        "total_stanzas": len(pairs) + len(only_in_file1) + len(only_in_file2),
+        "different_stanzas": sum(len(names) for names in objects.values()),
+    }
+    return hunks, stats, objects
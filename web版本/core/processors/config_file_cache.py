@@ -0,0 +1,87 @@
+"""
+配置文件内容缓存
+按 (路径, 修改时间, 大小) 缓存配置文件解码后的行、每行的哈希和提取出的头部信息，
+同一进程中的各个 HorizonProcessor 实例共用，文件不变时只读取和解析一次；
+按 LRU 顺序淘汰，总占用不超过字节预算
+"""
+
+import hashlib
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from core.config import Config
+
+
+class ConfigFileEntry:
+    """单个配置文件的缓存内容"""
+
+    __slots__ = ('lines', 'line_hashes', 'info', 'fingerprint', 'size')
+
+    def __init__(self, lines: List[str]):
+        self.lines = lines
+        # 每行 8 字节的 blake2b 摘要，作为逐行对比时的行 ID（见 config_diff.compare_lines）
+        self.line_hashes = [int.from_bytes(hashlib.blake2b(line.encode('utf-8', 'surrogatepass'), digest_size=8).digest(), 'big')
+                            for line in lines]
+        # 头部信息（hostname、vrrp_unit_id 等），由 HorizonProcessor.extract_config_info 第一次使用时填入
+        self.info: Optional[Dict] = None
+        # MinHash 签名，由 HorizonProcessor.config_fingerprint 第一次使用时填入（见 config_fingerprint）
+        self.fingerprint: Optional[Tuple[int, ...]] = None
+        self.size = (sys.getsizeof(lines) + sum(map(sys.getsizeof, lines))
+                     + sys.getsizeof(self.line_hashes) + sum(map(sys.getsizeof, self.line_hashes)))
+
+
+class ConfigFileCache:
+    """按 (路径, 修改时间, 大小) 缓存配置文件，LRU 淘汰"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries: 'OrderedDict[str, Tuple[Tuple[int, int], ConfigFileEntry]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, file_path: str) -> ConfigFileEntry:
+        """
+        返回文件的缓存内容，文件的修改时间或大小变化后重新读取
+
+        Args:
+            file_path: 配置文件路径
+
+        Returns:
+            ConfigFileEntry
+        """
+        path = os.path.abspath(file_path)
+        stat = os.stat(path)
+        version = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._entries.get(path)
+            if cached is not None and cached[0] == version:
+                self._entries.move_to_end(path)
+                return cached[1]
+
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            entry = ConfigFileEntry(f.read().splitlines())
+
+        with self._lock:
+            old = self._entries.pop(path, None)
+            if old is not None:
+                self.total_bytes -= old[1].size
+            # 超过预算的单个文件不缓存，直接返回
+            if entry.size <= self.max_bytes:
+                self._entries[path] = (version, entry)
+                self.total_bytes += entry.size
+                while self.total_bytes > self.max_bytes:
+                    _, (_, evicted) = self._entries.popitem(last=False)
+                    self.total_bytes -= evicted.size
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+
+# 进程内共用的缓存（web 请求每次新建 HorizonProcessor，缓存放在模块级别）
+config_file_cache = ConfigFileCache(Config.HORIZON_CACHE_BYTES)
@@ -0,0 +1,125 @@
+"""
+配置文件相似度指纹
+每个配置按顶层段落的内容哈希组成集合，计算 MinHash 签名（NUM_PERM 个最小哈希值），
+两个签名中相同位置相等的比例就是两个集合 Jaccard 相似度的估计值。
+签名分成 BANDS 段，任意一段完全相同的两个配置成为候选主备对（LSH），
+不需要两两对比所有配置，候选对再按估计的相似度贪心配对。
+"""
+
+import random
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from .config_diff import parse_stanzas, stanza_hash
+
+try:
+    import numpy as np
+except ImportError:  # numpy 随 pandas 安装，缺少时使用纯 Python 的实现
+    np = None
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+# 哈希函数 (a * x + b) mod p，p 为 31 位的梅森素数，a * x 不超过 62 位，numpy 的 uint64 中不会溢出
+_PRIME = (1 << 31) - 1
+_random = random.Random(20240801)
+_A = [_random.randrange(1, _PRIME) for _ in range(NUM_PERM)]
+_B = [_random.randrange(0, _PRIME) for _ in range(NUM_PERM)]
+# numpy 每次计算的集合元素数，限制中间矩阵（NUM_PERM × 块大小）的内存
+_CHUNK = 8192
+
+Signature = Tuple[int, ...]
+
+
+def stanza_shingles(lines: Sequence[str]) -> Set[int]:
+    """配置的特征集合：每个顶层段落内容摘要的整数值（同一段落出现在文件中的任何位置都相同）"""
+    return {int.from_bytes(stanza_hash(body)[:8], 'big') % _PRIME
+            for bodies in parse_stanzas(lines).values() for body in bodies}
+
+
+def minhash(shingles: Iterable[int]) -> Signature:
+    """
+    计算集合的 MinHash 签名
+
+    Args:
+        shingles: 小于 2^31 - 1 的整数集合
+
+    Returns:
+        NUM_PERM 个整数；空集合的签名全部为 _PRIME
+    """
+    values = list(shingles)
+    if not values:
+        return (_PRIME,) * NUM_PERM
+    if np is None:
+        return tuple(min((a * x + b) % _PRIME for x in values) for a, b in zip(_A, _B))
+
+    a = np.array(_A, dtype=np.uint64)[:, None]
+    b = np.array(_B, dtype=np.uint64)[:, None]
+    signature = np.full(NUM_PERM, _PRIME, dtype=np.uint64)
+    for start in range(0, len(values), _CHUNK):
+        x = np.array(values[start:start + _CHUNK], dtype=np.uint64)[None, :]
+        np.minimum(signature, ((a * x + b) % _PRIME).min(axis=1), out=signature)
+    return tuple(signature.tolist())
+
+
+def config_fingerprint(lines: Sequence[str]) -> Signature:
+    """配置文件的 MinHash 签名"""
+    return minhash(stanza_shingles(lines))
+
+
+def estimate_similarity(signature1: Signature, signature2: Signature) -> float:
+    """两个签名估计的 Jaccard 相似度（0~1）"""
+    return sum(1 for x, y in zip(signature1, signature2) if x == y) / NUM_PERM
+
+
+def candidate_pairs(signatures: Sequence[Signature]) -> Set[Tuple[int, int]]:
+    """
+    LSH 分段：签名的任意一段完全相同的两个配置成为候选对。
+    Jaccard 相似度为 s 的两个配置成为候选对的概率为 1 - (1 - s^ROWS)^BANDS，s = 0.8 时约 99.9%，s = 0.3 时约 12%
+
+    Args:
+        signatures: 各配置的签名
+
+    Returns:
+        {(i, j), ...}，i < j 为 signatures 中的下标
+    """
+    pairs = set()
+    for band in range(BANDS):
+        buckets: Dict[Signature, List[int]] = {}
+        for index, signature in enumerate(signatures):
+            buckets.setdefault(signature[band * ROWS:(band + 1) * ROWS], []).append(index)
+        for members in buckets.values():
+            for position, i in enumerate(members):
+                for j in members[position + 1:]:
+                    pairs.add((i, j))
+    return pairs
+
+
+def propose_pairs(signatures: Sequence[Signature], threshold: float = 0.5,
+                  allowed: Optional[Callable[[int, int], bool]] = None) -> List[Tuple[int, int, float]]:
+    """
+    从候选对中选出主备对：按估计的相似度从高到低，两边都还没有配对时配对
+
+    Args:
+        signatures: 各配置的签名
+        threshold: 估计相似度的下限，低于它的候选对不配对
+        allowed: allowed(i, j) 返回 False 的候选对不配对（如 VRRP unit-id 相同的两台设备）
+
+    Returns:
+        [(i, j, 估计相似度), ...]
+    """
+    scored = []
+    for i, j in candidate_pairs(signatures):
+        if allowed is not None and not allowed(i, j):
+            continue
+        score = estimate_similarity(signatures[i], signatures[j])
+        if score >= threshold:
+            scored.append((score, i, j))
+    scored.sort(key=lambda item: (-item[0], item[1], item[2]))
+
+    paired = set()
+    pairs = []
+    for score, i, j in scored:
+        if i not in paired and j not in paired:
+            paired.update((i, j))
+            pairs.append((i, j, score))
+    return pairs
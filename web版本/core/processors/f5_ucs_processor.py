@@ -1,11 +1,64 @@
+import fnmatch
 import os
+import posixpath
 import shutil
 import subprocess
 from pathlib import Path
+from typing import Optional
 from .base_processor import BaseProcessor
 from core.function.ucs.lxl_package_2_MargeConfFile.F5_Marge_conf_and_base import extract_conf_and_base
 import tarfile
 
+# 按文件头（魔数）识别的归档格式与对应的 tarfile 打开模式
+ARCHIVE_MAGIC = (
+    (b'\x1f\x8b', 'r:gz'),
+    (b'BZh', 'r:bz2'),
+    (b'\xfd7zXZ\x00', 'r:xz'),
+)
+# 未压缩 tar 的 "ustar" 标记位于第 257 字节
+TAR_MAGIC_OFFSET = 257
+# 解压过滤器（Python 3.12 及 3.8-3.11 的安全更新版本支持）：'data' 拒绝设备文件、绝对路径和写到解压目录之外的成员
+EXTRACT_FILTER = {'filter': 'data'} if hasattr(tarfile, 'data_filter') else {}
+
+# 选择性解压时默认只解压的成员（相对于UCS根目录的路径，支持通配符）
+CONF_MEMBERS = (
+    'config/bigip.conf',
+    'config/bigip_base.conf',
+    'config/partitions/*/bigip*.conf',
+)
+
+
+def detect_archive_mode(file_path: str) -> str:
+    """
+    根据文件头判断归档格式，不依赖扩展名（UCS 实际上就是 gzip 压缩的 tar）
+    :param file_path: 文件路径
+    :return: tarfile.open 的模式，无法识别时返回 None
+    """
+    with open(file_path, 'rb') as file:
+        head = file.read(TAR_MAGIC_OFFSET + 8)
+    for magic, mode in ARCHIVE_MAGIC:
+        if head.startswith(magic):
+            return mode
+    if head[TAR_MAGIC_OFFSET:TAR_MAGIC_OFFSET + 5] == b'ustar':
+        return 'r:'
+    return None
+
+
+def member_path(name: str) -> Optional[str]:
+    """
+    去掉成员名开头的 ./ 并规范化（a//b、a/./b），统一为相对于UCS根目录的路径。
+    绝对路径和包含 .. 的路径可能写到解压目录之外（通配符 * 也能匹配 ../），返回 None，调用方跳过该成员
+    """
+    while name.startswith('./'):
+        name = name[2:]
+    if not name or name.startswith('/'):
+        return None
+    name = posixpath.normpath(name)
+    if name == '.' or '..' in name.split('/'):
+        return None
+    return name
+
+
 class F5UCSProcessor(BaseProcessor):
     """F5 UCS配置处理器"""
     
@@ -35,34 +88,54 @@ class F5UCSProcessor(BaseProcessor):
         """将UCS文件转换为TAR文件（实际转换为TAR）"""
         return self.ucs_to_tar(file_path)
 
-    def untar_file(self, tar_path: str) -> str:
-        """解压TAR文件"""
+    @staticmethod
+    def archive_files(files: list) -> list:
+        """
+        从文件列表中挑出需要解压的UCS/TAR文件。
+        旧版本流程会把 xxx.ucs 复制为 xxx.tar，同名的 .tar 与 .ucs 内容相同，只解压 .ucs
+        """
+        ucs_stems = {os.path.splitext(f)[0] for f in files if f.lower().endswith('.ucs')}
+        return [f for f in files
+                if f.lower().endswith('.ucs')
+                or (f.lower().endswith('.tar') and os.path.splitext(f)[0] not in ucs_stems)]
+
+    def untar_file(self, tar_path: str, full_extract: bool = False, extra_members=()) -> str:
+        """
+        解压UCS/TAR文件（直接读取原文件，按文件头识别格式，不需要先复制为 .tar）
+        :param tar_path: UCS/TAR文件路径
+        :param full_extract: 是否解压全部文件；默认只解压 CONF_MEMBERS 中的配置文件
+        :param extra_members: 选择性解压时额外需要的成员（支持通配符），如 'config/bigip_user.conf'
+        :return: 解压目录
+        """
         if not self.validate_file(tar_path):
             raise ValueError(f"无效的文件: {tar_path}")
         source_path = Path(tar_path)
-        if source_path.suffix.lower() != '.tar':
-            raise ValueError("文件必须是TAR格式")
+        mode = detect_archive_mode(tar_path)
+        if mode is None:
+            raise ValueError("文件必须是UCS或TAR格式")
         if not self.user_processed_dir:
             raise ValueError("用户处理目录未设置")
         base_dir = Path(self.user_processed_dir)
         output_dir = str(base_dir / source_path.stem)
         temp_dir_path = self.ensure_output_dir(output_dir)
         self.temp_dir = str(temp_dir_path)
+        if not full_extract:
+            return self._extract_members(tar_path, mode, CONF_MEMBERS + tuple(extra_members))
         try:
             # 使用Python的tarfile模块解压
-            with tarfile.open(tar_path, 'r') as tar_ref:
-                tar_ref.extractall(self.temp_dir)
+            with tarfile.open(tar_path, mode) as tar_ref:
+                tar_ref.extractall(self.temp_dir, **EXTRACT_FILTER)
             self.logger.info(f"已解压文件到: {self.temp_dir}")
             return str(self.temp_dir)
-        except PermissionError as e:
-            self.logger.warning(f"解压时遇到权限问题，尝试跳过有问题的文件: {e}")
-            # 如果遇到权限问题，尝试逐个解压文件，跳过有问题的
+        except (PermissionError, tarfile.TarError) as e:
+            self.logger.warning(f"解压时遇到权限问题或不安全的成员，尝试跳过有问题的文件: {e}")
+            # 如果遇到权限问题或被过滤器拒绝的成员，尝试逐个解压文件，跳过有问题的
             try:
-                with tarfile.open(tar_path, 'r') as tar_ref:
+                with tarfile.open(tar_path, mode) as tar_ref:
                     for member in tar_ref.getmembers():
                         try:
-                            tar_ref.extract(member, self.temp_dir)
-                        except (PermissionError, OSError) as e2:
+                            tar_ref.extract(member, self.temp_dir, **EXTRACT_FILTER)
+                        except (PermissionError, OSError, tarfile.TarError) as e2:
                             self.logger.warning(f"跳过文件 {member.name}: {e2}")
                             continue
                 self.logger.info(f"已解压文件到: {self.temp_dir}（跳过有问题的文件）")
@@ -74,6 +147,66 @@ class F5UCSProcessor(BaseProcessor):
             self.logger.error(f"解压文件时发生错误: {e}")
             raise
     
+    def _extract_members(self, tar_path: str, mode: str, patterns: tuple) -> str:
+        """
+        以流模式顺序读取归档一次，只写出与 patterns 匹配的普通文件，
+        UCS 中的 filestore、证书、iFile、ASM 特征库等都不落盘
+        """
+        extracted = []
+        try:
+            # 'r|gz' 等流模式不回退读取，整个归档只解压缩一遍
+            with tarfile.open(tar_path, mode.replace(':', '|')) as tar_ref:
+                for member in tar_ref:
+                    if not member.isfile():
+                        continue
+                    name = member_path(member.name)
+                    if name is None:
+                        self.logger.warning(f"跳过路径不安全的文件 {member.name}")
+                        continue
+                    if not any(fnmatch.fnmatchcase(name, pattern) for pattern in patterns):
+                        continue
+                    member.name = name
+                    try:
+                        tar_ref.extract(member, self.temp_dir, **EXTRACT_FILTER)
+                        extracted.append(name)
+                    except (PermissionError, OSError, tarfile.TarError) as e:
+                        self.logger.warning(f"跳过文件 {name}: {e}")
+        except Exception as e:
+            self.logger.error(f"解压文件时发生错误: {e}")
+            raise
+        self.logger.info(f"已解压 {len(extracted)} 个配置文件到: {self.temp_dir}: {extracted}")
+        return str(self.temp_dir)
+
+    def read_conf_members(self, tar_path: str, members=('config/bigip.conf', 'config/bigip_base.conf')) -> dict:
+        """
+        不解压到磁盘，直接从归档中读取指定成员的内容
+        :param tar_path: UCS/TAR文件路径
+        :param members: 需要读取的成员路径（相对于UCS根目录，支持通配符，如 'config/partitions/*/bigip.conf'）
+        :return: {成员路径: bytes}，归档中不存在的成员不出现在结果中
+        """
+        if not self.validate_file(tar_path):
+            raise ValueError(f"无效的文件: {tar_path}")
+        mode = detect_archive_mode(tar_path)
+        if mode is None:
+            raise ValueError("文件必须是UCS或TAR格式")
+
+        wanted = {name for name in members if not any(char in name for char in '*?[')}
+        patterns = [name for name in members if name not in wanted]
+        contents = {}
+        with tarfile.open(tar_path, mode.replace(':', '|')) as tar_ref:
+            for member in tar_ref:
+                name = member_path(member.name)
+                if name is None or not member.isfile():
+                    continue
+                if name not in wanted and not any(fnmatch.fnmatchcase(name, pattern) for pattern in patterns):
+                    continue
+                contents[name] = tar_ref.extractfile(member).read()
+                # 没有通配符时，需要的成员都读到后不再解压缩归档的剩余部分
+                if not patterns and len(contents) == len(wanted):
+                    break
+        self.logger.info(f"已从 {os.path.basename(tar_path)} 读取: {sorted(contents)}")
+        return contents
+
     def process_conf(self, conf_path: str) -> dict:
         """处理配置文件"""
         if not self.validate_file(conf_path):
@@ -139,13 +272,10 @@ class F5UCSProcessor(BaseProcessor):
             if not self.user_processed_dir:
                 raise ValueError("用户处理目录未设置，无法处理文件")
             
-            # 1. 转换UCS为TAR
-            tar_path = self.ucs_to_tar(file_path)
-            
-            # 2. 解压TAR文件
-            extracted_path = self.untar_file(tar_path)
+            # 1. 直接解压UCS文件（不再复制为TAR）
+            extracted_path = self.untar_file(file_path)
             
-            # 3. 查找并处理配置文件
+            # 2. 查找并处理配置文件
             conf_files = list(Path(extracted_path).glob("**/*.conf"))
             results = []
             
@@ -6,6 +6,9 @@ import subprocess
 from pathlib import Path
 from typing import Dict, List, Optional
 from .base_processor import BaseProcessor
+from .config_diff import compare_lines, compare_stanzas
+from .config_file_cache import config_file_cache
+from .config_fingerprint import config_fingerprint, propose_pairs
 from core.config import Config
 
 class HorizonProcessor(BaseProcessor):
@@ -235,66 +238,12 @@ class HorizonProcessor(BaseProcessor):
             raise
     
     def extract_config_info(self, config_file: str) -> Dict:
-        """提取配置文件中的关键信息"""
+        """提取配置文件中的关键信息（按文件的修改时间和大小缓存，见 config_file_cache）"""
         try:
-            with open(config_file, 'r', encoding='utf-8', errors='ignore') as f:
-                lines = f.readlines()
-            
-            config_info = {
-                'hostname': '',
-                'vrrp_unit_id': '',
-                'first_ip_address': '',
-                'mgmt_ip_address': ''
-            }
-            
-            in_mgmt_interface = False
-            
-            for line in lines:
-                line = line.strip()
-                
-                # 提取hostname
-                if line.startswith('hostname '):
-                    config_info['hostname'] = line.replace('hostname ', '').strip()
-                
-                # 提取vrrp unit-id
-                elif line.startswith('vrrp unit-id '):
-                    config_info['vrrp_unit_id'] = line.replace('vrrp unit-id ', '').strip()
-                
-                # 检测管理接口
-                elif line.startswith('interface mgmt'):
-                    in_mgmt_interface = True
-                elif line.startswith('interface ') and not line.startswith('interface mgmt'):
-                    in_mgmt_interface = False
-                
-                # 提取管理接口IP地址
-                elif in_mgmt_interface and line.startswith('ip address '):
-                    ip_part = line.replace('ip address ', '').strip()
-                    if ' ' in ip_part:
-                        ip_address = ip_part.split(' ')[0]
-                        config_info['mgmt_ip_address'] = ip_address
-                    elif '/' in ip_part:
-                        ip_address = ip_part.split('/')[0]
-                        config_info['mgmt_ip_address'] = ip_address
-                    else:
-                        config_info['mgmt_ip_address'] = ip_part
-                
-                # 提取第一个ip address（通常是接口配置）
-                elif line.startswith('ip address ') and not config_info['first_ip_address']:
-                    # 提取IP地址部分
-                    ip_part = line.replace('ip address ', '').strip()
-                    # 分割IP和子网掩码
-                    if ' ' in ip_part:
-                        ip_address = ip_part.split(' ')[0]
-                        config_info['first_ip_address'] = ip_address
-                    elif '/' in ip_part:
-                        # 处理CIDR格式：10.20.252.34/24
-                        ip_address = ip_part.split('/')[0]
-                        config_info['first_ip_address'] = ip_address
-                    else:
-                        # 如果没有分隔符，直接使用
-                        config_info['first_ip_address'] = ip_part
-            
-            return config_info
+            entry = config_file_cache.get(config_file)
+            if entry.info is None:
+                entry.info = self.parse_config_info(entry.lines)
+            return dict(entry.info)
             
         except Exception as e:
             self.logger.error(f"提取配置文件信息时发生错误: {e}")
@@ -305,6 +254,71 @@ class HorizonProcessor(BaseProcessor):
                 'mgmt_ip_address': ''
             }
     
+    def config_fingerprint(self, config_file: str) -> tuple:
+        """配置文件的 MinHash 签名（见 config_fingerprint），与文件内容一起缓存"""
+        entry = config_file_cache.get(config_file)
+        if entry.fingerprint is None:
+            entry.fingerprint = config_fingerprint(entry.lines)
+        return entry.fingerprint
+    
+    def parse_config_info(self, lines: List[str]) -> Dict:
+        """从配置文件的行中提取 hostname、vrrp unit-id、第一个 IP 地址和管理接口 IP 地址"""
+        config_info = {
+            'hostname': '',
+            'vrrp_unit_id': '',
+            'first_ip_address': '',
+            'mgmt_ip_address': ''
+        }
+        
+        in_mgmt_interface = False
+        
+        for line in lines:
+            line = line.strip()
+            
+            # 提取hostname
+            if line.startswith('hostname '):
+                config_info['hostname'] = line.replace('hostname ', '').strip()
+            
+            # 提取vrrp unit-id
+            elif line.startswith('vrrp unit-id '):
+                config_info['vrrp_unit_id'] = line.replace('vrrp unit-id ', '').strip()
+            
+            # 检测管理接口
+            elif line.startswith('interface mgmt'):
+                in_mgmt_interface = True
+            elif line.startswith('interface ') and not line.startswith('interface mgmt'):
+                in_mgmt_interface = False
+            
+            # 提取管理接口IP地址
+            elif in_mgmt_interface and line.startswith('ip address '):
+                ip_part = line.replace('ip address ', '').strip()
+                if ' ' in ip_part:
+                    ip_address = ip_part.split(' ')[0]
+                    config_info['mgmt_ip_address'] = ip_address
+                elif '/' in ip_part:
+                    ip_address = ip_part.split('/')[0]
+                    config_info['mgmt_ip_address'] = ip_address
+                else:
+                    config_info['mgmt_ip_address'] = ip_part
+            
+            # 提取第一个ip address（通常是接口配置）
+            elif line.startswith('ip address ') and not config_info['first_ip_address']:
+                # 提取IP地址部分
+                ip_part = line.replace('ip address ', '').strip()
+                # 分割IP和子网掩码
+                if ' ' in ip_part:
+                    ip_address = ip_part.split(' ')[0]
+                    config_info['first_ip_address'] = ip_address
+                elif '/' in ip_part:
+                    # 处理CIDR格式：10.20.252.34/24
+                    ip_address = ip_part.split('/')[0]
+                    config_info['first_ip_address'] = ip_address
+                else:
+                    # 如果没有分隔符，直接使用
+                    config_info['first_ip_address'] = ip_part
+        
+        return config_info
+    
     def extract_device_series_from_filename(self, filename: str) -> str:
         """从文件名提取设备系列信息"""
         # 移除.config后缀
@@ -403,6 +417,49 @@ class HorizonProcessor(BaseProcessor):
         
         return ip_pairs
     
+    def find_heuristic_pairs(self, config_details: List[Dict]) -> List[Dict]:
+        """按文件名中的 IP 地址配对，其余文件按设备系列分组后按 VRRP unit-id 配对"""
+        # 首先处理IP地址格式的配置文件
+        ip_pairs = self.find_ip_pairs(config_details)
+        
+        # 处理剩余的配置文件（非IP地址格式）
+        paired_files = set()
+        for pair in ip_pairs:
+            paired_files.add(pair['config1']['file'])
+            paired_files.add(pair['config2']['file'])
+        
+        # 按设备系列分组处理剩余文件
+        series_groups = {}
+        for config in config_details:
+            if config['file'] not in paired_files:
+                series_groups.setdefault(config['device_series'], []).append(config)
+        
+        # 对每个设备系列内的设备进行配对
+        pairs = list(ip_pairs)
+        for series_configs in series_groups.values():
+            if len(series_configs) >= 2:
+                # 按VRRP unit-id分组，寻找配对（unit-id 1 与 unit-id 2）
+                vrrp_groups = {}
+                for config in series_configs:
+                    vrrp_groups.setdefault(config['vrrp_unit_id'], []).append(config)
+                pairs.extend(self.find_vrrp_pairs(vrrp_groups))
+        return pairs
+    
+    def find_fingerprint_pairs(self, config_details: List[Dict]) -> List[Dict]:
+        """
+        按配置内容的 MinHash 指纹配对（见 config_fingerprint），不依赖文件名：
+        LSH 找出候选对，再按估计的相似度从高到低配对，VRRP unit-id 相同的两台设备不配对
+        """
+        signatures = [self.config_fingerprint(config['file']) for config in config_details]
+        
+        def allowed(i: int, j: int) -> bool:
+            unit_id1 = config_details[i]['vrrp_unit_id']
+            unit_id2 = config_details[j]['vrrp_unit_id']
+            return not (unit_id1 and unit_id1 == unit_id2)
+        
+        return [{'config1': config_details[i], 'config2': config_details[j]}
+                for i, j, _ in propose_pairs(signatures, allowed=allowed)]
+    
     def find_vrrp_pairs(self, vrrp_groups: Dict[str, List[Dict]]) -> List[Dict]:
         """寻找VRRP配对（unit-id 1 与 unit-id 2）"""
         pairs = []
@@ -512,50 +569,33 @@ class HorizonProcessor(BaseProcessor):
         
         return matrix[len1][len2]
     
-    def compare_config_pair(self, config1: Dict, config2: Dict) -> Optional[Dict]:
-        """对比两个配置文件"""
+    def compare_config_pair(self, config1: Dict, config2: Dict, mode: str = 'line') -> Optional[Dict]:
+        """
+        对比两个配置文件，differences 为差异区块（见 config_diff.diff_hunks）
+
+        Args:
+            config1: 文件1的信息
+            config2: 文件2的信息
+            mode: 'line' 按行对齐对比；'stanza' 按顶层段落对比（见 config_diff.compare_stanzas），
+                  段落顺序不同不算差异，结果中增加 objects（有差异的段落）
+        """
         try:
-            # 读取配置文件内容
-            with open(config1['file'], 'r', encoding='utf-8', errors='ignore') as f:
-                lines1 = f.readlines()
-            with open(config2['file'], 'r', encoding='utf-8', errors='ignore') as f:
-                lines2 = f.readlines()
+            # 读取配置文件内容（文件不变时使用缓存）
+            entry1 = config_file_cache.get(config1['file'])
+            entry2 = config_file_cache.get(config2['file'])
             
             # 获取配置文件大小
             config1_size = os.path.getsize(config1['file']) / 1024  # 转换为KB
             config2_size = os.path.getsize(config2['file']) / 1024  # 转换为KB
             
-            # 找出差异
-            differences = []
-            for line_num, (line1, line2) in enumerate(zip(lines1, lines2), 1):
-                if line1 != line2:
-                    differences.append({
-                        "line": line_num,
-                        "file1": line1.strip(),
-                        "file2": line2.strip()
-                    })
-            
-            # 处理长度不同的情况
-            if len(lines1) != len(lines2):
-                max_lines = max(len(lines1), len(lines2))
-                for line_num in range(min(len(lines1), len(lines2)) + 1, max_lines + 1):
-                    if line_num <= len(lines1):
-                        differences.append({
-                            "line": line_num,
-                            "file1": lines1[line_num - 1].strip(),
-                            "file2": ""
-                        })
-                    else:
-                        differences.append({
-                            "line": line_num,
-                            "file1": "",
-                            "file2": lines2[line_num - 1].strip()
-                        })
-            
-            # 计算相似度
-            similarity = round((max(len(lines1), len(lines2)) - len(differences)) / max(len(lines1), len(lines2)) * 100, 2) if max(len(lines1), len(lines2)) > 0 else 0
+            # 按行对齐或按段落找出差异区块
+            objects = None
+            if mode == 'stanza':
+                differences, stats, objects = compare_stanzas(entry1.lines, entry2.lines)
+            else:
+                differences, stats = compare_lines(entry1.lines, entry2.lines, entry1.line_hashes, entry2.line_hashes)
             
-            return {
+            result = {
                 "file1": {
                     "name": config1['filename'],
                     "hostname": config1['hostname'],
@@ -575,12 +615,11 @@ class HorizonProcessor(BaseProcessor):
                     "config_size": round(config2_size, 1)
                 },
                 "differences": differences,
-                "stats": {
-                    "total_lines": max(len(lines1), len(lines2)),
-                    "different_lines": len(differences),
-                    "similarity": similarity
-                }
+                "stats": stats
             }
+            if objects is not None:
+                result["objects"] = objects
+            return result
             
         except Exception as e:
             self.logger.error(f"对比配置文件时发生错误: {e}")
@@ -607,41 +646,11 @@ class HorizonProcessor(BaseProcessor):
                 if not (os.path.exists(file1_config) and os.path.exists(file2_config)):
                     continue
                 
-                # 读取配置文件内容
-                with open(file1_config, 'r', encoding='utf-8', errors='ignore') as f:
-                    lines1 = f.readlines()
-                with open(file2_config, 'r', encoding='utf-8', errors='ignore') as f:
-                    lines2 = f.readlines()
-                
-                # 找出差异
-                differences = []
-                for line_num, (line1, line2) in enumerate(zip(lines1, lines2), 1):
-                    if line1 != line2:
-                        differences.append({
-                            "line": line_num,
-                            "file1": line1.strip(),
-                            "file2": line2.strip()
-                        })
-                
-                # 处理长度不同的情况
-                if len(lines1) != len(lines2):
-                    max_lines = max(len(lines1), len(lines2))
-                    for line_num in range(min(len(lines1), len(lines2)) + 1, max_lines + 1):
-                        if line_num <= len(lines1):
-                            differences.append({
-                                "line": line_num,
-                                "file1": lines1[line_num - 1].strip(),
-                                "file2": ""
-                            })
-                        else:
-                            differences.append({
-                                "line": line_num,
-                                "file1": "",
-                                "file2": lines2[line_num - 1].strip()
-                            })
-                
-                # 计算相似度
-                similarity = round((max(len(lines1), len(lines2)) - len(differences)) / max(len(lines1), len(lines2)) * 100, 2) if max(len(lines1), len(lines2)) > 0 else 0
+                # 读取配置文件内容（每个文件只读取一次）并按行对齐后找出差异区块
+                entry1 = config_file_cache.get(file1_config)
+                entry2 = config_file_cache.get(file2_config)
+                differences, stats = compare_lines(entry1.lines, entry2.lines, entry1.line_hashes, entry2.line_hashes)
+                similarity = stats["similarity"]
                 
                 # 选择相似度最高的一对
                 if similarity > best_similarity:
@@ -660,11 +669,7 @@ class HorizonProcessor(BaseProcessor):
                             "vrrp_unit_id": file2_info['config_info'].get('vrrp_unit_id', '')
                         },
                         "differences": differences,
-                        "stats": {
-                            "total_lines": max(len(lines1), len(lines2)),
-                            "different_lines": len(differences),
-                            "similarity": similarity
-                        }
+                        "stats": stats
                     }
         
         return best_pair
@@ -687,41 +692,11 @@ class HorizonProcessor(BaseProcessor):
                 if not (os.path.exists(file1_config) and os.path.exists(file2_config)):
                     continue
                 
-                # 读取配置文件内容
-                with open(file1_config, 'r', encoding='utf-8', errors='ignore') as f:
-                    lines1 = f.readlines()
-                with open(file2_config, 'r', encoding='utf-8', errors='ignore') as f:
-                    lines2 = f.readlines()
-                
-                # 找出差异
-                differences = []
-                for line_num, (line1, line2) in enumerate(zip(lines1, lines2), 1):
-                    if line1 != line2:
-                        differences.append({
-                            "line": line_num,
-                            "file1": line1.strip(),
-                            "file2": line2.strip()
-                        })
-                
-                # 处理长度不同的情况
-                if len(lines1) != len(lines2):
-                    max_lines = max(len(lines1), len(lines2))
-                    for line_num in range(min(len(lines1), len(lines2)) + 1, max_lines + 1):
-                        if line_num <= len(lines1):
-                            differences.append({
-                                "line": line_num,
-                                "file1": lines1[line_num - 1].strip(),
-                                "file2": ""
-                            })
-                        else:
-                            differences.append({
-                                "line": line_num,
-                                "file1": "",
-                                "file2": lines2[line_num - 1].strip()
-                            })
-                
-                # 计算相似度
-                similarity = round((max(len(lines1), len(lines2)) - len(differences)) / max(len(lines1), len(lines2)) * 100, 2) if max(len(lines1), len(lines2)) > 0 else 0
+                # 读取配置文件内容（每个文件只读取一次）并按行对齐后找出差异区块
+                entry1 = config_file_cache.get(file1_config)
+                entry2 = config_file_cache.get(file2_config)
+                differences, stats = compare_lines(entry1.lines, entry2.lines, entry1.line_hashes, entry2.line_hashes)
+                similarity = stats["similarity"]
                 
                 # 选择相似度最高的一对
                 if similarity > best_similarity:
@@ -740,23 +715,31 @@ class HorizonProcessor(BaseProcessor):
                             "vrrp_unit_id": file2_info['config_info'].get('vrrp_unit_id', '')
                         },
                         "differences": differences,
-                        "stats": {
-                            "total_lines": max(len(lines1), len(lines2)),
-                            "different_lines": len(differences),
-                            "similarity": similarity
-                        }
+                        "stats": stats
                     }
         
         return best_pair
     
-    def compare_configs(self, config_files: List[str]) -> Dict:
-        """对比配置文件，基于设备系列、hostname和VRRP unit-id进行智能匹配"""
+    def compare_configs(self, config_files: List[str], mode: Optional[str] = None, pairing: Optional[str] = None) -> Dict:
+        """
+        对比配置文件，基于设备系列、hostname和VRRP unit-id或配置内容的指纹进行智能匹配
+
+        Args:
+            config_files: 配置文件路径列表
+            mode: 对比方式 'line' 或 'stanza'（见 compare_config_pair），默认使用 Config.HORIZON_COMPARE_MODE
+            pairing: 配对方式 'heuristic'（见 find_heuristic_pairs）、'fingerprint'（见 find_fingerprint_pairs）
+                     或 'auto'，默认使用 Config.HORIZON_PAIRING
+        """
         if len(config_files) < 2:
             return {"error": "需要至少两个配置文件进行对比"}
+        mode = mode or Config.HORIZON_COMPARE_MODE
+        pairing = pairing or Config.HORIZON_PAIRING
+        if pairing == 'auto':
+            pairing = 'fingerprint' if len(config_files) >= Config.HORIZON_FINGERPRINT_MIN_FILES else 'heuristic'
         
-        # 创建缓存键，基于文件列表的排序
+        # 创建缓存键，基于文件列表的排序、对比方式和配对方式
         config_files_sorted = sorted(config_files)
-        cache_key = "|".join(config_files_sorted)
+        cache_key = "|".join(config_files_sorted) + f"|{mode}|{pairing}"
         
         # 检查是否有缓存的结果
         if hasattr(self, '_comparison_cache') and cache_key in self._comparison_cache:
@@ -791,56 +774,18 @@ class HorizonProcessor(BaseProcessor):
                     'device_series': device_series
                 })
             
-            # 首先处理IP地址格式的配置文件
-            ip_pairs = self.find_ip_pairs(config_details)
-            for pair in ip_pairs:
-                comparison_result = self.compare_config_pair(pair['config1'], pair['config2'])
+            # 配对后只对比每一对设备
+            if pairing == 'fingerprint':
+                pairs = self.find_fingerprint_pairs(config_details)
+            else:
+                pairs = self.find_heuristic_pairs(config_details)
+            for pair in pairs:
+                comparison_result = self.compare_config_pair(pair['config1'], pair['config2'], mode)
                 if comparison_result:
                     comparison_results["pairs"].append(comparison_result)
                     comparison_results["summary"]["total_pairs"] += 1
                     comparison_results["summary"]["total_differences"] += comparison_result["stats"]["different_lines"]
             
-            # 处理剩余的配置文件（非IP地址格式）
-            remaining_configs = []
-            paired_files = set()
-            for pair in ip_pairs:
-                paired_files.add(pair['config1']['file'])
-                paired_files.add(pair['config2']['file'])
-            
-            for config in config_details:
-                if config['file'] not in paired_files:
-                    remaining_configs.append(config)
-            
-            # 按设备系列分组处理剩余文件
-            series_groups = {}
-            for config in remaining_configs:
-                series = config['device_series']
-                if series not in series_groups:
-                    series_groups[series] = []
-                series_groups[series].append(config)
-            
-            # 对每个设备系列内的设备进行配对
-            for series_name, series_configs in series_groups.items():
-                if len(series_configs) >= 2:
-                    # 按VRRP unit-id分组
-                    vrrp_groups = {}
-                    for config in series_configs:
-                        vrrp_id = config['vrrp_unit_id']
-                        if vrrp_id not in vrrp_groups:
-                            vrrp_groups[vrrp_id] = []
-                        vrrp_groups[vrrp_id].append(config)
-                    
-                    # 寻找配对（unit-id 1 与 unit-id 2）
-                    pairs = self.find_vrrp_pairs(vrrp_groups)
-                    
-                    # 对每对设备进行配置对比
-                    for pair in pairs:
-                        comparison_result = self.compare_config_pair(pair['config1'], pair['config2'])
-                        if comparison_result:
-                            comparison_results["pairs"].append(comparison_result)
-                            comparison_results["summary"]["total_pairs"] += 1
-                            comparison_results["summary"]["total_differences"] += comparison_result["stats"]["different_lines"]
-            
             # 按配置文件名称排序
             comparison_results["pairs"].sort(key=lambda x: (x["file1"]["name"], x["file2"]["name"]))
             
@@ -916,6 +861,8 @@ class HorizonProcessor(BaseProcessor):
                 directories['config'], 
                 base_name
             )
+            # 入库时计算配置指纹，后续配对直接使用缓存
+            self.config_fingerprint(extracted_config)
             
             # 查找其他配置文件进行对比
             config_files = []
@@ -0,0 +1,293 @@
+"""
+UCS 单设备处理流水线
+每台设备独立完成 解压 → 提取配置文件 → conf 翻译 → base 翻译，
+多台设备在进程池中同时推进，一台设备解压（磁盘 I/O）时另一台可以在解析（CPU）
+"""
+
+import fnmatch
+import os
+import tarfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from ..shared.constants import PROCESS_STATUS
+from ..shared.types import ProcessStep
+
+# (归档成员, 输出子目录, 文件名后缀)，与 extract_conf_and_base 复制出的文件名一致
+CONF_TARGETS = (
+    ('config/bigip.conf', 'conf', '_bigip'),
+    ('config/bigip_base.conf', 'base', '_bigip_base'),
+)
+# 各分区的配置，与 config/bigip.conf 合并后翻译为一套 conf 输出
+PARTITION_CONF_MEMBER = 'config/partitions/*/bigip.conf'
+
+
+def _run_stage(steps: List[ProcessStep], device: str, stage_name: str, func: Callable, *args, **kwargs) -> Any:
+    """
+    执行设备的一个阶段，并把开始/结束时间和状态记录到 steps
+
+    Args:
+        steps: 当前设备的步骤列表
+        device: 设备名称
+        stage_name: 阶段名称
+        func: 阶段函数
+
+    Returns:
+        阶段函数的返回值
+    """
+    step: ProcessStep = {
+        'step_name': f"{device}: {stage_name}",
+        'status': PROCESS_STATUS['PROCESSING'],
+        'start_time': datetime.now().isoformat(),
+        'end_time': None,
+        'message': None
+    }
+    steps.append(step)
+    try:
+        result = func(*args, **kwargs)
+    except Exception as e:
+        step['status'] = PROCESS_STATUS['FAILED']
+        step['end_time'] = datetime.now().isoformat()
+        step['message'] = str(e)
+        raise
+    step['status'] = PROCESS_STATUS['COMPLETED']
+    step['end_time'] = datetime.now().isoformat()
+    return result
+
+
+def _translate_conf(conf_file: str, cache_dir: str, prune: bool = True, output_workers: Optional[int] = None,
+                    streaming: bool = False, shard_by_partition: bool = False,
+                    shard_max_objects: Optional[int] = None) -> None:
+    """翻译单个 bigip.conf，读取失败时抛出 OSError"""
+    from ..function.ucs.lxl_package_3_ConfProcess.Conf_Add_File import process_file
+    process_file(conf_file, output_workers=output_workers, cache_dir=cache_dir, prune=prune, streaming=streaming,
+                 shard_by_partition=shard_by_partition, shard_max_objects=shard_max_objects)
+
+
+def _translate_base(base_file: str, cache_dir: str) -> None:
+    """翻译单个 bigip_base.conf"""
+    from ..function.ucs.lxl_package_4_BaseConfProcess.F5_base_to_excel_txt import process_file
+    process_file(base_file, cache_dir=cache_dir)
+
+
+def _partition_sources(contents: Dict[str, bytes]) -> List[tuple]:
+    """从 read_conf_members 的结果中整理出 [(分区名, bytes)]，Common 在前，其余分区按名称排序"""
+    sources = []
+    if 'config/bigip.conf' in contents:
+        sources.append(('Common', contents['config/bigip.conf']))
+    for name in sorted(contents):
+        if fnmatch.fnmatchcase(name, PARTITION_CONF_MEMBER):
+            sources.append((name.split('/')[2], contents[name]))
+    return sources
+
+
+def _write_raw_conf(path: str, content: bytes) -> None:
+    """把从归档读出的原始配置写到磁盘（供下载原始配置）"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as raw_file:
+        raw_file.write(content)
+
+
+def write_raw_confs(upload_dir: str, ucs_dir: str, base_name: Optional[str] = None) -> List[str]:
+    """
+    补写原始配置文件：内存解析时默认不写出原始配置（见 Config.UCS_KEEP_RAW_CONFS），
+    下载原始配置时才从上传的归档中读取，写到 conf/base 目录（文件名与 process_device 写出的相同）
+
+    Args:
+        upload_dir: 用户上传目录（UCS/TAR 文件所在目录）
+        ucs_dir: 用户 ucs 目录（conf、base 目录所在目录）
+        base_name: 只处理文件名以它开头的归档，None 表示全部归档
+
+    Returns:
+        本次写出的文件路径列表；只补写已经翻译过（output 目录中有输出）且磁盘上还没有的原始配置，
+        无法读取的归档跳过
+    """
+    from .f5_ucs_processor import F5UCSProcessor
+
+    if not os.path.isdir(upload_dir):
+        return []
+    written = []
+    processor = None
+    for file_name in F5UCSProcessor.archive_files(sorted(os.listdir(upload_dir))):
+        if base_name and not file_name.startswith(base_name):
+            continue
+        device = os.path.splitext(file_name)[0]
+        missing = {}
+        for member, sub_dir, suffix in CONF_TARGETS:
+            target_dir = os.path.join(ucs_dir, sub_dir)
+            path = os.path.join(target_dir, f"{device}{suffix}.conf")
+            output_dir = os.path.join(target_dir, 'output')
+            translated = os.path.isdir(output_dir) and any(
+                name.startswith(f"{device}{suffix}.") or name.startswith(f"{device}{suffix}_")
+                for name in os.listdir(output_dir))
+            if translated and not os.path.exists(path):
+                missing[member] = path
+        if not missing:
+            continue
+        processor = processor or F5UCSProcessor()
+        try:
+            contents = processor.read_conf_members(os.path.join(upload_dir, file_name), list(missing))
+        except (OSError, ValueError, tarfile.TarError):
+            continue
+        for member, path in missing.items():
+            if member in contents:
+                _write_raw_conf(path, contents[member])
+                written.append(path)
+    return written
+
+
+def process_device(file_path: str, user_processed_dir: str, full_extract: bool = False,
+                   in_memory: bool = False, keep_raw_confs: bool = False,
+                   partition_workers: Optional[int] = None, prune: bool = True,
+                   output_workers: Optional[int] = None, streaming: bool = False,
+                   shard_by_partition: bool = False, shard_max_objects: Optional[int] = None) -> Dict[str, Any]:
+    """
+    处理单个UCS/TAR文件的完整流程（模块级函数，可以在子进程中执行）
+
+    Args:
+        file_path: UCS/TAR文件路径
+        user_processed_dir: 用户处理目录（users/<u>/ucs/processed）
+        full_extract: 是否完整解压UCS
+        in_memory: 是否直接从归档中读取配置并在内存中解析
+        keep_raw_confs: 内存解析时是否仍写出原始配置文件
+        partition_workers: UCS 中有分区配置（config/partitions/*/bigip.conf）时并行提取各分区的进程数
+        prune: conf 翻译是否只保留 VS 引用的对象
+        output_workers: conf 翻译的 xlsx、txt、attention 输出并行生成的进程数
+        streaming: conf 翻译是否使用流式模式（只输出 txt）；有分区配置时合并后翻译，不使用流式模式
+        shard_by_partition: conf 翻译的 txt 是否按分区拆分为分片（流式模式不拆分）
+        shard_max_objects: conf 翻译的 txt 分片最多的对象数
+
+    Returns:
+        {'file', 'device', 'steps', 'results', 'processed_files', 'error'}，失败时 error 为错误信息
+    """
+    from .f5_ucs_processor import F5UCSProcessor
+    from ..function.ucs.lxl_package_2_MargeConfFile.F5_Marge_conf_and_base import extract_device_conf_and_base
+    from ..function.ucs.lxl_package_3_ConfProcess.Conf_Add_File import process_content as process_conf_content
+    from ..function.ucs.lxl_package_3_ConfProcess.Conf_Partition import list_partition_confs, process_partitions
+    from ..function.ucs.lxl_package_4_BaseConfProcess.F5_base_to_excel_txt import process_content as process_base_content
+
+    file_name = os.path.basename(file_path)
+    device = os.path.splitext(file_name)[0]
+    ucs_dir = os.path.dirname(user_processed_dir)
+    cache_dir = os.path.join(ucs_dir, 'cache')
+    steps: List[ProcessStep] = []
+    results: List[str] = []
+    processed_files: List[str] = []
+    device_result = {
+        'file': file_name,
+        'device': device,
+        'steps': steps,
+        'results': results,
+        'processed_files': processed_files,
+        'error': None
+    }
+
+    processor = F5UCSProcessor(user_processed_dir=user_processed_dir)
+    try:
+        if in_memory:
+            contents = _run_stage(steps, device, "读取配置文件", processor.read_conf_members, file_path,
+                                  [member for member, _, _ in CONF_TARGETS] + [PARTITION_CONF_MEMBER])
+            partition_sources = _partition_sources(contents)
+            translators = {'conf': process_conf_content, 'base': process_base_content}
+            shard_options = {'shard_by_partition': shard_by_partition, 'shard_max_objects': shard_max_objects}
+            options = {'conf': dict(shard_options, prune=prune, output_workers=output_workers, streaming=streaming),
+                       'base': {}}
+            for member, sub_dir, suffix in CONF_TARGETS:
+                content = contents.get(member)
+                if content is None:
+                    continue
+                target_dir = os.path.join(ucs_dir, sub_dir)
+                conf_name = f"{device}{suffix}.conf"
+                if keep_raw_confs:
+                    _write_raw_conf(os.path.join(target_dir, conf_name), content)
+                if sub_dir == 'conf' and len(partition_sources) > 1:
+                    _run_stage(steps, device, "conf文件处理", process_partitions, partition_sources,
+                               os.path.join(target_dir, 'output'), f"{device}{suffix}", workers=partition_workers,
+                               output_workers=output_workers, cache_dir=cache_dir, prune=prune, **shard_options)
+                else:
+                    _run_stage(steps, device, f"{sub_dir}文件处理", translators[sub_dir], content,
+                               os.path.join(target_dir, 'output'), f"{device}{suffix}", cache_dir=cache_dir,
+                               **options[sub_dir])
+                processed_files.append(f"{sub_dir}/{conf_name}")
+        else:
+            extracted_path = _run_stage(steps, device, "UCS/TAR解压", processor.untar_file, file_path,
+                                        full_extract=full_extract)
+            conf_file, base_file = _run_stage(steps, device, "配置文件提取", extract_device_conf_and_base,
+                                              extracted_path, os.path.join(ucs_dir, 'conf'),
+                                              os.path.join(ucs_dir, 'base'))
+            partition_sources = list_partition_confs(os.path.join(extracted_path, 'config'))
+            if conf_file and len(partition_sources) > 1:
+                _run_stage(steps, device, "conf文件处理", process_partitions, partition_sources,
+                           os.path.join(ucs_dir, 'conf', 'output'), f"{device}_bigip", workers=partition_workers,
+                           output_workers=output_workers, cache_dir=cache_dir, prune=prune,
+                           shard_by_partition=shard_by_partition, shard_max_objects=shard_max_objects)
+                processed_files.append(f"conf/{os.path.basename(conf_file)}")
+            elif conf_file:
+                _run_stage(steps, device, "conf文件处理", _translate_conf, conf_file, cache_dir, prune,
+                           output_workers, streaming, shard_by_partition, shard_max_objects)
+                processed_files.append(f"conf/{os.path.basename(conf_file)}")
+            if base_file:
+                _run_stage(steps, device, "base文件处理", _translate_base, base_file, cache_dir)
+                processed_files.append(f"base/{os.path.basename(base_file)}")
+        results.append(f"{file_name} 处理完成: {', '.join(processed_files) or '未找到配置文件'}")
+    except Exception as e:
+        device_result['error'] = str(e)
+        results.append(f"{file_name} 处理失败: {str(e)}")
+    return device_result
+
+
+def run_devices(file_paths: List[str], user_processed_dir: str, workers: Optional[int] = None,
+                on_done: Optional[Callable[[Dict[str, Any]], None]] = None, **options) -> List[Dict[str, Any]]:
+    """
+    逐个或并行处理多台设备
+
+    Args:
+        file_paths: UCS/TAR文件路径列表
+        user_processed_dir: 用户处理目录
+        workers: 进程数，None 或小于等于 1 时在当前进程中逐个处理
+        on_done: 每台设备处理完成时调用（按完成顺序），用于及时更新处理步骤
+        options: 传给 process_device 的其他参数；多台设备并行时，partition_workers 和 output_workers
+            不超过 workers 平分到每台设备的进程数，总进程数不超过 workers
+
+    Returns:
+        与 file_paths 顺序一致的 process_device 结果列表
+    """
+    if not workers or workers <= 1 or len(file_paths) <= 1:
+        device_results = []
+        for file_path in file_paths:
+            device_result = process_device(file_path, user_processed_dir, **options)
+            if on_done:
+                on_done(device_result)
+            device_results.append(device_result)
+        return device_results
+
+    device_workers = min(workers, len(file_paths))
+    per_device = max(1, workers // device_workers)
+    for key in ('partition_workers', 'output_workers'):
+        if options.get(key):
+            options[key] = min(options[key], per_device)
+
+    device_results = [None] * len(file_paths)
+    with ProcessPoolExecutor(max_workers=device_workers) as executor:
+        futures = {executor.submit(process_device, file_path, user_processed_dir, **options): index
+                   for index, file_path in enumerate(file_paths)}
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                device_result = future.result()
+            except Exception as e:
+                # 子进程异常退出等 process_device 无法自行记录的错误
+                file_name = os.path.basename(file_paths[index])
+                device_result = {
+                    'file': file_name,
+                    'device': os.path.splitext(file_name)[0],
+                    'steps': [],
+                    'results': [f"{file_name} 处理失败: {str(e)}"],
+                    'processed_files': [],
+                    'error': str(e)
+                }
+            if on_done:
+                on_done(device_result)
+            device_results[index] = device_result
+    return device_results
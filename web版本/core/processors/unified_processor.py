@@ -7,6 +7,7 @@
 import os
 import logging
 from typing import List, Dict, Any
+from ..config import Config
 from .f5_ucs_processor import F5UCSProcessor
 
 logger = logging.getLogger(__name__)
@@ -24,70 +25,28 @@ class UnifiedProcessor:
             results = []
             processed_files = []
             
-            # 第一步：处理所有UCS文件 - UCS转TAR
-            ucs_results = []
-            for file in files:
-                if file.lower().endswith('.ucs'):
-                    file_path = os.path.join(upload_dir, file)
-                    try:
-                        tar_path = self.ucs_processor.ucs_to_zip(file_path)
-                        ucs_results.append({
-                            'original': file,
-                            'converted': os.path.basename(tar_path)
-                        })
-                        results.append(f'UCS转TAR完成: {file}')
-                    except Exception as e:
-                        results.append(f'UCS转TAR失败: {file} - {str(e)}')
+            # 每台设备独立完成 解压 → 提取配置文件（含分区配置） → conf 翻译 → base 翻译，多台设备并行处理（见 ucs_pipeline）
+            from .ucs_pipeline import run_devices
             
-            # 第二步：解压所有TAR文件
-            tar_files = [f for f in files if f.lower().endswith('.tar')]
-            for file in tar_files:
-                file_path = os.path.join(upload_dir, file)
-                try:
-                    extracted_path = self.ucs_processor.untar_file(file_path)
-                    results.append(f'TAR解压完成: {file}')
-                except Exception as e:
-                    results.append(f'TAR解压失败: {file} - {str(e)}')
+            archives = [os.path.join(upload_dir, file) for file in self.ucs_processor.archive_files(files)]
+            device_results = run_devices(
+                archives, self.user_processed_dir, Config.TRANSLATE_WORKERS,
+                in_memory=Config.UCS_IN_MEMORY, keep_raw_confs=Config.UCS_KEEP_RAW_CONFS,
+                partition_workers=Config.TRANSLATE_WORKERS, prune=Config.PRUNE_UNREFERENCED,
+                output_workers=Config.OUTPUT_WORKERS, streaming=Config.CONF_STREAMING,
+                shard_by_partition=Config.SHARD_BY_PARTITION, shard_max_objects=Config.SHARD_MAX_OBJECTS
+            )
             
-            # 第三步：从解压目录中提取配置文件
-            if os.path.exists(self.user_processed_dir):
-                try:
-                    result = self.ucs_processor.extract_conf_and_base(self.user_processed_dir)
-                    if result['status'] == 'success':
-                        results.append('配置文件提取完成')
-                    else:
-                        results.append(f'配置文件提取失败: {result.get("error", "未知错误")}')
-                except Exception as e:
-                    results.append(f'配置文件提取失败: {str(e)}')
-            
-            # 第四步：分别处理conf和base文件
-            ucs_dir = os.path.dirname(self.user_processed_dir)
-            conf_dir = os.path.join(ucs_dir, 'conf')
-            base_dir = os.path.join(ucs_dir, 'base')
-            
-            # 导入UCS处理模块
-            from core.function.ucs.lxl_package_4_BaseConfProcess.F5_base_to_excel_txt import process_folder as process_base_folder
-            from core.function.ucs.lxl_package_3_ConfProcess.Conf_Add_File import process_folder as process_conf_folder
-            
-            # 处理conf目录
-            if os.path.exists(conf_dir):
-                try:
-                    process_conf_folder(conf_dir)
-                    results.append('conf目录处理完成')
-                    conf_files = [f for f in os.listdir(conf_dir) if f.endswith('.conf')]
-                    processed_files.extend([f"conf/{f}" for f in conf_files])
-                except Exception as e:
-                    results.append(f'conf目录处理失败: {str(e)}')
-            
-            # 处理base目录
-            if os.path.exists(base_dir):
-                try:
-                    process_base_folder(base_dir)
-                    results.append('base目录处理完成')
-                    base_files = [f for f in os.listdir(base_dir) if f.endswith('.conf')]
-                    processed_files.extend([f"base/{f}" for f in base_files])
-                except Exception as e:
-                    results.append(f'base目录处理失败: {str(e)}')
+            ucs_results = []
+            for device_result in device_results:
+                # 单台设备失败不影响其他设备，失败信息记录在 results 中
+                results.extend(device_result['results'])
+                processed_files.extend(device_result['processed_files'])
+                ucs_results.append({
+                    'original': device_result['file'],
+                    'device': device_result['device'],
+                    'error': device_result['error']
+                })
             
             return {
                 'success': True,
@@ -9,6 +9,7 @@ from typing import List, Dict, Any, Optional
 from pathlib import Path
 from datetime import datetime
 
+from ..config import Config
 from ..shared.exceptions import ProcessError, FileProcessError, ValidationError
 from ..shared.types import ProcessResult, FileInfo, ProcessStep
 from ..shared.validators import validate_file_list, validate_file_type
@@ -20,14 +21,29 @@ logger = logging.getLogger(__name__)
 class UnifiedProcessorV2:
     """统一处理管理器 V2"""
     
-    def __init__(self, user_processed_dir: Optional[str] = None):
+    def __init__(self, user_processed_dir: Optional[str] = None, workers: Optional[int] = None,
+                 full_extract: bool = False, in_memory: Optional[bool] = None,
+                 keep_raw_confs: Optional[bool] = None,
+                 prune: Optional[bool] = None):
         """
         初始化统一处理器
         
         Args:
             user_processed_dir: 用户处理目录
+            workers: conf/base 配置翻译的并行进程数，默认使用 Config.TRANSLATE_WORKERS
+            full_extract: 是否完整解压UCS；默认只解压流程需要的配置文件
+            in_memory: 是否直接从归档中读取 bigip.conf/bigip_base.conf 并在内存中解析，不经过解压和复制，
+                默认使用 Config.UCS_IN_MEMORY
+            keep_raw_confs: 内存解析时是否在处理时就把原始配置文件写到 conf/base 目录，默认使用 Config.UCS_KEEP_RAW_CONFS；
+                不写出时下载原始配置时再从归档中补写（见 ucs_pipeline.write_raw_confs）
+            prune: 是否只翻译 VS 引用的对象，默认使用 Config.PRUNE_UNREFERENCED
         """
         self.user_processed_dir = user_processed_dir
+        self.workers = Config.TRANSLATE_WORKERS if workers is None else workers
+        self.full_extract = full_extract
+        self.in_memory = Config.UCS_IN_MEMORY if in_memory is None else in_memory
+        self.keep_raw_confs = Config.UCS_KEEP_RAW_CONFS if keep_raw_confs is None else keep_raw_confs
+        self.prune = Config.PRUNE_UNREFERENCED if prune is None else prune
         self.process_steps: List[ProcessStep] = []
         self.current_step: Optional[str] = None
         
@@ -38,6 +54,8 @@ class UnifiedProcessorV2:
     def process_ucs_files(self, files: List[str], upload_dir: str) -> ProcessResult:
         """
         处理UCS文件 - 完整的处理流程
+        每台设备独立完成 解压 → 提取配置文件 → conf 翻译 → base 翻译，多台设备并行处理，
+        process_steps 中按 "设备: 阶段" 记录每台设备每个阶段的状态
         
         Args:
             files: 文件列表
@@ -57,101 +75,34 @@ class UnifiedProcessorV2:
             # 记录处理开始
             self._add_process_step("UCS文件处理开始", PROCESS_STATUS['PROCESSING'])
             
-            # 第一步：处理所有UCS文件 - UCS转TAR
-            self._add_process_step("UCS转TAR", PROCESS_STATUS['PROCESSING'])
-            for file in files:
-                if file.lower().endswith('.ucs'):
-                    file_path = os.path.join(upload_dir, file)
-                    try:
-                        tar_path = self.ucs_processor.ucs_to_zip(file_path)
-                        ucs_results.append({
-                            'original': file,
-                            'converted': os.path.basename(tar_path)
-                        })
-                        results.append(f'UCS转TAR完成: {file}')
-                    except Exception as e:
-                        error_msg = f'UCS转TAR失败: {file} - {str(e)}'
-                        results.append(error_msg)
-                        logger.error(error_msg)
-                        raise FileProcessError(error_msg, file_path=file_path, operation="UCS转TAR")
+            from .ucs_pipeline import run_devices
             
-            self._update_process_step("UCS转TAR", PROCESS_STATUS['COMPLETED'])
-            
-            # 第二步：解压所有TAR文件
-            self._add_process_step("TAR解压", PROCESS_STATUS['PROCESSING'])
-            tar_files = [f for f in files if f.lower().endswith('.tar')]
-            for file in tar_files:
-                file_path = os.path.join(upload_dir, file)
-                try:
-                    extracted_path = self.ucs_processor.untar_file(file_path)
-                    results.append(f'TAR解压完成: {file}')
-                except Exception as e:
-                    error_msg = f'TAR解压失败: {file} - {str(e)}'
-                    results.append(error_msg)
-                    logger.error(error_msg)
-                    raise FileProcessError(error_msg, file_path=file_path, operation="TAR解压")
+            archives = [os.path.join(upload_dir, file) for file in self.ucs_processor.archive_files(files)]
+            device_results = run_devices(
+                archives, self.user_processed_dir, self.workers,
+                on_done=lambda device_result: self.process_steps.extend(device_result['steps']),
+                full_extract=self.full_extract, in_memory=self.in_memory, keep_raw_confs=self.keep_raw_confs,
+                partition_workers=self.workers, prune=self.prune, output_workers=Config.OUTPUT_WORKERS,
+                streaming=Config.CONF_STREAMING, shard_by_partition=Config.SHARD_BY_PARTITION,
+                shard_max_objects=Config.SHARD_MAX_OBJECTS
+            )
             
-            self._update_process_step("TAR解压", PROCESS_STATUS['COMPLETED'])
+            failed = []
+            for device_result in device_results:
+                results.extend(device_result['results'])
+                processed_files.extend(device_result['processed_files'])
+                ucs_results.append({
+                    'original': device_result['file'],
+                    'device': device_result['device'],
+                    'error': device_result['error']
+                })
+                if device_result['error']:
+                    logger.error(f"{device_result['file']} 处理失败: {device_result['error']}")
+                    failed.append(f"{device_result['file']}: {device_result['error']}")
             
-            # 第三步：从解压目录中提取配置文件
-            if os.path.exists(self.user_processed_dir):
-                self._add_process_step("配置文件提取", PROCESS_STATUS['PROCESSING'])
-                try:
-                    result = self.ucs_processor.extract_conf_and_base(self.user_processed_dir)
-                    if result['status'] == 'success':
-                        results.append('配置文件提取完成')
-                    else:
-                        error_msg = f'配置文件提取失败: {result.get("error", "未知错误")}'
-                        results.append(error_msg)
-                        raise FileProcessError(error_msg, operation="配置文件提取")
-                except Exception as e:
-                    error_msg = f'配置文件提取失败: {str(e)}'
-                    results.append(error_msg)
-                    logger.error(error_msg)
-                    raise FileProcessError(error_msg, operation="配置文件提取")
-                
-                self._update_process_step("配置文件提取", PROCESS_STATUS['COMPLETED'])
-            
-            # 第四步：分别处理conf和base文件
-            ucs_dir = os.path.dirname(self.user_processed_dir)
-            conf_dir = os.path.join(ucs_dir, 'conf')
-            base_dir = os.path.join(ucs_dir, 'base')
-            
-            # 导入UCS处理模块
-            from ..function.ucs.lxl_package_4_BaseConfProcess.F5_base_to_excel_txt import process_folder as process_base_folder
-            from ..function.ucs.lxl_package_3_ConfProcess.Conf_Add_File import process_folder as process_conf_folder
-            
-            # 处理conf目录
-            if os.path.exists(conf_dir):
-                self._add_process_step("conf文件处理", PROCESS_STATUS['PROCESSING'])
-                try:
-                    process_conf_folder(conf_dir)
-                    results.append('conf目录处理完成')
-                    conf_files = [f for f in os.listdir(conf_dir) if f.endswith('.conf')]
-                    processed_files.extend([f"conf/{f}" for f in conf_files])
-                except Exception as e:
-                    error_msg = f'conf目录处理失败: {str(e)}'
-                    results.append(error_msg)
-                    logger.error(error_msg)
-                    raise FileProcessError(error_msg, operation="conf文件处理")
-                
-                self._update_process_step("conf文件处理", PROCESS_STATUS['COMPLETED'])
-            
-            # 处理base目录
-            if os.path.exists(base_dir):
-                self._add_process_step("base文件处理", PROCESS_STATUS['PROCESSING'])
-                try:
-                    process_base_folder(base_dir)
-                    results.append('base目录处理完成')
-                    base_files = [f for f in os.listdir(base_dir) if f.endswith('.conf')]
-                    processed_files.extend([f"base/{f}" for f in base_files])
-                except Exception as e:
-                    error_msg = f'base目录处理失败: {str(e)}'
-                    results.append(error_msg)
-                    logger.error(error_msg)
-                    raise FileProcessError(error_msg, operation="base文件处理")
-                
-                self._update_process_step("base文件处理", PROCESS_STATUS['COMPLETED'])
+            if failed:
+                raise FileProcessError(f"{len(failed)} 个UCS文件处理失败: {'; '.join(failed)}",
+                                       operation="UCS文件处理")
             
             # 记录处理完成
             self._update_process_step("UCS文件处理开始", PROCESS_STATUS['COMPLETED'])
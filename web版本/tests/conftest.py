@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 测试按 web版本 目录下的包名（core.xxx）导入
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,13 @@
+from core.function.ucs.lxl_package_3_ConfProcess.Conf_Add_File import process_file
+from core.function.ucs.lxl_package_3_ConfProcess.Conf_Parallel import run_files, summarize
+
+
+def test_unreadable_file_is_counted_as_error(tmp_path):
+    conf_path = tmp_path / 'dev1_bigip.conf'
+    conf_path.write_text('ltm node /Common/10.0.0.1 {\n    address 10.0.0.1\n}\n')
+    missing_path = tmp_path / 'missing_bigip.conf'
+
+    summary = summarize(run_files(process_file, [str(conf_path), str(missing_path)], excel=False))
+    assert summary['processed_count'] == 1
+    assert summary['error_count'] == 1
+    assert summary['errors'][0]['file_path'] == str(missing_path)
@@ -0,0 +1,99 @@
+from core.function.ucs.lxl_package_3_ConfProcess.Conf_Partition import extract_partitions, merge_models
+
+COMMON_CONF = b'''ltm pool /Common/web_pool {
+    members {
+        /Common/10.0.0.1:80 {
+            address 10.0.0.1
+        }
+    }
+}
+'''
+
+TENANT_CONF = b'''ltm pool /Tenant1/web_pool {
+    members {
+        /Tenant1/10.1.0.1:80 {
+            address 10.1.0.1
+        }
+    }
+}
+ltm pool /Tenant1/app_pool {
+    members {
+        /Tenant1/10.1.0.2:80 {
+            address 10.1.0.2
+        }
+    }
+}
+ltm rule /Tenant1/select_pool {
+when HTTP_REQUEST {
+  if { [HTTP::uri] starts_with "/app/v1" } { pool app_pool } else { pool /Common/web_pool }
+}
+}
+ltm virtual /Tenant1/vs_common_pool {
+    destination /Tenant1/192.168.2.10:80
+    ip-protocol tcp
+    mask 255.255.255.255
+    pool /Common/web_pool
+    rules {
+        /Tenant1/select_pool
+    }
+}
+ltm virtual /Tenant1/vs_own_pool {
+    destination /Tenant1/192.168.2.11:80
+    ip-protocol tcp
+    mask 255.255.255.255
+    pool /Tenant1/web_pool
+}
+'''
+
+
+def _merged():
+    return merge_models(extract_partitions([('Common', COMMON_CONF), ('Tenant1', TENANT_CONF)]))
+
+
+def test_pool_reference_resolved_from_path():
+    """分区和 Common 中都有 web_pool 时，按引用路径中的分区选择"""
+    vs_data = _merged()[0]
+    pools = dict(zip(vs_data['vs_name'], vs_data['vs_pool_name']))
+    assert pools == {'Tenant1_vs_common_pool': 'web_pool', 'Tenant1_vs_own_pool': 'Tenant1_web_pool'}
+
+
+def test_irule_references_rewritten():
+    """iRule 中只有名称的 pool 引用加分区前缀，URI 字符串不改写"""
+    rule_data = _merged()[9]
+    assert rule_data['rule_name'] == ['Tenant1_select_pool']
+    rule_info = rule_data['rule_info'][0]
+    assert rule_info.startswith('Tenant1_select_pool {')
+    assert 'pool Tenant1_app_pool' in rule_info
+    assert 'pool /Common/web_pool' in rule_info
+    assert '"/app/v1"' in rule_info
+
+
+def test_irule_persist_modes_not_rewritten():
+    """iRule 的 persist 命令后面是会话保持方式，分区中有同名的 persistence 对象时也不改写"""
+    tenant = b'''ltm persistence cookie /Tenant1/cookie {
+    defaults-from /Common/cookie
+}
+ltm rule /Tenant1/sticky {
+when HTTP_REQUEST {
+  persist cookie insert
+}
+}
+'''
+    rule_info = merge_models(extract_partitions([('Common', COMMON_CONF), ('Tenant1', tenant)]))[9]['rule_info'][0]
+    assert 'persist cookie insert' in rule_info
+
+
+def test_qualified_names_do_not_collide():
+    """分区前缀加上后与 Common 中的对象重名时加序号，引用随之改写"""
+    common = COMMON_CONF + b'''ltm pool /Common/Tenant1_web_pool {
+    members {
+        /Common/10.0.0.2:80 {
+            address 10.0.0.2
+        }
+    }
+}
+'''
+    merged = merge_models(extract_partitions([('Common', common), ('Tenant1', TENANT_CONF)]))
+    assert merged[1]['pool_name'] == ['web_pool', 'Tenant1_web_pool', 'Tenant1_web_pool_2', 'Tenant1_app_pool']
+    pools = dict(zip(merged[0]['vs_name'], merged[0]['vs_pool_name']))
+    assert pools['Tenant1_vs_own_pool'] == 'Tenant1_web_pool_2'
@@ -0,0 +1,92 @@
+from core.function.ucs.lxl_package_3_ConfProcess.Conf_Extract import extract_pools_vs_nodes
+from core.function.ucs.lxl_package_3_ConfProcess.Conf_Prune import prune_model
+from core.function.ucs.lxl_package_3_ConfProcess.Conf_Split import split_blocks
+
+CONF = b'''ltm node /Common/10.0.0.9 {
+    address 10.0.0.9
+}
+ltm pool /Common/pool_vs {
+    members {
+        /Common/10.0.0.1:80 {
+            address 10.0.0.1
+        }
+    }
+}
+ltm pool /Common/pool_irule_only {
+    members {
+        /Common/10.0.0.2:80 {
+            address 10.0.0.2
+        }
+    }
+}
+ltm pool /Common/pool_disabled_vs {
+    members {
+        /Common/10.0.0.3:80 {
+            address 10.0.0.3
+        }
+    }
+}
+ltm pool /Common/pool_unused {
+    members {
+        /Common/10.0.0.4:80 {
+            address 10.0.0.4
+        }
+    }
+}
+ltm rule /Common/route_rule {
+when HTTP_REQUEST {
+  if { [HTTP::uri] starts_with "/api" } {
+    pool pool_irule_only
+    snatpool snat_irule_only
+  } elseif { [HTTP::uri] starts_with "/node" } {
+    node 10.0.0.9 80
+  }
+}
+}
+ltm snatpool /Common/snat_irule_only {
+    members {
+        /Common/2.2.2.2
+    }
+}
+ltm snatpool /Common/snat_unused {
+    members {
+        /Common/3.3.3.3
+    }
+}
+ltm virtual /Common/vs_web {
+    destination /Common/192.168.1.10:80
+    ip-protocol tcp
+    mask 255.255.255.255
+    pool /Common/pool_vs
+    rules {
+        /Common/route_rule
+    }
+}
+ltm virtual /Common/vs_off {
+    destination /Common/192.168.1.11:80
+    disabled
+    ip-protocol tcp
+    mask 255.255.255.255
+    pool /Common/pool_disabled_vs
+}
+'''
+
+
+def _pruned():
+    return prune_model(extract_pools_vs_nodes(split_blocks(CONF)))
+
+
+def test_pool_referenced_only_by_irule_is_kept():
+    model, dropped = _pruned()
+    assert 'pool_irule_only' in model[1]['pool_name']
+    assert 'snat_irule_only' in model[7]['snatpool_name']
+    assert '10.0.0.9' in model[3]['node_ip']
+    assert dropped['pool'] == ['pool_unused']
+    assert dropped['snatpool'] == ['snat_unused']
+
+
+def test_disabled_vs_and_its_pool_are_kept():
+    model, dropped = _pruned()
+    assert model[0]['vs_name'] == ['vs_web', 'vs_off']
+    assert 'pool_disabled_vs' in model[1]['pool_name']
+    assert 'virtual' not in dropped
@@ -0,0 +1,119 @@
+import os
+
+from core.function.ucs.lxl_package_3_ConfProcess.Conf_Extract import extract_pools_vs_nodes
+from core.function.ucs.lxl_package_3_ConfProcess.Conf_Shard import shard_file_name, write_txt_shards
+from core.function.ucs.lxl_package_3_ConfProcess.Conf_Split import split_blocks
+from core.function.ucs.lxl_package_3_ConfProcess.Conf_WriteToTxt import write_to_txt
+
+
+def _pool(path, address):
+    return f'''ltm pool {path} {{
+    members {{
+        /Common/{address}:80 {{
+            address {address}
+        }}
+    }}
+    monitor /Common/http
+}}
+'''
+
+
+def _virtual(path, address, pool, profiles):
+    return f'''ltm virtual {path} {{
+    destination /Common/{address}:80
+    ip-protocol tcp
+    mask 255.255.255.255
+    persist {{
+        /Common/cookie {{
+            default yes
+        }}
+    }}
+    pool {pool}
+    profiles {{
+{profiles}
+    }}
+    source-address-translation {{
+        pool /Common/snat1
+        type snat
+    }}
+}}
+'''
+
+
+# Common 和 iApp 目录（分区名为 Common/app1.app）中的对象交替出现；第一个 VS 关联 oneconnect，后面的 VS 在其他分片中
+CONF = ''.join([
+    '''ltm profile http /Common/http_xff {
+    defaults-from /Common/http
+    insert-xforwarded-for enabled
+}
+ltm profile tcp /Common/app1.app/tcp_long {
+    defaults-from /Common/tcp
+    idle-timeout 3600
+}
+ltm snatpool /Common/snat1 {
+    members {
+        /Common/10.1.1.1
+    }
+}
+''',
+    _pool('/Common/pool_a', '10.0.0.1'),
+    _pool('/Common/app1.app/pool_b', '10.0.0.2'),
+    _pool('/Common/pool_c', '10.0.0.3'),
+    _virtual('/Common/vs_a', '192.168.1.1', '/Common/pool_a',
+             '        /Common/oneconnect { }\n        /Common/http { }\n        /Common/tcp { }'),
+    _virtual('/Common/app1.app/vs_b', '192.168.1.2', '/Common/app1.app/pool_b', '        /Common/tcp { }'),
+    _virtual('/Common/vs_c', '192.168.1.3', '/Common/pool_c', '        /Common/tcp { }'),
+    '''net route /Common/default_gw {
+    gw 10.0.0.254
+    network default
+}
+net route /Common/internal {
+    gw 10.0.0.253
+    network 172.16.0.0/12
+}
+''',
+]).encode()
+
+
+def _concatenated_shards(index_path):
+    shard_dir = os.path.dirname(index_path)
+    with open(index_path, 'r', encoding='utf-8') as index_file:
+        files = [line.split('\t')[1] for line in index_file if not line.startswith('#')]
+    text = ''
+    for file_name in files:
+        with open(os.path.join(shard_dir, file_name), 'r') as shard_file:
+            text += shard_file.read()
+    return text
+
+
+def test_concatenated_shards_match_write_to_txt(tmp_path):
+    model = extract_pools_vs_nodes(split_blocks(CONF))
+    full_path = tmp_path / 'full.txt'
+    write_to_txt(str(full_path), *model)
+    full = full_path.read_text()
+    assert full.count('\n        profile connection-multiplex oneconnect\n') == 3
+
+    for by_partition, max_objects in ((True, None), (True, 1), (False, 2)):
+        base_name = f'conf_{by_partition}_{max_objects}'
+        index_path, rendered, reused = write_txt_shards(model, str(tmp_path), base_name, by_partition, max_objects)
+        assert _concatenated_shards(index_path) == full
+        assert reused == 0
+        # 输入不变时全部复用
+        assert write_txt_shards(model, str(tmp_path), base_name, by_partition, max_objects)[1:] == (0, rendered)
+
+
+def test_shard_file_names_for_folder_partitions(tmp_path):
+    model = extract_pools_vs_nodes(split_blocks(CONF))
+    index_path, _, _ = write_txt_shards(model, str(tmp_path), 'conf', True, None)
+    names = os.listdir(os.path.dirname(index_path))
+    assert 'conf_pool_Common%2Fapp1.app_0.txt' in names
+    assert 'conf_virtual_Common%2Fapp1.app_0.txt' in names
+    assert 'conf_profile_custom_Common%2Fapp1.app_0.txt' in names
+
+
+def test_shard_file_names_do_not_collide():
+    names = {shard_file_name('conf', section, partition, chunk)
+             for section, partition, chunk in (('pool', 'a/b', 0), ('pool', 'a_b', 0), ('pool', 'a', 1),
+                                               ('pool', '', 1), ('pool', '1', 0), ('pool_member_monitor', '', 0),
+                                               ('pool', 'member_monitor', 0))}
+    assert len(names) == 7
@@ -0,0 +1,94 @@
+import io
+
+from core.function.ucs.lxl_package_3_ConfProcess.Conf_Extract import extract_pools_vs_nodes
+from core.function.ucs.lxl_package_3_ConfProcess.Conf_Split import iter_blocks, split_blocks
+from core.function.ucs.lxl_package_3_ConfProcess.Conf_Stream import stream_to_txt
+from core.function.ucs.lxl_package_3_ConfProcess.Conf_WriteToTxt import write_to_txt
+
+
+def _pool(path, address, session):
+    return f'''ltm pool {path} {{
+    members {{
+        /Common/{address}:80 {{
+            address {address}
+            session {session}
+        }}
+    }}
+    monitor /Common/http
+}}
+'''
+
+
+# 同名 pool 在不同分区中成员设置不同；VS 引用的会话保持定义在 VS 之后；第一个 VS 关联 oneconnect
+CONF = ''.join([
+    '''auth source {
+    type tacacs
+}
+''',
+    _pool('/Common/web', '10.0.0.1', 'user-disabled'),
+    _pool('/Tenant1/web', '10.0.0.1', 'user-enabled'),
+    '''ltm virtual /Common/vs_a {
+    destination /Common/192.168.1.1:80
+    ip-protocol tcp
+    pool /Common/web
+    profiles {
+        /Common/oneconnect { }
+        /Common/http { }
+        /Common/tcp { }
+    }
+    source-address-translation {
+        pool /Common/snat1
+        type snat
+    }
+}
+ltm virtual /Common/vs_b {
+    destination /Common/192.168.1.2:80
+    ip-protocol tcp
+    persist {
+        /Common/my_persist {
+            default yes
+        }
+    }
+    pool /Tenant1/web
+    profiles {
+        /Common/tcp { }
+    }
+    source-address-translation {
+        pool /Common/snat1
+        type snat
+    }
+}
+ltm persistence source-addr /Common/my_persist {
+    defaults-from /Common/source_addr
+    timeout 300
+}
+ltm snatpool /Common/snat1 {
+    members {
+        /Common/10.1.1.1
+        /Common/10.1.1.2
+    }
+}
+net route /Common/internal {
+    gw 10.0.0.253
+    network 172.16.0.0/12
+}
+''',
+]).encode()
+
+
+def test_iter_blocks_matches_split_blocks():
+    streamed = [(block.header, block.text) for block in iter_blocks(io.BytesIO(CONF))]
+    assert streamed == [(block.header, block.text) for block in split_blocks(CONF)]
+
+
+def test_streamed_txt_matches_write_to_txt(tmp_path):
+    full_path = tmp_path / 'full.txt'
+    write_to_txt(str(full_path), *extract_pools_vs_nodes(split_blocks(CONF)))
+    expected = full_path.read_text()
+    assert 'profile persist source-ip my_persist' in expected
+
+    for batch_objects in (1, 2, 100):
+        stream_path = tmp_path / f'stream_{batch_objects}.txt'
+        count = stream_to_txt(io.BytesIO(CONF), str(stream_path), batch_objects=batch_objects)
+        assert count == 8
+        assert stream_path.read_text() == expected
@@ -0,0 +1,56 @@
+from core.processors.config_diff import FALLBACK_MAX_CELLS, compare_lines, compare_stanzas
+
+
+def test_single_line_change():
+    lines1 = [f'slb server s{i}' for i in range(100)]
+    lines2 = list(lines1)
+    lines2[50] = 'slb server changed'
+    hunks, stats = compare_lines(lines1, lines2)
+    assert hunks == [{'file1_start': 51, 'file2_start': 51, 'file1': ['slb server s50'],
+                      'file2': ['slb server changed']}]
+    assert stats['different_lines'] == 1
+
+
+def test_large_region_without_unique_lines_is_one_hunk():
+    """没有唯一行的大区间不逐行匹配，整体作为一个差异区块"""
+    size = int(FALLBACK_MAX_CELLS ** 0.5) * 2
+    lines1 = ['header'] + ['!', '  exit'] * size + ['footer']
+    lines2 = ['header'] + ['  exit', '!', ''] * size + ['footer']
+    hunks, stats = compare_lines(lines1, lines2)
+    assert len(hunks) == 1
+    assert hunks[0]['file1_start'] == 2
+    assert len(hunks[0]['file1']) == 2 * size
+    assert len(hunks[0]['file2']) == 3 * size
+
+
+def test_stanza_value_change_reported_as_changed():
+    """头部中的取值变化（hostname、vrrp unit-id、virtual-address 的地址）报告为修改，不是一删一增"""
+    lines1 = ['hostname A', '!', 'vrrp unit-id 1', '!', 'slb virtual-address va1 10.0.0.1', '  port 80 tcp',
+              '!', 'interface ethernet 1', '  enable']
+    lines2 = ['hostname B', '!', 'interface ethernet 1', '  enable', '!', 'vrrp unit-id 2', '!',
+              'slb virtual-address va1 10.0.0.2', '  port 80 tcp']
+    hunks, stats, objects = compare_stanzas(lines1, lines2)
+    assert objects == {
+        'changed': ['hostname A → hostname B', 'vrrp unit-id 1 → vrrp unit-id 2',
+                    'slb virtual-address va1 10.0.0.1 → slb virtual-address va1 10.0.0.2'],
+        'only_in_file1': [],
+        'only_in_file2': [],
+    }
+    assert hunks[0] == {'file1_start': 1, 'file2_start': 1, 'file1': ['hostname A'], 'file2': ['hostname B']}
+    assert stats['total_stanzas'] == 4
+    assert stats['different_stanzas'] == 3
+
+
+def test_stanza_identity_change_reported_as_removed_and_added():
+    """vlan、interface 的头部就是对象标识，编号不同是不同的对象"""
+    lines1 = ['vlan 10', '  tagged ethernet 1', '!', 'interface ethernet 3', '  enable',
+              '!', 'slb server s1 10.0.0.1', '  port 80 tcp']
+    lines2 = ['vlan 20', '  tagged ethernet 1', '!', 'interface ethernet 4', '  enable',
+              '!', 'slb server s1 10.0.0.9', '  port 80 tcp']
+    hunks, stats, objects = compare_stanzas(lines1, lines2)
+    assert objects == {
+        'changed': ['slb server s1 10.0.0.1 → slb server s1 10.0.0.9'],
+        'only_in_file1': ['vlan 10', 'interface ethernet 3'],
+        'only_in_file2': ['vlan 20', 'interface ethernet 4'],
+    }
+    assert stats['total_stanzas'] == 5
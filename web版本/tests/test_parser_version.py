@@ -0,0 +1,124 @@
+import hashlib
+
+from core.function.ucs.lxl_package_3_ConfProcess import Conf_Extract
+from core.function.ucs.lxl_package_3_ConfProcess.Conf_Split import split_blocks
+from core.function.ucs.lxl_package_4_BaseConfProcess import F5_base_to_excel_txt
+
+# 提取结果的摘要按解析器版本记录：提取逻辑改动使摘要变化时，必须同时修改 PARSER_VERSION（使旧的解析缓存失效），
+# 再把新版本号和新摘要记录到这里
+CONF_DIGESTS = {'conf-extract-3': '6e0f09cbc92e8118'}
+BASE_DIGESTS = {'base-extract-1': '76d7fa29a37ff44a'}
+
+CONF = b'''ltm monitor http /Common/http_check {
+    defaults-from /Common/http
+    interval 5
+    send "GET / HTTP/1.1\\r\\nHost: a\\r\\n\\r\\n"
+    timeout 16
+}
+ltm node /Common/10.0.0.9 {
+    address 10.0.0.9
+}
+ltm persistence cookie /Common/my_cookie {
+    cookie-name SRV
+    defaults-from /Common/cookie
+}
+ltm pool /Common/web {
+    load-balancing-mode least-connections-member
+    members {
+        /Common/10.0.0.1:80 {
+            address 10.0.0.1
+            ratio 2
+            session user-disabled
+        }
+        /Common/10.0.0.2:80 {
+            address 10.0.0.2
+            monitor /Common/tcp
+        }
+    }
+    monitor /Common/http_check
+}
+ltm profile http /Common/my_http {
+    defaults-from /Common/http
+    insert-xforwarded-for enabled
+}
+ltm rule /Common/route_rule {
+when HTTP_REQUEST {
+    pool /Common/web
+}
+}
+ltm snatpool /Common/snat1 {
+    members {
+        /Common/10.1.1.1
+    }
+}
+ltm virtual /Common/vs_a {
+    destination /Common/192.168.1.1:80
+    ip-protocol tcp
+    persist {
+        /Common/my_cookie {
+            default yes
+        }
+    }
+    pool /Common/web
+    profiles {
+        /Common/my_http { }
+        /Common/tcp { }
+    }
+    rules {
+        /Common/route_rule
+    }
+    source-address-translation {
+        pool /Common/snat1
+        type snat
+    }
+}
+net route /Common/internal {
+    gw 10.0.0.253
+    network 172.16.0.0/12
+}
+'''
+
+BASE_CONF = b'''net route /Common/mgmt_default {
+    gw 192.168.0.1
+    network default
+}
+net self /Common/self_100 {
+    address 10.100.0.2/24
+    traffic-group /Common/traffic-group-local-only
+    vlan /Common/vlan100
+}
+net trunk /Common/trunk1 {
+    interfaces {
+        1.1
+        1.2
+    }
+}
+net vlan /Common/vlan100 {
+    interfaces {
+        trunk1 {
+            tagged
+        }
+    }
+    tag 100
+}
+sys global-settings {
+    hostname bigip1.example.com
+}
+sys ntp {
+    servers { 10.0.0.123 }
+}
+'''
+
+
+def _digest(model):
+    return hashlib.sha256(repr(model).encode()).hexdigest()[:16]
+
+
+def test_conf_extract_output_matches_parser_version():
+    model = Conf_Extract.extract_pools_vs_nodes(split_blocks(CONF))
+    assert CONF_DIGESTS.get(Conf_Extract.PARSER_VERSION) == _digest(model)
+
+
+def test_base_extract_output_matches_parser_version():
+    model = F5_base_to_excel_txt.extract_pools_vs_nodes(F5_base_to_excel_txt.split_blocks(BASE_CONF))
+    assert BASE_DIGESTS.get(F5_base_to_excel_txt.PARSER_VERSION) == _digest(model)
@@ -0,0 +1,29 @@
+import io
+import os
+import tarfile
+
+from core.config import Config
+from core.processors.f5_ucs_processor import F5UCSProcessor, member_path
+
+
+def test_member_path_rejects_paths_outside_the_archive_root():
+    assert member_path('./config/bigip.conf') == 'config/bigip.conf'
+    assert member_path('config//partitions/./T1/bigip.conf') == 'config/partitions/T1/bigip.conf'
+    assert member_path('/etc/bigip.conf') is None
+    assert member_path('config/partitions/../../../tmp/bigip.conf') is None
+
+
+def test_selective_extract_skips_traversal_members(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'LOG_FILE', str(tmp_path / 'app.log'))
+    archive = tmp_path / 'dev1.ucs'
+    with tarfile.open(str(archive), 'w:gz') as tar:
+        for name in ('./config/bigip.conf', 'config/partitions/../../../escaped/bigip.conf'):
+            info = tarfile.TarInfo(name)
+            info.size = 4
+            tar.addfile(info, io.BytesIO(b'conf'))
+
+    processed_dir = tmp_path / 'users' / 'u' / 'ucs' / 'processed'
+    processed_dir.mkdir(parents=True)
+    extracted = F5UCSProcessor(user_processed_dir=str(processed_dir)).untar_file(str(archive))
+    assert os.path.isfile(os.path.join(extracted, 'config', 'bigip.conf'))
+    assert not any('escaped' in dirs for _, dirs, _ in os.walk(str(tmp_path)))
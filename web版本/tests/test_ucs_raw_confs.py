@@ -0,0 +1,37 @@
+import io
+import os
+import tarfile
+
+from core.config import Config
+from core.processors.ucs_pipeline import write_raw_confs
+
+
+def _archive(path, members):
+    with tarfile.open(path, 'w:gz') as tar:
+        for name, content in members.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            tar.addfile(info, io.BytesIO(content))
+
+
+def test_raw_confs_are_written_for_translated_devices_only(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'LOG_FILE', str(tmp_path / 'app.log'))
+    upload_dir = tmp_path / 'upload'
+    ucs_dir = tmp_path / 'ucs'
+    upload_dir.mkdir()
+    for device in ('dev1', 'dev2'):
+        _archive(str(upload_dir / f'{device}.ucs'), {'config/bigip.conf': b'ltm node /Common/10.0.0.1 { }\n',
+                                                     'config/bigip_base.conf': b'net vlan /Common/v1 { }\n'})
+    # 只有 dev1 翻译过
+    (ucs_dir / 'conf' / 'output').mkdir(parents=True)
+    (ucs_dir / 'conf' / 'output' / 'dev1_bigip.txt').write_text('')
+    (ucs_dir / 'base' / 'output').mkdir(parents=True)
+    (ucs_dir / 'base' / 'output' / 'dev1_bigip_base.txt').write_text('')
+
+    written = write_raw_confs(str(upload_dir), str(ucs_dir))
+    assert sorted(os.path.relpath(path, ucs_dir) for path in written) == [
+        os.path.join('base', 'dev1_bigip_base.conf'), os.path.join('conf', 'dev1_bigip.conf')]
+    assert (ucs_dir / 'conf' / 'dev1_bigip.conf').read_bytes() == b'ltm node /Common/10.0.0.1 { }\n'
+    assert not (ucs_dir / 'conf' / 'dev2_bigip.conf').exists()
+    # 已经写出的文件不再重复读取归档
+    assert write_raw_confs(str(upload_dir), str(ucs_dir)) == []
@@ -13,6 +13,7 @@ from werkzeug.utils import secure_filename
 from core.config import Config
 from core.processors.f5_ucs_processor import F5UCSProcessor
 from core.processors.unified_processor import UnifiedProcessor
+from core.processors.ucs_pipeline import write_raw_confs
 from core.processors.horizon_processor import HorizonProcessor
 from core.user_manager import user_manager
 from core.auth import login_required, get_current_user, get_user_upload_dir, get_user_processed_dir
@@ -310,7 +311,9 @@ def upload_file(file_type) -> Union[Any, tuple[Any, int]]:
             if filename.lower().endswith('bigip.conf'):
                 if os.path.exists(conf_dir):
                     app.logger.info(f"自动翻译conf目录: {conf_dir}")
-                    process_conf_folder(conf_dir)  # 使用conf处理模块
+                    process_conf_folder(conf_dir, streaming=Config.CONF_STREAMING,
+                                        shard_by_partition=Config.SHARD_BY_PARTITION,
+                                        shard_max_objects=Config.SHARD_MAX_OBJECTS)  # 使用conf处理模块
                     app.logger.info(f"自动翻译conf目录完成: {conf_dir}")
                 else:
                     app.logger.warning(f"conf目录不存在: {conf_dir}")
@@ -618,6 +621,9 @@ def download_directory(file_type, base_name):
         user_upload_dir = user_manager.get_user_upload_dir(current_user, file_type)
         user_processed_dir = user_manager.get_user_processed_dir(current_user, file_type)
         ucs_dir = os.path.dirname(user_processed_dir)
+        # 内存解析时默认不写出原始配置，下载时从上传的归档中补写
+        if file_type == 'ucs':
+            write_raw_confs(user_upload_dir, ucs_dir, base_name)
         
         # 创建临时TAR文件
         temp_zip = BytesIO()
@@ -712,6 +718,9 @@ def download_all_files(file_type):
         user_upload_dir = user_manager.get_user_upload_dir(current_user, file_type)
         user_processed_dir = user_manager.get_user_processed_dir(current_user, file_type)
         ucs_dir = os.path.dirname(user_processed_dir)
+        # 内存解析时默认不写出原始配置，下载时从上传的归档中补写
+        if file_type == 'ucs':
+            write_raw_confs(user_upload_dir, ucs_dir)
         
         # 创建临时TAR文件
         temp_zip = BytesIO()
@@ -800,6 +809,9 @@ def download_by_type(file_type, content_type):
         user_upload_dir = user_manager.get_user_upload_dir(current_user, file_type)
         user_processed_dir = user_manager.get_user_processed_dir(current_user, file_type)
         ucs_dir = os.path.dirname(user_processed_dir)
+        # 内存解析时默认不写出原始配置，下载时从上传的归档中补写
+        if file_type == 'ucs' and content_type in ('conf', 'base'):
+            write_raw_confs(user_upload_dir, ucs_dir)
         
         # 创建临时TAR文件
         temp_zip = BytesIO()
@@ -948,6 +960,9 @@ def download_by_group(file_type, group_type):
         logger.info(f"用户上传目录: {user_upload_dir}")
         logger.info(f"用户处理目录: {user_processed_dir}")
         logger.info(f"UCS目录: {ucs_dir}")
+        # 内存解析时默认不写出原始配置，下载时从上传的归档中补写
+        if file_type == 'ucs' and group_type == 'config':
+            write_raw_confs(user_upload_dir, ucs_dir)
         
         # 创建临时TAR文件
         temp_zip = BytesIO()
@@ -1816,8 +1831,8 @@ def get_horizon_compare_results():
                 'results': None
             })
         
-        # 使用新的对比逻辑
-        comparison_result = processor.compare_configs(config_files)
+        # 使用新的对比逻辑（?mode=stanza 时按段落对比，?pairing=fingerprint 时按配置内容的指纹配对）
+        comparison_result = processor.compare_configs(config_files, request.args.get('mode'), request.args.get('pairing'))
         
         if "error" in comparison_result:
             return jsonify({